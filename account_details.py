@@ -0,0 +1,128 @@
+# account_details.py
+from collections import OrderedDict
+from PyQt6.QtWidgets import QWidget, QLabel, QVBoxLayout, QSizePolicy
+from PyQt6.QtCore import Qt
+
+from account_record import AccountRecord
+
+# Opened records kept for the selection and its neighbours
+OPENED_RECORDS = 32
+# Rows above and below the selection opened ahead of the arrow keys
+PREFETCH_ROWS = 2
+
+# Field, caption
+DETAIL_FIELDS = (
+    ("name", "Account Name:"),
+    ("password", "Password:"),
+    ("email", "Email:"),
+    ("website", "Website:"),
+    ("created", "Creation Time:"),
+)
+
+
+class AccountDetailsView(QWidget):
+    """Shows one account as fixed caption and value labels.
+
+    The labels are built once; showing another account only changes the
+    text of the value labels, so no rich text is parsed or laid out.
+    Colors and fonts come from the window theme (see themes.py), keyed on
+    the object names of the labels.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        # Shrinks with the window, long values are clipped instead of widening the panel
+        self.setSizePolicy(QSizePolicy.Policy.Ignored, QSizePolicy.Policy.Ignored)
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(8, 8, 8, 8)
+        layout.setSpacing(5)
+
+        self.values = {}
+        self.fields = QWidget(self)
+        fields_layout = QVBoxLayout(self.fields)
+        fields_layout.setContentsMargins(0, 0, 0, 0)
+        fields_layout.setSpacing(5)
+        for field, caption in DETAIL_FIELDS:
+            caption_label = QLabel(caption)
+            caption_label.setObjectName("detailsCaption")
+            value_label = QLabel()
+            value_label.setObjectName("detailsPassword" if field == "password" else "detailsValue")
+            value_label.setTextFormat(Qt.TextFormat.PlainText)
+            value_label.setTextInteractionFlags(Qt.TextInteractionFlag.TextSelectableByMouse)
+            value_label.setSizePolicy(QSizePolicy.Policy.Ignored, QSizePolicy.Policy.Fixed)
+            fields_layout.addWidget(caption_label)
+            fields_layout.addWidget(value_label)
+            fields_layout.addSpacing(10)
+            self.values[field] = value_label
+
+        self.message = QLabel(self)
+        self.message.setObjectName("detailsMessage")
+        self.message.setTextFormat(Qt.TextFormat.PlainText)
+        self.message.setWordWrap(True)
+
+        layout.addWidget(self.fields)
+        layout.addWidget(self.message)
+        layout.addStretch()
+
+        self._mode = ""  # Differs from every mode, so clear() hides both
+        self.clear()
+
+    def _set_mode(self, mode):
+        """Shows the fields, the message or neither; only a change touches the layout."""
+        if mode != self._mode:
+            self._mode = mode
+            self.fields.setVisible(mode == "fields")
+            self.message.setVisible(mode == "message")
+
+    def show_account(self, account_name, account_data, created_text):
+        """Shows an account, with the creation time already formatted."""
+        values = self.values
+        values["name"].setText(account_name)
+        values["password"].setText(account_data.password)
+        values["email"].setText(account_data.email or "Not provided")
+        values["website"].setText(account_data.website or "Not provided")
+        values["created"].setText(created_text)
+        self._set_mode("fields")
+
+    def show_message(self, text):
+        """Shows a line of text instead of an account."""
+        self.message.setText(text)
+        self._set_mode("message")
+
+    def clear(self):
+        for label in self.values.values():
+            label.clear()
+        self._set_mode(None)
+
+
+class OpenedRecordCache:
+    """Recently decrypted records of the current database, by account name.
+
+    An entry holds the sealed record it was opened from and only counts
+    while the database still holds that same object and its vault is
+    unlocked, so edits, reloads and database switches never return a
+    stale record. Readable records are not stored, they need no opening.
+    """
+
+    def __init__(self, size=OPENED_RECORDS):
+        self.size = size
+        self._records = OrderedDict()  # Format: {account_name: (sealed record, opened record)}
+
+    def get(self, account_name, source):
+        entry = self._records.get(account_name)
+        if entry is None or entry[0] is not source or not source.key.unlocked:
+            return None
+        self._records.move_to_end(account_name)
+        return entry[1]
+
+    def put(self, account_name, source, account_data):
+        if isinstance(source, AccountRecord):
+            return
+        self._records[account_name] = (source, account_data)
+        self._records.move_to_end(account_name)
+        while len(self._records) > self.size:
+            self._records.popitem(last=False)
+
+    def clear(self):
+        self._records.clear()
@@ -0,0 +1,116 @@
+# account_model.py
+from bisect import bisect_left
+from PyQt6.QtCore import Qt, QModelIndex, QStringListModel
+
+# Search results are handed to the view this many rows at a time
+RESULT_BATCH = 256
+
+
+class AccountListModel(QStringListModel):
+    """List model over the sorted account names of the current vault.
+
+    A Python list of the sorted names is kept as the key index, so inserts
+    and deletes are placed by binary search and reported to the view as
+    single-row changes. The rows themselves live in the C++ string list:
+    QListView asks the model for index()/rowCount() twice per row on every
+    layout pass, which costs ~0.4 s for 100k rows when answered in Python.
+
+    Search results are shown in rank order instead. They can be appended
+    while a search is still running and reach the view RESULT_BATCH rows
+    at a time through fetchMore(), as the user scrolls.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._names = []
+        self._ranked = False
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        # Only called for visible rows, the view uses uniform item sizes
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return "Click to view details" if index.isValid() else None
+        return super().data(index, role)
+
+    def flags(self, index):
+        # Names are edited through the form, not in place
+        return super().flags(index) & ~Qt.ItemFlag.ItemIsEditable
+
+    def set_names(self, names):
+        """Replaces all rows with the given account names."""
+        self._names = sorted(names)
+        self._ranked = False
+        self.setStringList(self._names)
+
+    def set_results(self, names):
+        """Replaces all rows with search results, in the given order."""
+        self._names = list(names)
+        self._ranked = True
+        self.setStringList(self._names[:RESULT_BATCH])
+
+    def append_results(self, names):
+        """Adds search results after the ones already received."""
+        self._names.extend(names)
+        if self.rowCount() < RESULT_BATCH:
+            self.fetchMore()
+
+    def result_count(self):
+        """Returns the number of rows, including results not fetched by the view yet."""
+        return len(self._names)
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return self._ranked and not parent.isValid() and self.rowCount() < len(self._names)
+
+    def fetchMore(self, parent=QModelIndex()):
+        if not self.canFetchMore(parent):
+            return
+
+        row = self.rowCount()
+        names = self._names[row:row + RESULT_BATCH]
+        self.insertRows(row, len(names))
+        for offset, name in enumerate(names):
+            self.setData(self.index(row + offset), name)
+
+    def clear(self):
+        """Removes all rows."""
+        self.set_names([])
+
+    def name_at(self, row):
+        """Returns the account name shown in a row."""
+        return self._names[row]
+
+    def row_of(self, name):
+        """Returns the row of an account name, or -1."""
+        if self._ranked:
+            try:
+                return self._names.index(name, 0, self.rowCount())
+            except ValueError:
+                return -1
+
+        row = bisect_left(self._names, name)
+        if row < len(self._names) and self._names[row] == name:
+            return row
+        return -1
+
+    def insert_name(self, name):
+        """Inserts an account name at its sorted position and returns its row."""
+        if self._ranked:
+            raise ValueError("Search results are not kept in name order")
+
+        row = bisect_left(self._names, name)
+        if row < len(self._names) and self._names[row] == name:
+            return row
+
+        self._names.insert(row, name)
+        self.insertRows(row, 1)
+        self.setData(self.index(row), name)
+        return row
+
+    def remove_name(self, name):
+        """Removes an account name; returns False if it was not listed."""
+        row = self.row_of(name)
+        if row < 0:
+            return False
+
+        del self._names[row]
+        self.removeRows(row, 1)
+        return True
@@ -0,0 +1,172 @@
+# account_record.py
+import sys
+import time
+from functools import lru_cache
+
+# On-disk format of the creation time
+CREATED_FORMAT = "%Y-%m-%d %H:%M:%S"
+# Keys written for every record, anything else is kept in AccountRecord.extra
+RECORD_KEYS = ("password", "email", "website", "created")
+_RECORD_KEY_SET = frozenset(RECORD_KEYS)
+
+
+def _parse_created(text):
+    """Packs a "YYYY-MM-DD hh:mm:ss" time into the integer YYYYMMDDhhmmss, or returns None."""
+    digits = text.replace("-", "").replace(":", "").replace(" ", "")
+    if len(digits) == 14 and len(text) == 19 and digits.isascii() and digits.isdigit() \
+            and text[4] == "-" and text[7] == "-" and text[10] == " " \
+            and text[13] == ":" and text[16] == ":":
+        return int(digits)
+    return None
+
+
+@lru_cache(maxsize=1024)
+def _created_text(created):
+    """Formats a packed creation time; records imported or added together share one."""
+    text = f"{created:014d}"
+    return f"{text[0:4]}-{text[4:6]}-{text[6:8]} {text[8:10]}:{text[10:12]}:{text[12:14]}"
+
+
+class AccountRecord:
+    """One account of a vault.
+
+    Vault JSON stores an account either as a bare password string (legacy)
+    or as a dict with password/email/website/created keys. Both are
+    normalized into this shape once when a vault is loaded, so readers use
+    plain attributes. Slots avoid a per-record dict, repeated emails and
+    websites are interned, and the creation time is packed into an integer
+    (YYYYMMDDhhmmss, 0 if unknown). Keys the app does not know are kept in
+    extra so they survive a save.
+    """
+
+    __slots__ = ("password", "email", "website", "created", "extra")
+
+    def __init__(self, password="", email="", website="", created=0, extra=None):
+        self.password = password
+        self.email = sys.intern(email)
+        self.website = sys.intern(website)
+        self.created = created
+        self.extra = extra
+
+    @classmethod
+    def create(cls, password, email="", website=""):
+        """Returns a new record created now."""
+        return cls(password, email, website, int(time.strftime("%Y%m%d%H%M%S")))
+
+    @classmethod
+    def from_json(cls, value):
+        """Normalizes a record as stored in vault JSON; records pass through."""
+        if isinstance(value, AccountRecord):
+            return value  # Already decoded, e.g. by the binary vault codec
+        if isinstance(value, str):
+            return cls(value)  # Old format: password only
+        if not isinstance(value, dict):
+            raise ValueError("Invalid account record")
+
+        password = value.get("password") or ""
+        email = value.get("email") or ""
+        website = value.get("website") or ""
+        created = value.get("created")
+
+        extra = None
+        if not value.keys() <= _RECORD_KEY_SET:
+            extra = {key: item for key, item in value.items() if key not in _RECORD_KEY_SET}
+
+        # Only times in CREATED_FORMAT are packed, anything else is kept verbatim
+        packed = _parse_created(created) if isinstance(created, str) else None
+        if packed is None and created is not None:
+            extra = dict(extra or {}, created=created)
+
+        if type(password) is not str or type(email) is not str or type(website) is not str:
+            password, email, website = str(password), str(email), str(website)
+        return cls(password, email, website, packed or 0, extra)
+
+    def to_json(self):
+        """Returns the record in the vault JSON shape."""
+        data = {"password": self.password, "email": self.email, "website": self.website}
+        if self.created:
+            data["created"] = self.created_text
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    @property
+    def created_text(self):
+        """Returns the creation time as stored on disk, or "" if unknown."""
+        if self.created:
+            return _created_text(self.created)
+        if self.extra and "created" in self.extra:
+            return str(self.extra["created"])
+        return ""
+
+    def __eq__(self, other):
+        if not isinstance(other, AccountRecord):
+            return NotImplemented
+        return self.to_json() == other.to_json()
+
+    def unsealed(self, account_name):
+        """Returns the readable record, which is this one."""
+        return self
+
+    def __repr__(self):
+        return f"AccountRecord(email={self.email!r}, website={self.website!r}, created={self.created})"
+
+
+class SealedRecord:
+    """One account of an encrypted vault, still encrypted.
+
+    data is the Base64 text stored in the vault JSON, key the VaultKey of
+    the vault (see vault_crypto). Loading an encrypted vault only wraps the
+    text; a record is decrypted when it is shown, and saving writes the
+    text back without decrypting it.
+    """
+
+    __slots__ = ("data", "key")
+
+    def __init__(self, data, key):
+        self.data = data
+        self.key = key
+
+    @classmethod
+    def from_json(cls, value, key):
+        """Wraps a record as stored in encrypted vault JSON; records pass through."""
+        if isinstance(value, SealedRecord):
+            return value
+        if not isinstance(value, str):
+            raise ValueError("Invalid encrypted account record")
+        return cls(value, key)
+
+    def to_json(self):
+        """Returns the record in the vault JSON shape, the sealed text."""
+        return self.data
+
+    def unsealed(self, account_name):
+        """Returns the decrypted AccountRecord, or None while the vault is locked."""
+        if not self.key.unlocked:
+            return None
+        return self.key.open(account_name, self.data)
+
+    def __eq__(self, other):
+        if not isinstance(other, SealedRecord):
+            return NotImplemented
+        return self.data == other.data
+
+    def __repr__(self):
+        return f"SealedRecord({len(self.data)} bytes)"
+
+
+def normalize_accounts(data, key=None):
+    """Converts decoded vault JSON into {account_name: AccountRecord}.
+
+    Records of an encrypted vault, one with a key, become SealedRecords.
+    """
+    if key is not None:
+        return {name: SealedRecord.from_json(value, key) for name, value in data.items()}
+    return {name: AccountRecord.from_json(value) for name, value in data.items()}
+
+
+def record_to_json(value):
+    """json.dumps default hook that writes records in the vault JSON shape."""
+    if isinstance(value, (AccountRecord, SealedRecord)):
+        return value.to_json()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
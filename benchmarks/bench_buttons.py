@@ -0,0 +1,121 @@
+# bench_buttons.py
+"""Hover latency and paint cost of EnhancedButton on a window with many buttons.
+
+Run from the repository root:
+
+    python benchmarks/bench_buttons.py [button counts...]
+
+Hover sends an Enter and a Leave event to every button and repaints it
+after each, as moving the mouse over a row of buttons does. Paint
+repaints the whole window. The stylesheet rows replay the former
+implementation, a new stylesheet per state change and a drop shadow
+effect per button, as the baseline. Times are the best of three runs.
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtCore import QEvent, QPointF  # noqa: E402
+from PyQt6.QtGui import QColor, QEnterEvent  # noqa: E402
+from PyQt6.QtWidgets import (  # noqa: E402
+    QApplication, QGraphicsDropShadowEffect, QGridLayout, QPushButton, QWidget
+)
+from enhanced_buttons import EnhancedButton  # noqa: E402
+
+DEFAULT_COUNTS = (12, 60)
+COLUMNS = 4
+PAINTS = 50
+REPEATS = 3
+
+
+class _StyledButton(QPushButton):
+    """The former button: a stylesheet per state and its own shadow effect."""
+
+    def __init__(self, text):
+        super().__init__(text)
+        self._color = "#8A2BE2"
+        shadow = QGraphicsDropShadowEffect(self)
+        shadow.setBlurRadius(15)
+        shadow.setColor(QColor(0, 0, 0, 80))
+        shadow.setOffset(0, 2)
+        self.setGraphicsEffect(shadow)
+        self.update_style()
+
+    def update_style(self):
+        self.setStyleSheet(f"""
+            QPushButton {{
+                background-color: {self._color};
+                color: #FFFFFF;
+                border: none;
+                border-radius: 8px;
+                padding: 10px;
+                font-weight: bold;
+                font-size: 14px;
+            }}
+        """)
+
+    def enterEvent(self, event):
+        self._color = "#9A3BF2"
+        self.update_style()
+        super().enterEvent(event)
+
+    def leaveEvent(self, event):
+        self._color = "#8A2BE2"
+        self.update_style()
+        super().leaveEvent(event)
+
+
+def make_window(button_class, count):
+    window = QWidget()
+    window.setStyleSheet("QWidget { background-color: #121218; color: #F8F8F2; }")
+    layout = QGridLayout(window)
+    buttons = [button_class(f"Button {i}") for i in range(count)]
+    for i, button in enumerate(buttons):
+        layout.addWidget(button, i // COLUMNS, i % COLUMNS)
+    window.resize(COLUMNS * 170, (count + COLUMNS - 1) // COLUMNS * 60)
+    window.show()
+    QApplication.processEvents()
+    return window, buttons
+
+
+def hover(app, window, buttons):
+    point = QPointF(5, 5)
+    for button in buttons:
+        app.sendEvent(button, QEnterEvent(point, point, point))
+        button.repaint()
+        app.sendEvent(button, QEvent(QEvent.Type.Leave))
+        button.repaint()
+
+
+def paint(app, window, buttons):
+    for _ in range(PAINTS):
+        window.repaint()
+
+
+def best_ms(fn, *args):
+    best = None
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        fn(*args)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best * 1000
+
+
+def main(counts):
+    app = QApplication.instance() or QApplication([])
+    print(f"{'buttons':>7}  {'':>11} {'hover ms/btn':>13} {'paint ms':>9}")
+    for count in counts:
+        for label, button_class in (("stylesheet", _StyledButton), ("painted", EnhancedButton)):
+            window, buttons = make_window(button_class, count)
+            hover_ms = best_ms(hover, app, window, buttons) / count
+            paint_ms = best_ms(paint, app, window, buttons) / PAINTS
+            print(f"{count:>7}  {label:>11} {hover_ms:>13.3f} {paint_ms:>9.2f}")
+            window.close()
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or DEFAULT_COUNTS)
@@ -0,0 +1,90 @@
+# bench_codecs.py
+"""Size, encode time and decode time of every vault payload codec.
+
+Run from the repository root:
+
+    python benchmarks/bench_codecs.py [record counts...]
+
+Encode times cover building the file contents from decoded records. Load
+times cover VaultFileManager.try_load_vault_file from a warm page cache,
+stream times iterating VaultFileManager.iter_vault_records. Every time is
+the best of three runs.
+"""
+import os
+import sys
+import shutil
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from account_record import normalize_accounts  # noqa: E402
+from file_utils import (  # noqa: E402
+    VAULT_CODECS, VAULT_FORMAT_INDEXED, VAULT_FORMAT_VERSION, VaultFileManager,
+    _encode_snapshot, _write_snapshot,
+)
+
+DEFAULT_SIZES = (10000, 100000)
+REPEATS = 3
+
+
+def make_accounts(record_count):
+    """Returns generated records with the repetition real vaults have."""
+    return normalize_accounts({
+        f"account-{i:07d}": {
+            "password": f"pw-{i * 7919 % 1000003:x}-{i * 104729 % 65521:x}",
+            "email": f"user{i % 5000}@example.com",
+            "website": f"https://site{i % 800}.example.org/login",
+            "created": f"2024-{i % 12 + 1:02d}-{i % 28 + 1:02d} 12:{i % 60:02d}:00",
+        }
+        for i in range(record_count)
+    })
+
+
+def best_time(fn, *args):
+    """Returns the fastest of REPEATS runs, in seconds."""
+    best = None
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        fn(*args)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def load(file_path):
+    accounts, error = VaultFileManager.try_load_vault_file(file_path)
+    assert accounts is not None, error
+
+
+def stream(file_path):
+    for _ in VaultFileManager.iter_vault_records(file_path):
+        pass
+
+
+def main(sizes):
+    directory = tempfile.mkdtemp()
+    variants = [(f"1/{codec.name}", VAULT_FORMAT_VERSION, codec.codec_id)
+                for codec in VAULT_CODECS.values()]
+    variants.append(("2/indexed", VAULT_FORMAT_INDEXED, None))
+    try:
+        print(f"{'records':>8}  {'format/codec':<14} {'MB':>7} {'size':>6} "
+              f"{'encode s':>9} {'load s':>7} {'stream s':>9}")
+        for record_count in sizes:
+            accounts = make_accounts(record_count)
+            baseline = None
+            for label, version, codec in variants:
+                file_path = os.path.join(directory, f"bench{record_count}.vault")
+                encode = best_time(_encode_snapshot, accounts, version, codec)
+                size = _write_snapshot(file_path, accounts, version, codec)
+                baseline = baseline or size
+                print(f"{record_count:>8}  {label:<14} {size / 1e6:>7.2f} {size / baseline:>6.2f} "
+                      f"{encode:>9.3f} {best_time(load, file_path):>7.3f} "
+                      f"{best_time(stream, file_path):>9.3f}")
+                os.remove(file_path)
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES)
@@ -0,0 +1,92 @@
+# bench_decode.py
+"""Peak memory and time of loading a vault whole versus streaming it.
+
+Run from the repository root:
+
+    python benchmarks/bench_decode.py [record counts...]
+
+Peak memory is measured with tracemalloc, so it counts Python allocations
+only, not the interpreter itself. Times are taken from a separate untraced
+run.
+"""
+import os
+import sys
+import json
+import base64
+import shutil
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from account_record import normalize_accounts  # noqa: E402
+from file_utils import VAULT_HEADER, VaultFileManager, _write_snapshot  # noqa: E402
+
+DEFAULT_SIZES = (1000, 10000, 100000)
+
+
+def make_vault(file_path, record_count):
+    """Writes a vault of generated records."""
+    accounts = {
+        f"account-{i:07d}": {
+            "password": f"pw-{i * 7919 % 1000003:x}-secret",
+            "email": f"user{i % 5000}@example.com",
+            "website": f"https://site{i % 800}.example.org/login",
+            "created": "2024-01-01 12:00:00",
+        }
+        for i in range(record_count)
+    }
+    _write_snapshot(file_path, normalize_accounts(accounts))
+
+
+def load_whole(file_path):
+    """The pre-streaming path: every copy of the payload is alive at once."""
+    with open(file_path, "rb") as f:
+        f.seek(VAULT_HEADER.size)
+        encoded_data = f.read()
+    return normalize_accounts(json.loads(base64.b64decode(encoded_data).decode()))
+
+
+def load_streamed(file_path):
+    return dict(VaultFileManager.iter_vault_records(file_path))
+
+
+def count_streamed(file_path):
+    return sum(1 for _ in VaultFileManager.iter_vault_records(file_path))
+
+
+def measure(fn, file_path):
+    """Returns (peak bytes, seconds) of a call; timed separately, tracemalloc slows it down."""
+    start = time.perf_counter()
+    fn(file_path)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    result = fn(file_path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return peak, elapsed
+
+
+def main(sizes):
+    directory = tempfile.mkdtemp()
+    try:
+        print(f"{'records':>8} {'file MB':>8}  {'path':<14} {'peak MB':>8} {'x file':>7} {'time s':>7}")
+        for record_count in sizes:
+            file_path = os.path.join(directory, f"bench{record_count}.vault")
+            make_vault(file_path, record_count)
+            file_size = os.path.getsize(file_path)
+            for label, fn in (("whole", load_whole),
+                              ("streamed", load_streamed),
+                              ("streamed count", count_streamed)):
+                peak, elapsed = measure(fn, file_path)
+                print(f"{record_count:>8} {file_size / 1e6:>8.1f}  {label:<14} {peak / 1e6:>8.1f} "
+                      f"{peak / file_size:>7.2f} {elapsed:>7.2f}")
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES)
@@ -0,0 +1,120 @@
+# bench_details.py
+"""Time to show the next account when scrolling the list with the arrow keys.
+
+Run from the repository root:
+
+    python benchmarks/bench_details.py [record count] [key presses]
+
+An encrypted vault of record count accounts is opened and unlocked, then
+Down is pressed key presses times. Each press is timed in
+display_account_details, which runs on the selection change, and after
+it the event loop runs once, as between two key repeats, so the
+neighbour prefetch can run. The html rows replay the former renderer, a
+QTextEdit rebuilt with setHtml and a record decrypted on every
+selection, as the baseline. Times are per key press in milliseconds.
+"""
+import os
+import sys
+import shutil
+import tempfile
+import time
+from statistics import median
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+os.environ.setdefault("VAULTIX_SCRYPT_LOG_N", "12")
+
+from PyQt6.QtCore import Qt  # noqa: E402
+from PyQt6.QtGui import QKeyEvent  # noqa: E402
+from PyQt6.QtWidgets import QApplication, QTextEdit  # noqa: E402
+import main as vaultix  # noqa: E402
+from bench_codecs import make_accounts  # noqa: E402
+from file_utils import _write_snapshot  # noqa: E402
+from vault_crypto import VaultKey  # noqa: E402
+
+DEFAULT_SIZE = 10000
+DEFAULT_PRESSES = 300
+PASSWORD = "correct horse battery staple"
+
+
+def html_details(window, text_edit):
+    """The former display_account_details."""
+    account_name = window.selected_account_name()
+    account_data = window.current_accounts[account_name].unsealed(account_name)
+    text_edit.setHtml(f"""
+        <style>
+            body {{ font-family: 'Segoe UI', Arial, sans-serif; color: {window.theme["TEXT"]}; }}
+            .label {{ color: {window.theme["TEXT_SECONDARY"]}; font-size: 14px; margin-bottom: 5px; }}
+            .value {{ color: {window.theme["TEXT"]}; font-size: 16px; margin-bottom: 15px;
+                      background-color: rgba(60, 50, 90, 100); padding: 8px; border-radius: 5px; }}
+            .password {{ font-family: monospace; letter-spacing: 1px; }}
+        </style>
+        <div class="label">Account Name:</div>
+        <div class="value">{account_name}</div>
+        <div class="label">Password:</div>
+        <div class="value password">{account_data.password}</div>
+        <div class="label">Email:</div>
+        <div class="value">{account_data.email or "Not provided"}</div>
+        <div class="label">Website:</div>
+        <div class="value">{account_data.website or "Not provided"}</div>
+        <div class="label">Creation Time:</div>
+        <div class="value">{account_data.created_text}</div>
+    """)
+
+
+def scroll(app, window, handler, presses):
+    """Presses Down and returns the median time spent in handler per press."""
+    times = []
+    original = window.display_account_details
+
+    def timed():
+        start = time.perf_counter()
+        handler()
+        times.append((time.perf_counter() - start) * 1000)
+
+    window.display_account_details = timed
+    window.account_list.selectionModel().selectionChanged.disconnect()
+    window.account_list.selectionModel().selectionChanged.connect(timed)
+    window.account_list.setCurrentIndex(window.account_model.index(0))
+    app.processEvents()
+    times.clear()
+    for _ in range(presses):
+        app.sendEvent(window.account_list, QKeyEvent(
+            QKeyEvent.Type.KeyPress, Qt.Key.Key_Down, Qt.KeyboardModifier.NoModifier))
+        app.processEvents()
+    window.display_account_details = original
+    return median(times)
+
+
+def main(record_count, presses):
+    app = QApplication.instance() or QApplication([])
+    directory = tempfile.mkdtemp()
+    try:
+        vaultix.DATABASE_DIR = directory
+        key = VaultKey.create(PASSWORD)
+        _write_snapshot(os.path.join(directory, "bench.vault"), make_accounts(record_count),
+                        None, None, key)
+
+        window = vaultix.AccountManager()
+        window.show()
+        while window.current_accounts is None:
+            app.processEvents()
+        window.account_list.setFocus()
+
+        text_edit = QTextEdit()
+        window.details_panel.add_widget(text_edit)
+        html = scroll(app, window, lambda: html_details(window, text_edit), presses)
+        text_edit.hide()
+        labels = scroll(app, window, window.display_account_details, presses)
+
+        print(f"records      {record_count}")
+        print(f"html ms      {html:.3f}")
+        print(f"labels ms    {labels:.3f}")
+        window.close()
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_SIZE,
+         int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_PRESSES)
@@ -0,0 +1,79 @@
+# bench_import.py
+"""CSV import speed against adding the same accounts one at a time.
+
+Run from the repository root:
+
+    python benchmarks/bench_import.py [row count]
+
+A Chrome-layout export of row count rows is generated, one row in ten
+naming a site that is already taken. Import is csv_import.import_csv into
+a new vault, reading and the single write together; again imports the
+same file once more, where every row is skipped. One at a time replays
+the Add button, a put and a saved journal record per account, for the
+first ONE_AT_A_TIME rows and extrapolates to row count; journal compaction
+makes later saves slower, so this is a lower bound.
+"""
+import os
+import sys
+import csv
+import shutil
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from account_record import AccountRecord  # noqa: E402
+from csv_import import import_csv  # noqa: E402
+from vault_store import VaultStore  # noqa: E402
+
+DEFAULT_ROWS = 500000
+ONE_AT_A_TIME = 1000
+
+
+def write_export(file_path, row_count):
+    with open(file_path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["name", "url", "username", "password", "note"])
+        for i in range(row_count):
+            site = f"site{i // 10 if i % 10 == 0 else i}.example"
+            writer.writerow([site, f"https://{site}/login", f"user{i}@example.com",
+                             f"pw-{i:08d}", "" if i % 20 else "recovery codes in the safe"])
+
+
+def one_at_a_time(vault_path, csv_path):
+    store, _ = VaultStore.create(vault_path)
+    start = time.perf_counter()
+    with open(csv_path, encoding="utf-8", newline="") as f:
+        reader = csv.reader(f)
+        next(reader)
+        for _, (name, url, username, password, _) in zip(range(ONE_AT_A_TIME), reader):
+            store.put(name, AccountRecord.create(password, username, url))
+            store.save()
+    return time.perf_counter() - start
+
+
+def main(row_count):
+    directory = tempfile.mkdtemp()
+    try:
+        csv_path = os.path.join(directory, "export.csv")
+        write_export(csv_path, row_count)
+
+        store, _ = VaultStore.create(os.path.join(directory, "import.vault"))
+        stats, _ = import_csv(store, csv_path)
+        imported = stats["seconds"]
+        write = store.history[-1]["seconds"]
+        stats, _ = import_csv(store, csv_path)
+        again = stats["seconds"]
+
+        single = one_at_a_time(os.path.join(directory, "single.vault"), csv_path)
+
+        print(f"rows                {row_count}")
+        print(f"import s            {imported:.2f}  ({write:.2f} of it writing)")
+        print(f"again s             {again:.2f}")
+        print(f"one at a time s     {single * row_count / ONE_AT_A_TIME:.0f}  (extrapolated, a lower bound)")
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_ROWS)
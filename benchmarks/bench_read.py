@@ -0,0 +1,106 @@
+# bench_read.py
+"""Allocations of loading a vault through mmap versus plain reads.
+
+Run from the repository root:
+
+    python benchmarks/bench_read.py [record counts...]
+
+Each size is loaded with the file memory-mapped and again with mmap
+disabled, which is the f.read() path. Large allocations are found by
+sampling tracemalloc after every bytecode executed in file_utils: a rise
+of at least LARGE_ALLOCATION bytes, including memory freed again within
+the same step, counts as one large buffer. Times come from a separate
+untraced run.
+"""
+import os
+import sys
+import shutil
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import file_utils  # noqa: E402
+from account_record import normalize_accounts  # noqa: E402
+from file_utils import VaultFileManager, _write_snapshot  # noqa: E402
+
+DEFAULT_SIZES = (1000, 10000, 50000)
+LARGE_ALLOCATION = 64 << 10
+
+
+def make_vault(file_path, record_count):
+    """Writes a vault of generated records."""
+    accounts = {
+        f"account-{i:07d}": {
+            "password": f"pw-{i * 7919 % 1000003:x}-secret",
+            "email": f"user{i % 5000}@example.com",
+            "website": f"https://site{i % 800}.example.org/login",
+            "created": "2024-01-01 12:00:00",
+        }
+        for i in range(record_count)
+    }
+    _write_snapshot(file_path, normalize_accounts(accounts))
+
+
+def count_large_allocations(fn, *args):
+    """Returns (large allocations, bytes in them) of one call."""
+    large = [0, 0]
+    last = [0]
+
+    def trace_opcodes(frame, event, arg):
+        if event == "opcode":
+            current, peak = tracemalloc.get_traced_memory()
+            if peak - last[0] >= LARGE_ALLOCATION:
+                large[0] += 1
+                large[1] += peak - last[0]
+            tracemalloc.reset_peak()
+            last[0] = current
+        return trace_opcodes
+
+    def trace_calls(frame, event, arg):
+        if frame.f_code.co_filename == file_utils.__file__:
+            frame.f_trace_opcodes = True
+            return trace_opcodes
+        return None
+
+    tracemalloc.start()
+    sys.settrace(trace_calls)
+    try:
+        fn(*args)
+    finally:
+        sys.settrace(None)
+        tracemalloc.stop()
+    return large[0], large[1]
+
+
+def load(file_path):
+    accounts, error = VaultFileManager.try_load_vault_file(file_path)
+    assert accounts is not None, error
+
+
+def main(sizes):
+    directory = tempfile.mkdtemp()
+    mmap_module = file_utils.mmap
+    try:
+        print(f"{'records':>8} {'file MB':>8}  {'path':<6} {'large allocs':>12} "
+              f"{'alloc MB':>9} {'time s':>7}")
+        for record_count in sizes:
+            file_path = os.path.join(directory, f"bench{record_count}.vault")
+            make_vault(file_path, record_count)
+            file_size = os.path.getsize(file_path)
+            for label, module in (("read", None), ("mmap", mmap_module)):
+                file_utils.mmap = module
+                start = time.perf_counter()
+                load(file_path)
+                elapsed = time.perf_counter() - start
+                count, allocated = count_large_allocations(load, file_path)
+                print(f"{record_count:>8} {file_size / 1e6:>8.1f}  {label:<6} {count:>12} "
+                      f"{allocated / 1e6:>9.1f} {elapsed:>7.3f}")
+    finally:
+        file_utils.mmap = mmap_module
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES)
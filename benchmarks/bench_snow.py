@@ -0,0 +1,99 @@
+# bench_snow.py
+"""CPU time per frame of the snowflake animation.
+
+Run from the repository root:
+
+    python benchmarks/bench_snow.py [flake counts...]
+
+Each frame moves every flake and draws it into a window-sized image, as
+one timer tick of AccountManager does, without the background. The
+per-object rows replay the former implementation, one Python object per
+flake with a random drift call and a new brush per flake and frame, as
+the baseline. Times are the best of three runs of FRAMES frames.
+"""
+import os
+import sys
+import random
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtCore import QPoint, Qt  # noqa: E402
+from PyQt6.QtGui import QBrush, QColor, QGuiApplication, QImage, QPainter  # noqa: E402
+from snowfall import SnowField, numpy  # noqa: E402
+
+DEFAULT_COUNTS = (150, 1000)
+FRAMES = 500
+REPEATS = 3
+WIDTH, HEIGHT = 1100, 700
+
+
+class _Flake:
+    """The former per-object flake."""
+
+    def __init__(self):
+        self.x = random.randint(0, WIDTH)
+        self.y = random.randint(0, HEIGHT)
+        self.size = random.randint(1, 4)
+        self.speed = random.uniform(0.5, 2.5)
+        self.opacity = random.randint(30, 180)
+
+    def fall(self):
+        self.y += self.speed
+        self.x += random.uniform(-0.5, 0.5)
+        if self.y > HEIGHT:
+            self.y = 0
+            self.x = random.randint(0, WIDTH)
+
+
+def per_object_frames(image, count):
+    flakes = [_Flake() for _ in range(count)]
+    for _ in range(FRAMES):
+        for flake in flakes:
+            flake.fall()
+        painter = QPainter(image)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        for flake in flakes:
+            painter.setBrush(QBrush(QColor(255, 255, 255, flake.opacity)))
+            painter.setPen(Qt.PenStyle.NoPen)
+            painter.drawEllipse(QPoint(int(flake.x), int(flake.y)), flake.size, flake.size)
+        painter.end()
+
+
+def snowfield_frames(image, count):
+    field = SnowField(count)
+    field.reset(WIDTH, HEIGHT)
+    for _ in range(FRAMES):
+        field.step()
+        painter = QPainter(image)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        field.paint(painter)
+        painter.end()
+
+
+def frame_time(fn, image, count):
+    """Returns the fastest per-frame time of REPEATS runs, in microseconds."""
+    best = None
+    for _ in range(REPEATS):
+        start = time.process_time()
+        fn(image, count)
+        elapsed = time.process_time() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best / FRAMES * 1e6
+
+
+def main(counts):
+    app = QGuiApplication.instance() or QGuiApplication([])  # noqa: F841
+    image = QImage(WIDTH, HEIGHT, QImage.Format.Format_ARGB32_Premultiplied)
+    image.fill(0)
+    print(f"arrays: {'numpy' if numpy is not None else 'stdlib array'}")
+    print(f"{'flakes':>7}  {'per-object us':>14} {'SnowField us':>13} {'speedup':>8}")
+    for count in counts:
+        before = frame_time(per_object_frames, image, count)
+        after = frame_time(snowfield_frames, image, count)
+        print(f"{count:>7}  {before:>14.1f} {after:>13.1f} {before / after:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or DEFAULT_COUNTS)
@@ -0,0 +1,73 @@
+# bench_theme.py
+"""Theme switch latency of the main window.
+
+Run from the repository root:
+
+    python benchmarks/bench_theme.py [switches]
+
+Switch is the time spent in the handler, until control returns to the
+event loop; painted adds the events that follow until the window has
+been repainted in the new theme. The stylesheet rows replay the former
+switch, formatting the theme's stylesheet and setting it on the window,
+then repainting synchronously, as the baseline. Times are medians.
+"""
+import os
+import sys
+import shutil
+import tempfile
+import time
+from statistics import median
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtWidgets import QApplication  # noqa: E402
+import main as vaultix  # noqa: E402
+from themes import STYLESHEET  # noqa: E402
+
+DEFAULT_SWITCHES = 20
+
+
+def stylesheet_switch(window):
+    """The former apply_theme: a new stylesheet on the window and a synchronous repaint."""
+    window.current_theme = "light" if window.current_theme == "dark" else "dark"
+    window.theme = window.themes.get(window.current_theme)
+    window.setStyleSheet(STYLESHEET.format(**window.theme.colors))
+    window.display_account_details()
+    window.background_cache = None
+    window.repaint()
+
+
+def measure(app, fn, window, switches):
+    handler = []
+    painted = []
+    for _ in range(switches):
+        start = time.perf_counter()
+        fn(window)
+        returned = time.perf_counter()
+        app.processEvents()
+        handler.append((returned - start) * 1000)
+        painted.append((time.perf_counter() - start) * 1000)
+    return median(handler), median(painted)
+
+
+def main(switches):
+    app = QApplication.instance() or QApplication([])
+    directory = tempfile.mkdtemp()
+    try:
+        vaultix.DATABASE_DIR = directory
+        print(f"{'':>11} {'switch ms':>10} {'painted ms':>11}")
+        for label, fn in (("stylesheet", stylesheet_switch),
+                          ("engine", vaultix.AccountManager.toggle_theme)):
+            window = vaultix.AccountManager()
+            window.show()
+            app.processEvents()
+            handler, painted = measure(app, fn, window, switches)
+            print(f"{label:>11} {handler:>10.2f} {painted:>11.2f}")
+            window.close()
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_SWITCHES)
@@ -0,0 +1,71 @@
+# bench_unlock.py
+"""Cost of unlocking and reading an encrypted vault against a plain one.
+
+Run from the repository root:
+
+    python benchmarks/bench_unlock.py [record count]
+
+Unlock covers VaultFileManager.unlock_vault, the header read and one
+scrypt run, next to scrypt alone. Load times cover
+VaultFileManager.try_load_vault_file, which leaves encrypted records
+sealed; open times decrypting one record and every record. Every time
+is the best of three runs, unlock times are measured on a fresh key.
+"""
+import os
+import sys
+import shutil
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_codecs import best_time, load, make_accounts  # noqa: E402
+from file_utils import VaultFileManager, _write_snapshot  # noqa: E402
+from vault_crypto import SCRYPT_LOG_N, SCRYPT_P, SCRYPT_R, VaultKey, _derive  # noqa: E402
+
+DEFAULT_SIZE = 100000
+PASSWORD = "correct horse battery staple"
+
+
+def unlock(file_path, key):
+    key.lock()
+    unlocked, error = VaultFileManager.unlock_vault(file_path, PASSWORD)
+    assert unlocked, error
+
+
+def open_all(accounts):
+    for account_name, record in accounts.items():
+        record.unsealed(account_name)
+
+
+def main(record_count):
+    directory = tempfile.mkdtemp()
+    try:
+        accounts = make_accounts(record_count)
+        plain_path = os.path.join(directory, "plain.vault")
+        sealed_path = os.path.join(directory, "sealed.vault")
+        _write_snapshot(plain_path, accounts)
+        key = VaultKey.create(PASSWORD)
+        encode = best_time(_write_snapshot, sealed_path, accounts, None, None, key)
+
+        sealed, error = VaultFileManager.try_load_vault_file(sealed_path)
+        assert sealed is not None, error
+        name = next(iter(sealed))
+
+        print(f"records            {record_count}")
+        print(f"scrypt log2(n)     {SCRYPT_LOG_N}")
+        print(f"plain MB           {os.path.getsize(plain_path) / 1e6:.2f}")
+        print(f"encrypted MB       {os.path.getsize(sealed_path) / 1e6:.2f}")
+        print(f"encrypt+save s     {encode:.3f}")
+        kdf = best_time(_derive, PASSWORD, os.urandom(16), SCRYPT_LOG_N, SCRYPT_R, SCRYPT_P)
+        print(f"scrypt alone s     {kdf:.3f}")
+        print(f"unlock s           {best_time(unlock, sealed_path, key):.3f}")
+        print(f"load plain s       {best_time(load, plain_path):.3f}")
+        print(f"load encrypted s   {best_time(load, sealed_path):.3f}")
+        print(f"open one ms        {best_time(sealed[name].unsealed, name) * 1000:.3f}")
+        print(f"open all s         {best_time(open_all, sealed):.3f}")
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_SIZE)
@@ -0,0 +1,246 @@
+# csv_import.py
+"""Imports the CSV exports of browsers and password managers into a vault.
+
+Rows are read one at a time, so memory does not grow with the file
+beyond the records added to the vault, and every imported account is
+saved with one write at the end (see VaultStore.batch). A failed or
+cancelled import leaves the vault as it was.
+
+The layout is recognised from the header row, or given by name. Rows
+with a name that is already taken follow the conflict policy: skip keeps
+the existing account, replace overwrites it and rename adds the row as
+"name (username)", or "name (2)", "name (3)" and so on. Rows with the
+same login as the account they collide with are always skipped.
+"""
+import os
+import csv
+import time
+from urllib.parse import urlsplit
+
+from account_record import AccountRecord
+
+# Header columns of each layout by record field, compared case-insensitively.
+# Username columns fill the email field, notes and one-time password secrets
+# are kept as extra keys of the record.
+CSV_LAYOUTS = {
+    "vaultix": {"name": "name", "password": "password", "email": "email", "website": "website"},
+    # Chrome, Edge, Brave, Opera and Vivaldi
+    "chrome": {"name": "name", "website": "url", "email": "username", "password": "password",
+               "notes": "note"},
+    "firefox": {"website": "url", "email": "username", "password": "password"},
+    # Safari and 1Password
+    "safari": {"name": "title", "website": "url", "email": "username", "password": "password",
+               "notes": "notes", "totp": "otpauth"},
+    "bitwarden": {"name": "name", "website": "login_uri", "email": "login_username",
+                  "password": "login_password", "notes": "notes", "totp": "login_totp"},
+    "lastpass": {"name": "name", "website": "url", "email": "username", "password": "password",
+                 "notes": "extra", "totp": "totp"},
+    "keepassxc": {"name": "title", "website": "url", "email": "username", "password": "password",
+                  "notes": "notes", "totp": "totp"},
+    "keepass": {"name": "account", "website": "web site", "email": "login name",
+                "password": "password", "notes": "comments"},
+    "dashlane": {"name": "title", "website": "url", "email": "username", "password": "password",
+                 "notes": "note", "totp": "otpsecret"},
+}
+CSV_FIELDS = ("name", "password", "email", "website", "notes", "totp")
+# Fields stored in AccountRecord.extra
+_EXTRA_FIELDS = ("notes", "totp")
+
+CONFLICT_POLICIES = ("skip", "replace", "rename")
+DEFAULT_CONFLICT = "rename"
+
+# Rows between two progress reports
+PROGRESS_ROWS = 10000
+# Invalid rows reported by line number, the rest are only counted
+MAX_REPORTED_ERRORS = 100
+
+
+class ImportCancelled(Exception):
+    """Raised inside an import when its progress callback asks to stop."""
+
+
+def detect_layout(header):
+    """Returns the name of the layout matching the most columns of a header row, or None.
+
+    A layout matches when the header holds every one of its columns.
+    """
+    columns = {column.strip().lower() for column in header}
+    best, best_count = None, 0
+    for name, layout in CSV_LAYOUTS.items():
+        if len(layout) > best_count and set(layout.values()) <= columns:
+            best, best_count = name, len(layout)
+    return best
+
+
+def column_positions(header, layout):
+    """Returns {field: column index} for the columns of a layout found in the header."""
+    positions = {column.strip().lower(): index for index, column in enumerate(header)}
+    return {field: positions[column.strip().lower()] for field, column in layout.items()
+            if column.strip().lower() in positions}
+
+
+def _website_name(website):
+    """Returns the host of a URL without "www.", the name of accounts exported without one."""
+    host = urlsplit(website if "//" in website else "//" + website).hostname or ""
+    return host[4:] if host.startswith("www.") else host
+
+
+def _same(existing, record):
+    """Checks whether an existing account holds the same login as an imported record."""
+    return existing is not None and existing.password == record.password \
+        and existing.email == record.email and existing.website == record.website
+
+
+def _unused_name(name, record, find, taken, suffixes):
+    """Returns a free name for a record whose name is taken, or None if it is already there.
+
+    The username is tried first, "site (user)", then numbers; suffixes
+    remembers the last number used per name.
+    """
+    if record.email:
+        candidate = f"{name} ({record.email})"
+        if not taken(candidate):
+            return candidate
+        if _same(find(candidate), record):
+            return None
+        name = candidate
+
+    suffix = suffixes.get(name, 1)
+    while True:
+        suffix += 1
+        candidate = f"{name} ({suffix})"
+        if not taken(candidate):
+            suffixes[name] = suffix
+            return candidate
+
+
+def import_csv(store, file_path, layout=None, columns=None, conflict=DEFAULT_CONFLICT,
+               progress=None):
+    """Imports the accounts of a CSV file into a VaultStore and saves them with one write.
+
+    layout names an entry of CSV_LAYOUTS, by default it is recognised from
+    the header; columns ({field: header column}) overrides single columns
+    of it. progress(rows, bytes_read, total_bytes) is called every
+    PROGRESS_ROWS rows and once more before the write, and may return
+    False to cancel.
+
+    Returns (stats, error). stats counts the rows read and the accounts
+    added, replaced, renamed and skipped, and lists the first invalid
+    rows as (line, message); nothing is saved if there is an error.
+    """
+    if conflict not in CONFLICT_POLICIES:
+        return None, f"Unknown conflict policy '{conflict}'"
+    if layout is not None and layout not in CSV_LAYOUTS:
+        return None, f"Unknown CSV layout '{layout}'"
+    if columns and not set(columns) <= set(CSV_FIELDS):
+        return None, f"Unknown fields: {', '.join(sorted(set(columns) - set(CSV_FIELDS)))}"
+
+    stats = {"layout": layout, "rows": 0, "added": 0, "replaced": 0, "renamed": 0,
+             "skipped": 0, "invalid": 0, "errors": [], "seconds": 0.0}
+    start = time.perf_counter()
+    try:
+        total_bytes = os.path.getsize(file_path)
+        # utf-8-sig drops the byte order mark spreadsheet exports start with
+        with open(file_path, encoding="utf-8-sig", newline="") as f:
+            reader = csv.reader(f)
+            header = next(reader, None)
+            if header is None:
+                return None, "The file is empty"
+            if layout is None:
+                stats["layout"] = layout = detect_layout(header)
+                if layout is None and not columns:
+                    return None, "Unrecognised CSV layout, give the layout or the columns"
+            positions = column_positions(header, dict(CSV_LAYOUTS.get(layout, {}), **(columns or {})))
+            if "password" not in positions:
+                return None, "The file has no password column"
+            imported = _read_rows(
+                reader, store.accounts, positions, conflict, stats,
+                progress and (lambda rows: progress(rows, f.buffer.tell(), total_bytes)))
+        if progress is not None and progress(stats["rows"], total_bytes, total_bytes) is False:
+            raise ImportCancelled()
+
+        # The vault changes only now, with one write
+        with store.batch():
+            store.put_many(imported)
+    except ImportCancelled:
+        return None, "Import cancelled"
+    except (OSError, ValueError, csv.Error) as e:
+        return None, str(e)
+    finally:
+        stats["seconds"] = time.perf_counter() - start
+    return stats, ""
+
+
+def _read_rows(reader, accounts, positions, conflict, stats, progress):
+    """Returns the accounts to add for the rows of a CSV reader, counting them in stats.
+
+    accounts are those of the vault; it is not changed.
+    """
+    imported = {}
+    created = AccountRecord.create("").created
+    name_at = positions.get("name")
+    password_at = positions["password"]
+    email_at = positions.get("email")
+    website_at = positions.get("website")
+    extra_at = [(field, positions[field]) for field in _EXTRA_FIELDS if field in positions]
+    width = max(positions.values()) + 1
+    suffixes = {}  # Format: {name: last suffix used}, for renaming
+
+    def find(account_name):
+        """Returns the readable account a name is taken by, None if free or locked."""
+        record = imported.get(account_name) or accounts.get(account_name)
+        return None if record is None else record.unsealed(account_name)
+
+    def taken(account_name):
+        return account_name in imported or account_name in accounts
+
+    rows = added = replaced = renamed = skipped = 0
+    for row in reader:
+        rows += 1
+        if progress is not None and rows % PROGRESS_ROWS == 0 and progress(rows) is False:
+            raise ImportCancelled()
+        if len(row) < width:
+            if not any(row):
+                rows -= 1  # Blank line
+                continue
+            row += [""] * (width - len(row))
+
+        password = row[password_at]
+        email = row[email_at].strip() if email_at is not None else ""
+        website = row[website_at].strip() if website_at is not None else ""
+        name = row[name_at].strip() if name_at is not None else ""
+        if not name:
+            name = _website_name(website) or email
+        if not password or not name:
+            stats["invalid"] += 1
+            if len(stats["errors"]) < MAX_REPORTED_ERRORS:
+                stats["errors"].append(
+                    (reader.line_num, "no password" if not password else "no account name"))
+            continue
+
+        extra = None
+        for field, index in extra_at:
+            if row[index]:
+                extra = extra or {}
+                extra[field] = row[index]
+        record = AccountRecord(password, email, website, created, extra)
+
+        if name in imported or name in accounts:
+            if conflict == "skip" or _same(find(name), record):
+                skipped += 1
+                continue
+            if conflict == "rename":
+                name = _unused_name(name, record, find, taken, suffixes)
+                if name is None:
+                    skipped += 1
+                    continue
+                renamed += 1
+            else:
+                replaced += 1
+        else:
+            added += 1
+        imported[name] = record
+
+    stats.update(rows=rows, added=added, replaced=replaced, renamed=renamed,
+                 skipped=skipped)
+    return imported
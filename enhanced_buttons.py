@@ -1,11 +1,89 @@
 # enhanced_buttons.py
-from PyQt6.QtWidgets import QPushButton, QGraphicsDropShadowEffect, QLabel
-from PyQt6.QtGui import QColor, QFont, QIcon
-from PyQt6.QtCore import Qt, QSize, QPropertyAnimation, QEasingCurve, pyqtProperty, QRect, QTimer
+from math import ceil
+from PyQt6.QtWidgets import QApplication, QPushButton, QLabel
+from PyQt6.QtGui import QColor, QFont, QIcon, QPainter, QPixmap
+from PyQt6.QtCore import (
+    Qt, QSize, QPropertyAnimation, QEasingCurve, pyqtProperty, QRect, QRectF, QMargins, QTimer
+)
+
+# Face geometry of text buttons
+BUTTON_RADIUS = 8
+BUTTON_PADDING = 10
+ICON_SPACING = 6
+# Duration of the color change between hover, press and normal
+COLOR_ANIMATION_MS = 120
+# Shadow below every face: how far it fades out, its downward offset and darkest alpha
+SHADOW_BLUR = 4
+SHADOW_OFFSET = 2
+SHADOW_ALPHA = 80
+
+# Shadow sheets by (corner radius, device pixel ratio, blur), shared by every button
+_SHADOWS = {}
+
+
+def _shadow_sheet(radius, ratio, blur):
+    """Returns the pre-rendered shadow of a rounded rectangle, sliced by draw_shadow()."""
+    key = (radius, ratio, blur)
+    sheet = _SHADOWS.get(key)
+    if sheet is None:
+        side = 2 * (ceil(radius) + blur) + 1
+        sheet = QPixmap(ceil(side * ratio), ceil(side * ratio))
+        sheet.setDevicePixelRatio(ratio)
+        sheet.fill(Qt.GlobalColor.transparent)
+        painter = QPainter(sheet)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.setPen(Qt.PenStyle.NoPen)
+
+        # Stacked translucent layers fade from SHADOW_ALPHA to nothing over blur pixels
+        layer_alpha = round(255 * (1 - (1 - SHADOW_ALPHA / 255) ** (1 / blur)))
+        painter.setBrush(QColor(0, 0, 0, layer_alpha))
+        for inset in range(blur):
+            grow = blur - inset
+            painter.drawRoundedRect(QRectF(inset, inset, side - 2 * inset, side - 2 * inset),
+                                    radius + grow, radius + grow)
+        painter.end()
+        _SHADOWS[key] = sheet
+    return sheet
+
+
+def draw_shadow(painter, face, radius, blur=SHADOW_BLUR, offset=SHADOW_OFFSET):
+    """Draws the shadow of a rounded face from the shared sheet, stretching its middle slices.
+
+    The shadow reaches blur pixels past the face, moved down by offset.
+    """
+    ratio = painter.device().devicePixelRatioF()
+    sheet = _shadow_sheet(radius, ratio, blur)
+    side = sheet.width() / ratio
+    corner = ceil(radius) + blur
+    target = QRectF(face).translated(0, offset).adjusted(-blur, -blur, blur, blur)
+
+    sources = (0, corner, side - corner, side)
+    columns = (target.left(), target.left() + corner, target.right() - corner, target.right())
+    rows = (target.top(), target.top() + corner, target.bottom() - corner, target.bottom())
+    for row in range(3):
+        for column in range(3):
+            painter.drawPixmap(
+                QRectF(columns[column], rows[row],
+                       columns[column + 1] - columns[column], rows[row + 1] - rows[row]),
+                sheet,
+                QRectF(sources[column] * ratio, sources[row] * ratio,
+                       (sources[column + 1] - sources[column]) * ratio,
+                       (sources[row + 1] - sources[row]) * ratio))
 
 
 class EnhancedButton(QPushButton):
-    """An enhanced button with modern styling and animation effects."""
+    """An enhanced button with modern styling and animation effects.
+
+    The face, label and shadow are painted directly: a state change only
+    animates the color property and repaints, no stylesheet is parsed and
+    no graphics effect renders the button offscreen.
+    """
+
+    # Shadow of the face and the room kept around it
+    shadow_blur = SHADOW_BLUR
+    shadow_offset = SHADOW_OFFSET
+    shadow_margins = QMargins(shadow_blur, shadow_blur - shadow_offset,
+                              shadow_blur, shadow_blur + shadow_offset)
 
     def __init__(self, text="", parent=None, icon=None, style="primary"):
         super().__init__(text, parent)
@@ -54,54 +132,107 @@ class EnhancedButton(QPushButton):
             self.setIcon(icon)
             self.setIconSize(QSize(20, 20))
 
+        # Labels are bold 14px, the face and shadow are drawn in paintEvent
+        font = self.font()
+        font.setBold(True)
+        font.setPixelSize(14)
+        self.setFont(font)
+
         # Default colors based on style
-        self._base_color = self.colors[style]["base"]
-        self._hover_color = self.colors[style]["hover"]
-        self._pressed_color = self.colors[style]["pressed"]
-        self._text_color = self.colors[style]["text"]
+        self._base_color = QColor(self.colors[style]["base"])
+        self._hover_color = QColor(self.colors[style]["hover"])
+        self._pressed_color = QColor(self.colors[style]["pressed"])
+        self._text_color = QColor(self.colors[style]["text"])
 
-        # Current background color, will be animated
-        self._color = self._base_color
+        # Current background color, animated between the state colors
+        self._color = QColor(self._base_color)
+        self._animation = QPropertyAnimation(self, b"color", self)
+        self._animation.setDuration(COLOR_ANIMATION_MS)
+        self._animation.setEasingCurve(QEasingCurve.Type.OutCubic)
 
-        # Shadow effect
-        self._create_shadow()
+    def get_color(self):
+        return self._color
 
-        # Setup style
-        self.update_style()
+    def set_color(self, color):
+        self._color = QColor(color)
+        self.update()
+
+    color = pyqtProperty(QColor, get_color, set_color)
+
+    def face_rect(self):
+        """Returns the area of the button face, inside the room kept for its shadow."""
+        return self.rect().marginsRemoved(self.shadow_margins)
 
-    def _create_shadow(self):
-        """Creates drop shadow effect for the button."""
-        shadow = QGraphicsDropShadowEffect(self)
-        shadow.setBlurRadius(15)
-        shadow.setColor(QColor(0, 0, 0, 80))
-        shadow.setOffset(0, 2)
-        self.setGraphicsEffect(shadow)
+    def face_radius(self, face):
+        """Returns the corner radius of the face."""
+        return BUTTON_RADIUS
+
+    def sizeHint(self):
+        """Size of the label and icon plus padding and shadow."""
+        metrics = self.fontMetrics()
+        width = metrics.horizontalAdvance(self.text())
+        height = metrics.height()
+        if not self.icon().isNull():
+            width += self.iconSize().width() + (ICON_SPACING if self.text() else 0)
+            height = max(height, self.iconSize().height())
+        margins = self.shadow_margins
+        return QSize(width + 2 * BUTTON_PADDING + margins.left() + margins.right(),
+                     height + 2 * BUTTON_PADDING + margins.top() + margins.bottom())
+
+    def minimumSizeHint(self):
+        return self.sizeHint()
+
+    def paintEvent(self, event):
+        """Draws the shared shadow, the face in the current color, then the icon and label."""
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        face = self.face_rect()
+        radius = self.face_radius(face)
+        draw_shadow(painter, face, radius, self.shadow_blur, self.shadow_offset)
+
+        painter.setPen(Qt.PenStyle.NoPen)
+        painter.setBrush(self._color)
+        painter.drawRoundedRect(QRectF(face), radius, radius)
+
+        text = self.text()
+        label = face
+        if not self.icon().isNull():
+            size = self.iconSize()
+            text_width = self.fontMetrics().horizontalAdvance(text) if text else 0
+            spacing = ICON_SPACING if text else 0
+            left = face.center().x() - (size.width() + spacing + text_width) // 2
+            self.icon().paint(painter, QRect(
+                left, face.center().y() - size.height() // 2, size.width(), size.height()))
+            label = QRect(left + size.width() + spacing, face.top(), text_width, face.height())
+        if text:
+            painter.setPen(self._text_color)
+            painter.drawText(label, Qt.AlignmentFlag.AlignCenter, text)
+
+    def state_color(self):
+        """Returns the background color of the current state."""
+        if self.pressed:
+            return self._pressed_color
+        return self._hover_color if self.hovered else self._base_color
 
     def update_style(self):
-        """Updates button stylesheet based on current state."""
-        self.setStyleSheet(f"""
-            QPushButton {{
-                background-color: {self._color};
-                color: {self._text_color};
-                border: none;
-                border-radius: 8px;
-                padding: 10px;
-                font-weight: bold;
-                font-size: 14px;
-            }}
-        """)
+        """Animates the button to the color of its current state."""
+        self._animate_to(self.state_color())
+
+    def _animate_to(self, color):
+        self._animation.stop()
+        self._animation.setStartValue(self._color)
+        self._animation.setEndValue(QColor(color))
+        self._animation.start()
 
     def enterEvent(self, event):
         """Mouse enter event - hover state."""
         self.hovered = True
-        self._color = self._hover_color
         self.update_style()
         super().enterEvent(event)
 
     def leaveEvent(self, event):
         """Mouse leave event - normal state."""
         self.hovered = False
-        self._color = self._base_color
         self.update_style()
         super().leaveEvent(event)
 
@@ -109,7 +240,6 @@ class EnhancedButton(QPushButton):
         """Mouse press event - pressed state."""
         if event.button() == Qt.MouseButton.LeftButton:
             self.pressed = True
-            self._color = self._pressed_color
             self.update_style()
         super().mousePressEvent(event)
 
@@ -117,7 +247,6 @@ class EnhancedButton(QPushButton):
         """Mouse release event - return to hover/normal state."""
         if event.button() == Qt.MouseButton.LeftButton:
             self.pressed = False
-            self._color = self._hover_color if self.hovered else self._base_color
             self.update_style()
         super().mouseReleaseEvent(event)
 
@@ -125,34 +254,35 @@ class EnhancedButton(QPushButton):
         """Changes button style."""
         if style_type in self.colors:
             self.style_type = style_type
-            self._base_color = self.colors[style_type]["base"]
-            self._hover_color = self.colors[style_type]["hover"]
-            self._pressed_color = self.colors[style_type]["pressed"]
-            self._text_color = self.colors[style_type]["text"]
-            self._color = self._base_color if not self.hovered else self._hover_color
+            self._base_color = QColor(self.colors[style_type]["base"])
+            self._hover_color = QColor(self.colors[style_type]["hover"])
+            self._pressed_color = QColor(self.colors[style_type]["pressed"])
+            self._text_color = QColor(self.colors[style_type]["text"])
             self.update_style()
 
     def flash(self, color="#50FA7B", duration=300):
         """Creates a flash animation effect on the button."""
-        original_color = self._color
-        self._color = color
-        self.update_style()
+        self._animate_to(color)
 
-        # Reset color after delay
-        QTimer.singleShot(duration, lambda: self._reset_color(original_color))
-
-    def _reset_color(self, color):
-        """Helper method to reset button color."""
-        self._color = color
-        self.update_style()
+        # Back to the state color after the delay
+        QTimer.singleShot(duration, self.update_style)
 
 
 class IconButton(EnhancedButton):
-    """A button that displays only an icon."""
+    """A round button that displays only an icon."""
+
+    # A tighter shadow, the round face fills most of the fixed size
+    shadow_blur = 2
+    shadow_offset = 1
+    shadow_margins = QMargins(shadow_blur, shadow_blur - shadow_offset,
+                              shadow_blur, shadow_blur + shadow_offset)
 
     def __init__(self, icon, tooltip="", parent=None, style="primary", size=32):
         super().__init__("", parent, icon, style)
 
+        # Icons and emoji use the regular font
+        self.setFont(QApplication.font())
+
         # Set fixed size
         self.setFixedSize(QSize(size, size))
 
@@ -163,17 +293,6 @@ class IconButton(EnhancedButton):
         # Center icon
         self.setIconSize(QSize(size-12, size-12))
 
-        # Update style for icon button
-        self.update_style()
-
-    def update_style(self):
-        """Updates button stylesheet for icon-only appearance."""
-        self.setStyleSheet(f"""
-            QPushButton {{
-                background-color: {self._color};
-                color: {self._text_color};
-                border: none;
-                border-radius: {self.width() // 2}px;  /* Makes it circular */
-                padding: 0px;
-            }}
-        """)
+    def face_radius(self, face):
+        """Makes the face circular."""
+        return min(face.width(), face.height()) / 2
@@ -1,75 +1,1516 @@
 # file_utils.py
 import os
+import re
+import sys
 import json
 import base64
-from PyQt6.QtWidgets import QFileDialog, QMessageBox
+import codecs
+import stat
+import time
+import zlib
+import struct
+import binascii
+import threading
+from array import array
+from contextlib import contextmanager
+from functools import partial
+from itertools import accumulate
+from collections import namedtuple, OrderedDict
+from itertools import islice
+from account_record import AccountRecord, SealedRecord, normalize_accounts, record_to_json
+from vault_crypto import KDF_BLOCK, vault_key, seal_accounts, unseal_accounts
+
+try:
+    import mmap
+except ImportError:  # Platforms without memory mapping read files instead
+    mmap = None
+try:
+    import lzma
+except ImportError:  # Optional in Python builds, the lzma codec is then unavailable
+    lzma = None
+try:
+    import bz2
+except ImportError:
+    bz2 = None
+
+# Vault file header: magic, format version, codec, flags, record count, payload length
+VAULT_MAGIC = b"VLTX"
+VAULT_FORMAT_VERSION = 1
+VAULT_HEADER = struct.Struct("<4sBBHIQ")
+# Header flag of vaults whose records are sealed one by one; the header is
+# followed by a vault_crypto.KDF_BLOCK and the payload comes after it
+FLAG_ENCRYPTED = 0x0001
+
+# Codecs of format 1 payloads, see register_vault_codec
+CODEC_BASE64_JSON = 0
+CODEC_JSON = 1
+CODEC_ZLIB = 2
+CODEC_LZMA = 3
+CODEC_BZ2 = 4
+CODEC_BINARY = 5
+# Codec of newly created vaults, override with VAULTIX_VAULT_CODEC; existing files keep theirs
+NEW_VAULT_CODEC = os.environ.get("VAULTIX_VAULT_CODEC", "base64-json")
+# Binary payload counts: records, distinct emails, distinct websites, length of the extras JSON
+BINARY_COUNTS = struct.Struct("<IIII")
+# lzma's default preset 6 encodes 100k records 24x slower for a third less size
+LZMA_PRESET = 1
+# Format 2 payloads are length-prefixed records followed by an index, see _encode_indexed_payload
+VAULT_FORMAT_INDEXED = 2
+VAULT_FORMATS = (VAULT_FORMAT_VERSION, VAULT_FORMAT_INDEXED)
+# Format of newly created vaults, override with VAULTIX_VAULT_FORMAT; existing files keep theirs
+NEW_VAULT_FORMAT = int(os.environ.get("VAULTIX_VAULT_FORMAT", VAULT_FORMAT_VERSION))
+
+# Indexed records: length, then the UTF-8 JSON array [name, record]
+INDEXED_RECORD = struct.Struct("<I")
+# Ends an indexed payload: index offset, length of its names JSON, CRC32 of the index, magic
+INDEX_FOOTER = struct.Struct("<QII4s")
+INDEX_MAGIC = b"VIDX"
+# Records decoded per json.loads call when reading an indexed vault in order
+INDEXED_BATCH = 1024
+
+# Journal records follow the payload: payload length, CRC32, then the changes
+JOURNAL_RECORD = struct.Struct("<II")
+# The journal is folded into a new snapshot once it passes either threshold
+JOURNAL_COMPACT_BYTES = 256 << 10
+JOURNAL_COMPACT_RATIO = 0.5
+
+# payload_offset is where the payload starts, vault_key the VaultKey of an encrypted vault
+VaultHeader = namedtuple(
+    "VaultHeader", "version codec flags record_count payload_length payload_offset vault_key")
+
+# Record positions of an indexed vault, see VaultFileManager.read_vault_index
+VaultIndex = namedtuple("VaultIndex", "positions changes vault_key")
+
+VaultCodec = namedtuple("VaultCodec", "codec_id name encode decode iter_decode")
+
+# What is kept about every scanned vault, names is None until first needed
+VaultInfo = namedtuple("VaultInfo", "key record_count names error")
+
+# Files above this size are never read, override with VAULTIX_MAX_VAULT_SIZE
+MAX_VAULT_SIZE = int(os.environ.get("VAULTIX_MAX_VAULT_SIZE", 256 << 20))
+# Bytes inspected to recognise a legacy headerless Base64 vault
+LEGACY_SNIFF_SIZE = 64
+
+# Decoded vaults kept in memory besides pinned ones, override with VAULTIX_RESIDENT_BYTES
+RESIDENT_VAULT_BYTES = int(os.environ.get("VAULTIX_RESIDENT_BYTES", 64 << 20))
+# Records measured when estimating the memory held by a decoded vault
+RESIDENT_SAMPLE_SIZE = 256
+
+# Encoded bytes read per step by the streaming decoder, see _iter_payload_members
+DECODE_CHUNK_SIZE = 1 << 20
+# Smaller files decode quickly enough in one call, larger ones are streamed
+INCREMENTAL_DECODE_THRESHOLD = 4 << 20
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+# Bytes the lenient Base64 decoder skips, e.g. line breaks of wrapped files
+_BASE64_IGNORED = bytes(
+    set(range(256)) - set(b"ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/="))
+
+# Serialises writers of the same file within this process
+_FILE_LOCKS = {}
+_FILE_LOCKS_GUARD = threading.Lock()
+# Bumped on every full rewrite so a running compaction can detect it
+_FILE_GENERATIONS = {}
+
+
+def _file_lock(file_path):
+    """Returns the lock guarding writes to a file."""
+    key = os.path.abspath(file_path)
+    with _FILE_LOCKS_GUARD:
+        return _FILE_LOCKS.setdefault(key, threading.Lock())
+
+
+def _bump_generation(file_path):
+    """Marks a file as fully rewritten; call with its lock held."""
+    key = os.path.abspath(file_path)
+    _FILE_GENERATIONS[key] = _FILE_GENERATIONS.get(key, 0) + 1
+
+
+def _generation(file_path):
+    """Returns the rewrite counter of a file."""
+    return _FILE_GENERATIONS.get(os.path.abspath(file_path), 0)
+
+
+@contextmanager
+def _mapped_view(f):
+    """Yields a read-only memoryview of a whole open file, backed by mmap.
+
+    Yields None for empty files, pipes and filesystems or platforms
+    without mmap support; callers then read the file instead. Slices of
+    the view should not outlive the with block.
+    """
+    mapped = None
+    if mmap is not None:
+        try:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, OSError):
+            pass
+
+    if mapped is None:
+        yield None
+        return
+
+    view = memoryview(mapped)
+    try:
+        yield view
+    finally:
+        view.release()
+        try:
+            mapped.close()
+        except BufferError:
+            pass  # A slice is still referenced, e.g. by a traceback; unmapped when collected
+
+
+def _iter_file_chunks(f, length=None):
+    """Reads DECODE_CHUNK_SIZE bytes at a time, to the end of the file or exactly length bytes."""
+    remaining = length
+    while remaining is None or remaining > 0:
+        data = f.read(DECODE_CHUNK_SIZE if remaining is None else min(DECODE_CHUNK_SIZE, remaining))
+        if not data:
+            if remaining is not None:
+                raise ValueError("Truncated vault payload")
+            break
+        if remaining is not None:
+            remaining -= len(data)
+        yield data
+
+
+def _iter_view_chunks(view):
+    """Splits a mapped payload into DECODE_CHUNK_SIZE slices, without copying."""
+    for start in range(0, len(view), DECODE_CHUNK_SIZE):
+        yield view[start:start + DECODE_CHUNK_SIZE]
+
+
+def _iter_base64_chunks(raw_chunks):
+    """Decodes Base64 arriving in chunks, skipping line breaks and other stray bytes.
+
+    A chunk of whole 4-character groups is decoded as it is, straight from
+    a memoryview slice. A chunk that does not decode to exactly 3 bytes per
+    4 characters holds line breaks, stray bytes or the final padding, and
+    is cleaned up first.
+    """
+    carry = b""
+    for data in raw_chunks:
+        if not carry and len(data) % 4 == 0:
+            try:
+                decoded = binascii.a2b_base64(data)
+            except binascii.Error:
+                decoded = None
+            if decoded is not None and len(decoded) == len(data) // 4 * 3:
+                yield decoded
+                continue
+
+        # Base64 decodes in groups of 4 characters, the rest waits for the next chunk
+        data = carry + bytes(data).translate(None, _BASE64_IGNORED)
+        usable = len(data) - len(data) % 4
+        carry = data[usable:]
+        yield base64.b64decode(data[:usable])
+
+    if carry:
+        yield base64.b64decode(carry)  # Raises the usual padding error
+
+
+def _iter_decompressed(decompressor, raw_chunks):
+    """Runs chunks through a zlib, lzma or bz2 decompressor, DECODE_CHUNK_SIZE bytes out per step."""
+    buffered = hasattr(decompressor, "needs_input")  # lzma and bz2 keep unread input themselves
+    for data in raw_chunks:
+        while data or (buffered and not decompressor.needs_input and not decompressor.eof):
+            yield decompressor.decompress(data, DECODE_CHUNK_SIZE)
+            data = b"" if buffered else decompressor.unconsumed_tail
+
+    if not decompressor.eof:
+        raise ValueError("Truncated vault payload")
+
+
+def _iter_text_chunks(byte_chunks):
+    """Decodes UTF-8 arriving in chunks, keeping characters split across chunks intact."""
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    for data in byte_chunks:
+        yield decoder.decode(data)
+    yield decoder.decode(b"", final=True)
+
+
+def _read_on(chunks, text, pos):
+    """Drops the parsed text before pos and appends the next chunk; returns (text, 0, eof)."""
+    for chunk in chunks:
+        if chunk:
+            return text[pos:] + chunk, 0, False
+    return text[pos:], 0, True
+
+
+def _iter_json_members(text_chunks):
+    """Yields the (key, value) pairs of a JSON object whose text arrives in chunks.
+
+    Only the unparsed rest of the current chunk is held, plus the member
+    being parsed when it straddles two chunks; such a member is parsed
+    again once the next chunk has been appended.
+    """
+    scan_value = json.JSONDecoder().scan_once
+    skip = _WHITESPACE.match
+    chunks = iter(text_chunks)
+    text, pos, eof = "", 0, False
+
+    while True:
+        pos = skip(text, pos).end()
+        if pos < len(text) or eof:
+            break
+        text, pos, eof = _read_on(chunks, text, pos)
+    if text[pos:pos + 1] != "{":
+        raise ValueError("Vault data is not a JSON object")
+    pos += 1
+
+    first = True
+    while True:
+        start = pos
+        try:
+            pos = skip(text, pos).end()
+            char = text[pos]
+            if char == "}":
+                pos += 1
+                break
+            if not first:
+                if char != ",":
+                    raise ValueError("Expected ',' or '}' in object")
+                pos = skip(text, pos + 1).end()
+                char = text[pos]
+            if char != '"':
+                raise ValueError("Expected a string key")
+
+            key, pos = json.decoder.scanstring(text, pos + 1)
+            pos = skip(text, pos).end()
+            if text[pos] != ":":
+                raise ValueError("Expected ':' after key")
+            value, pos = scan_value(text, skip(text, pos + 1).end())
+            if pos == len(text) and not eof:
+                raise IndexError  # A number or literal may go on in the next chunk
+        except (IndexError, StopIteration, json.JSONDecodeError) as e:
+            if not eof:
+                text, pos, eof = _read_on(chunks, text, start)
+                continue
+            if isinstance(e, json.JSONDecodeError):
+                raise
+            if isinstance(e, StopIteration):
+                raise ValueError("Expecting a JSON value") from None
+            raise ValueError("Vault data ends inside the JSON object") from None
+
+        yield key, value
+        first = False
+
+    while True:
+        if skip(text, pos).end() < len(text):
+            raise ValueError("Extra data after JSON object")
+        if eof:
+            break
+        text, pos, eof = _read_on(chunks, text, len(text))
+
+
+def _iter_payload_members(decoded_chunks):
+    """Streams a decoded Base64 JSON payload as (key, value) pairs.
+
+    Peak memory is a few DECODE_CHUNK_SIZE chunks instead of the encoded,
+    decoded and text copies of the whole payload. Each step is a short C
+    call, so other threads keep getting the interpreter lock while a
+    worker decodes a large vault.
+    """
+    return _iter_json_members(_iter_text_chunks(decoded_chunks))
+
+
+def _read_range(f, start, end):
+    """Reads the bytes between two file offsets."""
+    f.seek(start)
+    data = f.read(end - start)
+    if len(data) != end - start:
+        raise ValueError("Truncated vault payload")
+    return data
+
+
+def _slice_range(view, start, end):
+    """Returns the bytes between two file offsets of a mapped file, without copying."""
+    return view[start:end]
+
+
+def _read_index(read_range, header):
+    """Parses the index at the end of an indexed payload.
+
+    read_range(start, end) returns those bytes of the file. Returns the
+    names, record offsets and record lengths, in file order.
+    """
+    payload_end = header.payload_offset + header.payload_length
+    index_end = payload_end - INDEX_FOOTER.size
+    if index_end < header.payload_offset:
+        raise ValueError("Truncated vault index")
+    index_offset, names_length, crc, magic = INDEX_FOOTER.unpack(
+        read_range(index_end, payload_end))
+    if magic != INDEX_MAGIC or not header.payload_offset <= index_offset <= index_end:
+        raise ValueError("Corrupt vault index")
+
+    count = header.record_count
+    index = read_range(index_offset, index_end)
+    if len(index) != names_length + 12 * count or zlib.crc32(index) != crc:
+        raise ValueError("Corrupt vault index")
+
+    names = json.loads(str(index[:names_length], "utf-8", "surrogatepass"))
+    offsets = array("Q")
+    offsets.frombytes(index[names_length:names_length + 8 * count])
+    lengths = array("I")
+    lengths.frombytes(index[names_length + 8 * count:])
+    if sys.byteorder == "big":
+        offsets.byteswap()
+        lengths.byteswap()
+
+    if not isinstance(names, list) or len(names) != count:
+        raise ValueError("Vault record count does not match its header")
+    # Records are stored back to back in index order, before the index
+    if count and (offsets[0] < header.payload_offset + INDEXED_RECORD.size
+                  or offsets[-1] + lengths[-1] > index_offset
+                  or any(offsets[i] + lengths[i] >= offsets[i + 1] for i in range(count - 1))):
+        raise ValueError("Corrupt vault index")
+    return names, offsets, lengths
+
+
+def _iter_indexed_records(read_range, names, offsets, lengths):
+    """Yields the (name, JSON record) pairs of an indexed payload, in file order.
+
+    Reads and decodes INDEXED_BATCH records per step.
+    """
+    for start in range(0, len(names), INDEXED_BATCH):
+        end = min(start + INDEXED_BATCH, len(names))
+        base = offsets[start]
+        block = read_range(base, offsets[end - 1] + lengths[end - 1])
+        batch = json.loads(b"[" + b",".join(
+            block[offset - base:offset - base + length]
+            for offset, length in zip(offsets[start:end], lengths[start:end])) + b"]")
+
+        for name, pair in zip(names[start:end], batch):
+            if not isinstance(pair, list) or len(pair) != 2 or pair[0] != name:
+                raise ValueError("Vault index does not match its records")
+            yield name, pair[1]
+
+
+def _iter_vault_records(f, file_size, max_size):
+    """Yields the (name, AccountRecord) pairs of an open vault file.
+
+    The journal is read first; records it replaces are yielded with their
+    latest value after the snapshot, deleted ones are skipped. The file
+    is mapped where possible and read in chunks otherwise. Records of an
+    encrypted vault are yielded as SealedRecords.
+    """
+    header = _read_vault_header(f, file_size, max_size)
+    start = 0 if header is None else header.payload_offset
+    end = file_size if header is None else start + header.payload_length
+    key = None if header is None else header.vault_key
+
+    with _mapped_view(f) as view:
+        changes = {}
+        if header is not None:
+            if view is None:
+                f.seek(end)
+            for payload in _parse_journal(f.read() if view is None else view[end:])[0]:
+                changes.update(_normalize_changes(_decode_payload(payload), key))
+
+        codec = VAULT_CODECS[CODEC_BASE64_JSON if header is None else header.codec]
+        if header is not None and header.version == VAULT_FORMAT_INDEXED:
+            read_range = partial(_read_range, f) if view is None else partial(_slice_range, view)
+            members = _iter_indexed_records(read_range, *_read_index(read_range, header))
+        elif codec.iter_decode is None:
+            # The codec needs the whole payload at once
+            payload = _read_range(f, start, end) if view is None else view[start:end]
+            members = iter(codec.decode(payload).items())
+            del payload
+        elif view is None:
+            f.seek(start)
+            members = codec.iter_decode(
+                _iter_file_chunks(f, None if header is None else header.payload_length))
+        else:
+            members = codec.iter_decode(_iter_view_chunks(view[start:end]))
+
+        from_json = AccountRecord.from_json if key is None else partial(SealedRecord.from_json, key=key)
+        count = 0
+        for name, value in members:
+            count += 1
+            if name not in changes:
+                yield name, from_json(value)
+        del members
+
+    if header is not None and header.record_count != count:
+        raise ValueError("Vault record count does not match its header")
+    for name, record in changes.items():
+        if record is not None:
+            yield name, record
+
+
+def _load_vault_view(view, header):
+    """Decodes a whole vault held in memory into {name: AccountRecord}.
+
+    Works on slices of the view, so the payload is not copied before it
+    is decoded.
+    """
+    if header is None:
+        payload, journal = view, view[:0]
+    else:
+        end = header.payload_offset + header.payload_length
+        payload, journal = view[header.payload_offset:end], view[end:]
+    key = None if header is None else header.vault_key
+
+    if header is not None and header.version == VAULT_FORMAT_INDEXED:
+        read_range = partial(_slice_range, view)
+        json_data = dict(_iter_indexed_records(read_range, *_read_index(read_range, header)))
+    else:
+        json_data = VAULT_CODECS[CODEC_BASE64_JSON if header is None else header.codec].decode(payload)
+    if header is not None and header.record_count != len(json_data):
+        raise ValueError("Vault record count does not match its header")
+
+    # Records are normalized once here, readers never see the JSON shapes
+    accounts = normalize_accounts(json_data, key)
+    del json_data
+    for payload in _parse_journal(journal)[0]:
+        _apply_changes(accounts, _normalize_changes(_decode_payload(payload), key))
+    return accounts
+
+
+def _decode_payload(encoded_data):
+    """Decodes a Base64 JSON payload into a dictionary."""
+    # Try to decode Base64, a2b_base64 takes memoryview slices without copying them
+    decoded_data = binascii.a2b_base64(encoded_data)
+    # Try to load as JSON
+    json_data = json.loads(decoded_data.decode())
+
+    if not isinstance(json_data, dict):
+        raise ValueError("Invalid file format")
+    return json_data
+
+
+def _encode_payload(data):
+    """Encodes a dictionary as a Base64 JSON payload."""
+    return base64.b64encode(json.dumps(data, default=record_to_json).encode())
+
+
+def _encode_json(accounts):
+    """Encodes accounts as UTF-8 JSON."""
+    return json.dumps(accounts, default=record_to_json).encode()
+
+
+def _decode_json(data):
+    """Decodes UTF-8 JSON, from bytes or a memoryview, into a dictionary."""
+    json_data = json.loads(str(data, "utf-8"))
+    if not isinstance(json_data, dict):
+        raise ValueError("Invalid file format")
+    return json_data
+
+
+def _encode_binary(accounts):
+    """Encodes accounts column by column, the CODEC_BINARY payload.
+
+    BINARY_COUNTS is followed by little-endian arrays: the length of every
+    name, password, distinct email and distinct website, the email and
+    website number of every record and the packed creation times. Then
+    come the JSON of the extra keys by record number and the UTF-8 text of
+    all those strings. Emails and websites repeat a lot, so each is stored
+    once.
+    """
+    records = [value if isinstance(value, AccountRecord) else AccountRecord.from_json(value)
+               for value in accounts.values()]
+    email_ids = {}
+    website_ids = {}
+    emails = array("I", (email_ids.setdefault(record.email, len(email_ids)) for record in records))
+    websites = array("I", (website_ids.setdefault(record.website, len(website_ids)) for record in records))
+    created = array("Q", (record.created for record in records))
+    strings = list(accounts)
+    strings.extend(record.password for record in records)
+    strings.extend(email_ids)
+    strings.extend(website_ids)
+    lengths = array("I", map(len, strings))
+
+    extras = {str(row): record.extra for row, record in enumerate(records) if record.extra}
+    extras = json.dumps(extras).encode() if extras else b""
+    columns = [lengths, emails, websites, created]
+    if sys.byteorder == "big":
+        for column in columns:
+            column.byteswap()
+    return b"".join([
+        BINARY_COUNTS.pack(len(records), len(email_ids), len(website_ids), len(extras)),
+        *(column.tobytes() for column in columns),
+        extras,
+        "".join(strings).encode("utf-8", "surrogatepass"),
+    ])
+
+
+def _decode_binary(payload):
+    """Decodes a CODEC_BINARY payload into {name: AccountRecord}."""
+    count, email_count, website_count, extras_length = BINARY_COUNTS.unpack_from(payload)
+    pos = BINARY_COUNTS.size
+    columns = []
+    for typecode, size in (("I", 2 * count + email_count + website_count),
+                           ("I", count), ("I", count), ("Q", count)):
+        column = array(typecode)
+        column.frombytes(payload[pos:pos + column.itemsize * size])
+        if len(column) != size:
+            raise ValueError("Truncated vault payload")
+        if sys.byteorder == "big":
+            column.byteswap()
+        columns.append(column)
+        pos += column.itemsize * size
+    lengths, emails, websites, created = columns
+    if count and (max(emails) >= email_count or max(websites) >= website_count):
+        raise ValueError("Corrupt vault payload")
+
+    extras = json.loads(str(payload[pos:pos + extras_length], "utf-8")) if extras_length else {}
+    text = str(payload[pos + extras_length:], "utf-8", "surrogatepass")
+    ends = list(accumulate(lengths))
+    if len(text) != (ends[-1] if ends else 0):
+        raise ValueError("Corrupt vault payload")
+
+    strings = [text[end - length:end] for length, end in zip(lengths, ends)]
+    names = strings[:count]
+    email_values = strings[2 * count:2 * count + email_count]
+    website_values = strings[2 * count + email_count:]
+    accounts = {
+        name: AccountRecord(password, email_values[email], website_values[website], packed)
+        for name, password, email, website, packed
+        in zip(names, strings[count:2 * count], emails, websites, created)}
+    for row, extra in extras.items():
+        accounts[names[int(row)]].extra = extra
+    return accounts
+
+
+# Payload codecs by the codec byte of the vault header
+VAULT_CODECS = {}
+
+
+def register_vault_codec(codec_id, name, encode, decode, iter_decode=None):
+    """Makes a format 1 payload codec available for reading and writing vaults.
+
+    encode(accounts) returns the payload bytes. decode(payload) returns
+    {name: record}, records as decoded JSON or as AccountRecords, from bytes
+    or a memoryview. iter_decode(raw_chunks), if given, yields the same
+    pairs while the payload arrives in chunks, so large vaults stream.
+    """
+    VAULT_CODECS[codec_id] = VaultCodec(codec_id, name, encode, decode, iter_decode)
+
+
+def vault_codec(name):
+    """Returns the registered codec with the given name."""
+    for codec in VAULT_CODECS.values():
+        if codec.name == name:
+            return codec
+    raise ValueError(f"Unknown vault codec '{name}'")
+
+
+register_vault_codec(
+    CODEC_BASE64_JSON, "base64-json", _encode_payload, _decode_payload,
+    lambda raw_chunks: _iter_payload_members(_iter_base64_chunks(raw_chunks)))
+register_vault_codec(CODEC_JSON, "json", _encode_json, _decode_json, _iter_payload_members)
+register_vault_codec(
+    CODEC_ZLIB, "zlib",
+    lambda accounts: zlib.compress(_encode_json(accounts)),
+    lambda payload: _decode_json(zlib.decompress(payload)),
+    lambda raw_chunks: _iter_payload_members(
+        _iter_decompressed(zlib.decompressobj(), raw_chunks)))
+if lzma is not None:
+    register_vault_codec(
+        CODEC_LZMA, "lzma",
+        lambda accounts: lzma.compress(_encode_json(accounts), preset=LZMA_PRESET),
+        lambda payload: _decode_json(lzma.decompress(payload)),
+        lambda raw_chunks: _iter_payload_members(
+            _iter_decompressed(lzma.LZMADecompressor(), raw_chunks)))
+if bz2 is not None:
+    register_vault_codec(
+        CODEC_BZ2, "bz2",
+        lambda accounts: bz2.compress(_encode_json(accounts)),
+        lambda payload: _decode_json(bz2.decompress(payload)),
+        lambda raw_chunks: _iter_payload_members(
+            _iter_decompressed(bz2.BZ2Decompressor(), raw_chunks)))
+register_vault_codec(CODEC_BINARY, "binary", _encode_binary, _decode_binary)
+
+
+def _encode_indexed_payload(accounts, start):
+    """Encodes the records and index of a format 2 vault.
+
+    start is the file offset of the payload. Every record is stored as its
+    length and the JSON array [name, record]. The index after the records
+    lists the names as JSON, then the absolute offset and the length of
+    every record's JSON as little-endian arrays, so a record can be read
+    with one seek and read. A fixed-size footer at the end of the payload
+    locates the index.
+    """
+    encode = json.JSONEncoder(
+        ensure_ascii=False, separators=(",", ":"), default=record_to_json).encode
+    parts = []
+    offsets = array("Q")
+    lengths = array("I")
+    pos = start
+    for name, record in accounts.items():
+        data = encode([name, record]).encode("utf-8", "surrogatepass")
+        parts.append(INDEXED_RECORD.pack(len(data)))
+        parts.append(data)
+        offsets.append(pos + INDEXED_RECORD.size)
+        lengths.append(len(data))
+        pos += INDEXED_RECORD.size + len(data)
+
+    if sys.byteorder == "big":
+        offsets.byteswap()
+        lengths.byteswap()
+    names = json.dumps(list(accounts), ensure_ascii=False).encode("utf-8", "surrogatepass")
+    index = names + offsets.tobytes() + lengths.tobytes()
+    parts.append(index)
+    parts.append(INDEX_FOOTER.pack(pos, len(names), zlib.crc32(index), INDEX_MAGIC))
+    return b"".join(parts)
+
+
+def _encode_snapshot(accounts, version=VAULT_FORMAT_VERSION, codec=CODEC_BASE64_JSON, key=None):
+    """Builds the header and payload of a vault file in the given format and codec.
+
+    Format 2 stores its records as JSON and always records codec 0. With a
+    VaultKey the records are sealed under it; records that already are
+    pass through unchanged.
+    """
+    flags = 0
+    kdf_block = b""
+    if key is not None:
+        if codec == CODEC_BINARY:
+            raise ValueError("Encrypted vaults cannot use the binary codec")
+        flags |= FLAG_ENCRYPTED
+        kdf_block = key.kdf_block
+        accounts = seal_accounts(accounts, key)
+
+    if version == VAULT_FORMAT_INDEXED:
+        codec = CODEC_BASE64_JSON
+        encoded_data = _encode_indexed_payload(accounts, VAULT_HEADER.size + len(kdf_block))
+    elif version != VAULT_FORMAT_VERSION:
+        raise ValueError(f"Unsupported vault format version {version}")
+    elif codec not in VAULT_CODECS:
+        raise ValueError(f"Unknown vault codec {codec}")
+    else:
+        encoded_data = VAULT_CODECS[codec].encode(accounts)
+
+    header = VAULT_HEADER.pack(
+        VAULT_MAGIC, version, codec, flags,
+        len(accounts), len(encoded_data))
+    return header + kdf_block + encoded_data
+
+
+def _encode_journal_record(changes):
+    """Frames a {name: record or None} change set as one journal record."""
+    payload = _encode_payload(changes)
+    return JOURNAL_RECORD.pack(len(payload), zlib.crc32(payload)) + payload
+
+
+def _parse_journal(data):
+    """Splits journal bytes into record payloads.
+
+    Returns (payloads, valid_length). Parsing stops at the first torn or
+    corrupt record, which is what an interrupted append leaves behind.
+    """
+    payloads = []
+    pos = 0
+    while pos + JOURNAL_RECORD.size <= len(data):
+        length, crc = JOURNAL_RECORD.unpack_from(data, pos)
+        start = pos + JOURNAL_RECORD.size
+        payload = data[start:start + length]
+        if len(payload) != length or zlib.crc32(payload) != crc:
+            break
+        payloads.append(payload)
+        pos = start + length
+    return payloads, pos
+
+
+def _normalize_changes(changes, key=None):
+    """Converts a decoded journal change set into AccountRecords, keeping deletions.
+
+    Records of an encrypted vault, one with a key, become SealedRecords.
+    """
+    if key is not None:
+        return {name: None if record is None else SealedRecord.from_json(record, key)
+                for name, record in changes.items()}
+    return {name: None if record is None else AccountRecord.from_json(record)
+            for name, record in changes.items()}
+
+
+def _apply_changes(accounts, changes):
+    """Applies a journal change set; None marks a deleted record."""
+    for name, record in changes.items():
+        if record is None:
+            accounts.pop(name, None)
+        else:
+            accounts[name] = record
+
+
+def _temp_path(file_path, suffix):
+    """Returns a hidden sibling path used while rewriting a file."""
+    file_path = os.path.abspath(file_path)
+    return os.path.join(os.path.dirname(file_path),
+                        "." + os.path.basename(file_path) + suffix)
+
+
+def _fsync_directory(directory):
+    """Makes a rename durable; not supported (or needed) on every platform."""
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _replace_durably(temp_path, file_path):
+    """Atomically moves a fully written and fsynced temp file over file_path."""
+    if os.path.exists(file_path):
+        os.chmod(temp_path, stat.S_IMODE(os.stat(file_path).st_mode))
+    os.replace(temp_path, file_path)
+    _fsync_directory(os.path.dirname(os.path.abspath(file_path)))
+
+
+# Passed as the key of _write_snapshot to keep the file encrypted as it is
+_KEEP_KEY = object()
+
+
+def _write_snapshot(file_path, accounts, version=None, codec=None, key=_KEEP_KEY):
+    """Writes a whole vault through a temp file, fsync and os.replace.
+
+    A crash leaves either the old or the new file, never a truncated one.
+    Without a version or codec the file keeps its current one; new files
+    and legacy vaults get NEW_VAULT_FORMAT and NEW_VAULT_CODEC. An
+    encrypted file stays encrypted under its key unless another key, or
+    None for a plain vault, is given. Returns the number of bytes written.
+    """
+    if version is None or codec is None or key is _KEEP_KEY:
+        header, _ = VaultFileManager.read_vault_header(file_path)
+        if version is None:
+            version = NEW_VAULT_FORMAT if header is None else header.version
+        if codec is None:
+            codec = vault_codec(NEW_VAULT_CODEC).codec_id if header is None else header.codec
+        if key is _KEEP_KEY:
+            key = None if header is None else header.vault_key
+
+    # Convert to JSON and encode
+    data = _encode_snapshot(accounts, version, codec, key)
+
+    # Create directory if it doesn't exist
+    os.makedirs(os.path.dirname(os.path.abspath(file_path)), exist_ok=True)
+
+    temp_path = _temp_path(file_path, ".tmp")
+    try:
+        with open(temp_path, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+
+        with _file_lock(file_path):
+            _bump_generation(file_path)
+            _replace_durably(temp_path, file_path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+    return len(data)
+
+
+class LegacyVaultError(ValueError):
+    """Raised when a journal operation targets a headerless legacy vault."""
+
+
+def _append_journal(file_path, changes):
+    """Appends one fsynced journal record; returns the number of bytes written.
+
+    Changes to an encrypted vault are sealed first, so plain records never
+    reach its file.
+    """
+    with _file_lock(file_path), open(file_path, "r+b") as f:
+        header = _read_vault_header(
+            f, os.fstat(f.fileno()).st_size, MAX_VAULT_SIZE)
+        if header is None:
+            raise LegacyVaultError("Legacy vault files have no journal")
+        if header.vault_key is not None:
+            changes = seal_accounts(changes, header.vault_key)
+        record = _encode_journal_record(changes)
+
+        # Drop a torn record left by an interrupted append
+        start = header.payload_offset + header.payload_length
+        f.seek(start)
+        _, valid_length = _parse_journal(f.read())
+        f.seek(start + valid_length)
+        f.truncate()
+        f.write(record)
+        f.flush()
+        os.fsync(f.fileno())
+
+    return len(record)
+
+
+def _looks_like_legacy_vault(prefix):
+    """Checks whether the first bytes of a file are Base64 encoded JSON."""
+    usable = len(prefix) - len(prefix) % 4
+    if usable == 0:
+        return False
+    try:
+        decoded = base64.b64decode(prefix[:usable], validate=True)
+    except binascii.Error:
+        return False
+    return decoded.lstrip().startswith(b"{")
+
+
+def _read_vault_header(f, file_size, max_size):
+    """Identifies a vault from its first bytes, reading nothing else.
+
+    Returns the VaultHeader, or None for a legacy headerless vault. Raises
+    ValueError for anything that is not a vault.
+    """
+    if file_size > max_size:
+        raise ValueError(
+            f"File is larger than the {max_size} byte vault size limit")
+
+    prefix = f.read(LEGACY_SNIFF_SIZE)
+    if prefix[:len(VAULT_MAGIC)] == VAULT_MAGIC:
+        if len(prefix) < VAULT_HEADER.size:
+            raise ValueError("Truncated vault header")
+
+        _, version, codec, flags, record_count, payload_length = \
+            VAULT_HEADER.unpack_from(prefix)
+        if version not in VAULT_FORMATS:
+            raise ValueError(f"Unsupported vault format version {version}")
+        if codec not in VAULT_CODECS:
+            raise ValueError(f"Unknown vault codec {codec}")
+
+        key = None
+        payload_offset = VAULT_HEADER.size
+        if flags & FLAG_ENCRYPTED:
+            f.seek(VAULT_HEADER.size)
+            kdf_block = f.read(KDF_BLOCK.size)
+            if len(kdf_block) != KDF_BLOCK.size:
+                raise ValueError("Truncated vault header")
+            key = vault_key(kdf_block)
+            payload_offset += KDF_BLOCK.size
+        if payload_offset + payload_length > file_size:
+            raise ValueError("Truncated vault payload")
+
+        f.seek(payload_offset)
+        return VaultHeader(version, codec, flags, record_count, payload_length, payload_offset, key)
+
+    if _looks_like_legacy_vault(prefix):
+        f.seek(0)
+        return None
+
+    raise ValueError("Not a vault file")
 
 
 class VaultFileManager:
     """Utility class for handling vault file operations."""
 
     @staticmethod
-    def open_vault_file_dialog(parent, title="Open Vault File"):
-        """Opens a file dialog to select a vault file."""
-        options = QFileDialog.Option.ReadOnly
-        file_filter = "Vault Files (*.vault);;All Files (*)"
-
-        file_path, _ = QFileDialog.getOpenFileName(
-            parent, title, "", file_filter, options=options
-        )
+    def read_vault_header(file_path, max_size=None):
+        """Reads only the header of a vault file.
 
-        return file_path if file_path else None
+        Returns (header, error); header is None with an empty error for a
+        legacy headerless vault.
+        """
+        try:
+            with open(file_path, "rb") as f:
+                header = _read_vault_header(
+                    f, os.fstat(f.fileno()).st_size, max_size or MAX_VAULT_SIZE)
+            return header, ""
+        except Exception as e:
+            return None, str(e)
 
     @staticmethod
-    def save_vault_file_dialog(parent, title="Save Vault File"):
-        """Opens a file dialog to save a vault file."""
-        options = QFileDialog.Option.ReadOnly
-        file_filter = "Vault Files (*.vault);;All Files (*)"
+    def try_load_vault_file(file_path, max_size=None):
+        """Attempts to load a vault file and decode its contents.
 
-        file_path, _ = QFileDialog.getSaveFileName(
-            parent, title, "", file_filter, options=options
-        )
+        Files without a vault header or legacy Base64 prefix are rejected after
+        reading a few bytes. The snapshot is decoded first and the journal
+        that follows it is replayed on top. Files above
+        INCREMENTAL_DECODE_THRESHOLD are streamed as in iter_vault_records
+        instead of being decoded whole, which bounds peak memory and lets
+        the GUI thread run while a worker loads the file. Where possible the
+        file is memory-mapped and decoded from slices of the mapping.
+        """
+        try:
+            with open(file_path, "rb") as f:
+                file_size = os.fstat(f.fileno()).st_size
+                if file_size > INCREMENTAL_DECODE_THRESHOLD:
+                    accounts = dict(_iter_vault_records(f, file_size, max_size or MAX_VAULT_SIZE))
+                    return accounts, os.path.basename(file_path)
 
-        # Add .vault extension if not present
-        if file_path and not file_path.endswith('.vault'):
-            file_path += '.vault'
+                header = _read_vault_header(f, file_size, max_size or MAX_VAULT_SIZE)
+                with _mapped_view(f) as view:
+                    if view is None:
+                        f.seek(0)
+                        accounts = _load_vault_view(memoryview(f.read()), header)
+                    else:
+                        accounts = _load_vault_view(view, header)
+            return accounts, os.path.basename(file_path)
+        except Exception as e:
+            return None, str(e)
+
+    @staticmethod
+    def iter_vault_records(file_path, max_size=None):
+        """Yields the (name, AccountRecord) pairs of a vault without decoding it whole.
 
-        return file_path if file_path else None
+        Lets callers count or index a large vault while holding one record
+        at a time. Raises ValueError or OSError for an unreadable vault,
+        possibly after some records were yielded.
+        """
+        with open(file_path, "rb") as f:
+            yield from _iter_vault_records(
+                f, os.fstat(f.fileno()).st_size, max_size or MAX_VAULT_SIZE)
 
     @staticmethod
-    def try_load_vault_file(file_path):
-        """Attempts to load a vault file and decode its contents."""
+    def read_vault_index(file_path, max_size=None):
+        """Reads the record positions of an indexed (format 2) vault and its journal.
+
+        Returns (index, error); index is None with an empty error for vaults
+        without an index. index.positions maps every name in the snapshot to
+        the (offset, length) of its record; index.changes holds journaled
+        records, None for deleted ones, which take precedence.
+        index.vault_key is the VaultKey of an encrypted vault, else None.
+        """
         try:
             with open(file_path, "rb") as f:
-                encoded_data = f.read()
-                # Try to decode Base64
-                decoded_data = base64.b64decode(encoded_data)
-                # Try to load as JSON
-                json_data = json.loads(decoded_data.decode())
-                # If that works, it's probably a valid database file
-                if isinstance(json_data, dict):
-                    return json_data, os.path.basename(file_path)
+                header = _read_vault_header(
+                    f, os.fstat(f.fileno()).st_size, max_size or MAX_VAULT_SIZE)
+                if header is None or header.version != VAULT_FORMAT_INDEXED:
+                    return None, ""
+                names, offsets, lengths = _read_index(partial(_read_range, f), header)
+                f.seek(header.payload_offset + header.payload_length)
+                journal = f.read()
+
+            changes = {}
+            for payload in _parse_journal(journal)[0]:
+                changes.update(_normalize_changes(_decode_payload(payload), header.vault_key))
+            return VaultIndex(dict(zip(names, zip(offsets, lengths))), changes, header.vault_key), ""
         except Exception as e:
             return None, str(e)
 
-        return None, "Invalid file format"
+    @staticmethod
+    def list_vault_names(file_path):
+        """Lists the account names of a vault.
+
+        Indexed vaults are listed from their index, other formats are
+        decoded whole. Returns (names, error).
+        """
+        index, error = VaultFileManager.read_vault_index(file_path)
+        if index is None:
+            if error:
+                return None, error
+            accounts, error = VaultFileManager.try_load_vault_file(file_path)
+            return (None, error) if accounts is None else (list(accounts), "")
+
+        names = [name for name in index.positions if name not in index.changes]
+        names.extend(name for name, record in index.changes.items() if record is not None)
+        return names, ""
+
+    @staticmethod
+    def read_vault_record(file_path, account_name, index=None):
+        """Reads one account of a vault.
+
+        With the index of an indexed vault, from read_vault_index, this is a
+        single seek and read; without one the index is read first, and other
+        formats are decoded whole. Records of an encrypted vault are returned
+        as SealedRecords. Returns (record, error).
+        """
+        record = None
+        if index is None:
+            index, error = VaultFileManager.read_vault_index(file_path)
+            if error:
+                return None, error
+
+        if index is None:
+            accounts, error = VaultFileManager.try_load_vault_file(file_path)
+            if accounts is None:
+                return None, error
+            record = accounts.get(account_name)
+        elif account_name in index.changes:
+            record = index.changes[account_name]
+        elif account_name in index.positions:
+            offset, length = index.positions[account_name]
+            try:
+                with open(file_path, "rb") as f:
+                    name, value = json.loads(_read_range(f, offset, offset + length))
+                if name != account_name:
+                    return None, "Vault index does not match its records"
+                if index.vault_key is None:
+                    record = AccountRecord.from_json(value)
+                else:
+                    record = SealedRecord.from_json(value, index.vault_key)
+            except Exception as e:
+                return None, str(e)
+
+        if record is None:
+            return None, f"No account named '{account_name}'"
+        return record, ""
 
     @staticmethod
     def save_vault_file(file_path, accounts):
-        """Saves account data to a vault file."""
+        """Saves account data to a vault file, replacing it atomically."""
+        try:
+            _write_snapshot(file_path, accounts)
+            return True, ""
+        except Exception as e:
+            return False, str(e)
+
+    @staticmethod
+    def append_vault_changes(file_path, changes):
+        """Appends changed records to the journal of a vault file.
+
+        changes maps account names to their new record, or to None for a
+        deleted account. Only the change set is written, not the whole vault.
+        """
+        try:
+            _append_journal(file_path, changes)
+            return True, ""
+        except Exception as e:
+            return False, str(e)
+
+    @staticmethod
+    def needs_compaction(file_path):
+        """Checks whether the journal of a vault has outgrown its thresholds."""
+        try:
+            with open(file_path, "rb") as f:
+                file_size = os.fstat(f.fileno()).st_size
+                header = _read_vault_header(f, file_size, MAX_VAULT_SIZE)
+        except Exception:
+            return False
+
+        if header is None:
+            return False
+        journal_size = file_size - header.payload_offset - header.payload_length
+        return journal_size > JOURNAL_COMPACT_BYTES or \
+            journal_size > JOURNAL_COMPACT_RATIO * max(header.payload_length, 4096)
+
+    @staticmethod
+    def compact_vault_file(file_path):
+        """Folds the journal of a vault into a fresh snapshot.
+
+        The heavy decode/encode runs without the file lock, so appends made
+        meanwhile are not blocked; they are copied over before the new file
+        atomically replaces the old one.
+        """
+        temp_path = _temp_path(file_path, ".compact")
+        try:
+            with _file_lock(file_path):
+                generation = _generation(file_path)
+                end = os.path.getsize(file_path)
+
+            with open(file_path, "rb") as f:
+                header = _read_vault_header(f, end, MAX_VAULT_SIZE)
+                if header is None:
+                    return False, "Legacy vault files have no journal"
+                if header.version == VAULT_FORMAT_INDEXED:
+                    read_range = partial(_read_range, f)
+                    accounts = dict(_iter_indexed_records(read_range, *_read_index(read_range, header)))
+                    f.seek(header.payload_offset + header.payload_length)
+                else:
+                    accounts = VAULT_CODECS[header.codec].decode(f.read(header.payload_length))
+                journal = f.read(end - header.payload_offset - header.payload_length)
+
+            # Sealed records are copied as they are, compaction needs no key
+            payloads, valid_length = _parse_journal(journal)
+            for payload in payloads:
+                _apply_changes(accounts, _decode_payload(payload))
+            end = header.payload_offset + header.payload_length + valid_length
+
+            with open(temp_path, "wb") as out:
+                out.write(_encode_snapshot(accounts, header.version, header.codec, header.vault_key))
+
+                with _file_lock(file_path):
+                    if _generation(file_path) != generation:
+                        raise RuntimeError("Vault was rewritten during compaction")
+
+                    # Carry over records appended while we were encoding
+                    with open(file_path, "rb") as f:
+                        f.seek(end)
+                        out.write(f.read())
+                    out.flush()
+                    os.fsync(out.fileno())
+                    out.close()
+                    _replace_durably(temp_path, file_path)
+                    _bump_generation(file_path)
+
+            return True, ""
+        except Exception as e:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            return False, str(e)
+
+    @staticmethod
+    def upgrade_vault_file(file_path):
+        """Rewrites a legacy headerless vault in the current format.
+
+        Returns (upgraded, error); files that already have a header are left
+        untouched.
+        """
+        header, error = VaultFileManager.read_vault_header(file_path)
+        if header is not None or error:
+            return False, error
+
+        accounts, error = VaultFileManager.try_load_vault_file(file_path)
+        if accounts is None:
+            return False, error
+        return VaultFileManager.save_vault_file(file_path, accounts)
+
+    @staticmethod
+    def convert_vault_file(file_path, version=None, codec=None):
+        """Rewrites a vault in another format version or payload codec.
+
+        Works in every direction and for legacy vaults; the journal is
+        folded in. A version or codec of None keeps the current one.
+        Returns (converted, error); a vault already stored that way is left
+        untouched.
+        """
+        if version is not None and version not in VAULT_FORMATS:
+            return False, f"Unsupported vault format version {version}"
+        if codec is not None and codec not in VAULT_CODECS:
+            return False, f"Unknown vault codec {codec}"
+        header, error = VaultFileManager.read_vault_header(file_path)
+        if error:
+            return False, error
+        if version is None:
+            version = VAULT_FORMAT_VERSION if header is None else header.version
+        if version == VAULT_FORMAT_INDEXED and codec not in (None, CODEC_BASE64_JSON):
+            return False, "Codecs only apply to format 1 vaults"
+        if header is not None and header.version == version and codec in (None, header.codec):
+            return False, ""
+
+        accounts, error = VaultFileManager.try_load_vault_file(file_path)
+        if accounts is None:
+            return False, error
+        try:
+            _write_snapshot(file_path, accounts, version, codec)
+            return True, ""
+        except Exception as e:
+            return False, str(e)
+
+    @staticmethod
+    def unlock_vault(file_path, password):
+        """Derives the key of an encrypted vault from its master password.
+
+        Reads only the header; the key then stays unlocked for the session,
+        also for later loads of the file. Takes one scrypt run, call it off
+        the GUI thread. Returns (unlocked, error); a plain vault is unlocked.
+        """
+        header, error = VaultFileManager.read_vault_header(file_path)
+        if error:
+            return False, error
+        if header is None or header.vault_key is None:
+            return True, ""
+        try:
+            if not header.vault_key.unlock(password):
+                return False, "Wrong master password"
+            return True, ""
+        except Exception as e:
+            return False, str(e)
+
+    @staticmethod
+    def encrypt_vault_file(file_path, key):
+        """Rewrites a vault with every record sealed under an unlocked VaultKey.
+
+        key usually comes from VaultKey.create(password); an encrypted vault
+        given a new key gets a new master password, which needs its current
+        key unlocked. Returns (encrypted, error).
+        """
+        header, error = VaultFileManager.read_vault_header(file_path)
+        if error:
+            return False, error
+        if header is not None and header.codec == CODEC_BINARY:
+            return False, "Encrypted vaults cannot use the binary codec"
+        if header is not None and header.vault_key is key:
+            return False, ""
+
+        accounts, error = VaultFileManager.try_load_vault_file(file_path)
+        if accounts is None:
+            return False, error
         try:
-            # Convert to JSON and encode
-            json_data = json.dumps(accounts).encode()
-            encoded_data = base64.b64encode(json_data)
+            _write_snapshot(file_path, accounts, key=key)
+            return True, ""
+        except Exception as e:
+            return False, str(e)
 
-            # Create directory if it doesn't exist
-            os.makedirs(os.path.dirname(
-                os.path.abspath(file_path)), exist_ok=True)
+    @staticmethod
+    def decrypt_vault_file(file_path):
+        """Rewrites an unlocked encrypted vault with plain records.
 
-            # Save to file
-            with open(file_path, "wb") as f:
-                f.write(encoded_data)
+        Returns (decrypted, error); a plain vault is left untouched.
+        """
+        header, error = VaultFileManager.read_vault_header(file_path)
+        if error:
+            return False, error
+        if header is None or header.vault_key is None:
+            return False, ""
 
+        accounts, error = VaultFileManager.try_load_vault_file(file_path)
+        if accounts is None:
+            return False, error
+        try:
+            _write_snapshot(file_path, unseal_accounts(accounts), key=None)
             return True, ""
         except Exception as e:
             return False, str(e)
+
+    @staticmethod
+    def upgrade_vault_directory(directory):
+        """Upgrades every legacy vault in a directory in one pass.
+
+        Returns the list of upgraded file names.
+        """
+        upgraded = []
+        for name in sorted(os.listdir(directory)):
+            file_path = os.path.join(directory, name)
+            if name.startswith('.') or not os.path.isfile(file_path):
+                continue
+            success, _ = VaultFileManager.upgrade_vault_file(file_path)
+            if success:
+                upgraded.append(name)
+        return upgraded
+
+
+class VaultScanCache:
+    """Caches decoded vault files keyed by their stat signature."""
+
+    def __init__(self):
+        # Format: {file_path: (stat_key, accounts, error)}
+        self._entries = {}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def stat_key(file_path):
+        """Returns the (inode, size, mtime_ns) signature of a file."""
+        st = os.stat(file_path)
+        return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+    def lookup(self, file_path):
+        """Returns (stat_key, entry) where entry is (accounts, error) or None on a miss."""
+        key = self.stat_key(file_path)
+        entry = self._entries.get(file_path)
+        if entry is not None and entry[0] == key:
+            self.hits += 1
+            return key, (entry[1], entry[2])
+
+        self.misses += 1
+        return key, None
+
+    def store(self, file_path, key, accounts, error=""):
+        """Records the decoded contents of a file for the given stat key."""
+        # Invalid files are cached too so they are not re-read on every scan
+        self._entries[file_path] = (key, accounts, error)
+
+    def remember(self, file_path, accounts):
+        """Records accounts that were just written, so the next scan skips the file."""
+        try:
+            self.store(file_path, self.stat_key(file_path), accounts)
+        except OSError:
+            self.invalidate(file_path)
+
+    def load(self, file_path):
+        """Returns (accounts, error) for a file, re-parsing it only if its stat changed."""
+        try:
+            key, entry = self.lookup(file_path)
+        except OSError as e:
+            self.invalidate(file_path)
+            return None, str(e)
+
+        if entry is not None:
+            return entry
+
+        accounts, error = VaultFileManager.try_load_vault_file(file_path)
+        self.store(file_path, key, accounts, error)
+        return accounts, error
+
+    def prune(self, file_paths):
+        """Drops cached entries for files that are no longer present."""
+        keep = set(file_paths)
+        for file_path in list(self._entries):
+            if file_path not in keep:
+                del self._entries[file_path]
+
+    def invalidate(self, file_path):
+        """Forgets a single cached file."""
+        self._entries.pop(file_path, None)
+
+    def stats(self):
+        """Returns hit/miss counters for the cache."""
+        return {"hits": self.hits, "misses": self.misses,
+                "entries": len(self._entries)}
+
+    def reset_stats(self):
+        """Resets the hit/miss counters."""
+        self.hits = 0
+        self.misses = 0
+
+
+def _estimate_accounts_bytes(accounts):
+    """Estimates the memory held by decoded accounts from a sample of records."""
+    count = len(accounts)
+    total = sys.getsizeof(accounts)
+    if not count:
+        return total
+
+    sampled = sample_bytes = 0
+    step = max(1, count // RESIDENT_SAMPLE_SIZE)
+    for account_name, account_data in islice(accounts.items(), 0, None, step):
+        # Emails and websites are interned and mostly shared between records
+        text = account_data.data if isinstance(account_data, SealedRecord) else account_data.password
+        sample_bytes += sys.getsizeof(account_name) + sys.getsizeof(account_data) \
+            + sys.getsizeof(text)
+        sampled += 1
+    return total + sample_bytes * count // sampled
+
+
+class VaultResidencyManager(VaultScanCache):
+    """Keeps metadata for every scanned vault and decoded records for recently used ones.
+
+    Every vault keeps its stat key, record count and sorted account names.
+    Decoded accounts stay resident in least recently used order until
+    their estimated size passes max_bytes; pinned vaults, such as the one
+    shown or one with unsaved edits, and the most recently used one are
+    never evicted. An evicted vault is decoded again by the next load().
+    """
+
+    def __init__(self, max_bytes=RESIDENT_VAULT_BYTES):
+        super().__init__()
+        self.max_bytes = max_bytes
+        self.evictions = 0
+        # Format: {file_path: VaultInfo}
+        self._info = {}
+        # Format: {file_path: (accounts, estimated bytes)}, coldest first
+        self._resident = OrderedDict()
+        self._pinned = set()
+
+    def lookup(self, file_path):
+        """Returns (stat_key, entry) where entry is (accounts, error) or None unless resident."""
+        key = self.stat_key(file_path)
+        info = self._info.get(file_path)
+        if info is not None and info.key == key:
+            if info.error:
+                self.hits += 1
+                return key, (None, info.error)
+            accounts = self.accounts(file_path)
+            if accounts is not None:
+                self.hits += 1
+                return key, (accounts, "")
+
+        self.misses += 1
+        return key, None
+
+    def lookup_info(self, file_path):
+        """Returns (stat_key, info) where info is None if the file changed since it was read."""
+        key = self.stat_key(file_path)
+        info = self._info.get(file_path)
+        if info is not None and info.key == key:
+            self.hits += 1
+            return key, info
+
+        self.misses += 1
+        return key, None
+
+    def store(self, file_path, key, accounts, error=""):
+        """Records a decoded file and keeps its accounts resident."""
+        self._resident.pop(file_path, None)
+        if accounts is None:
+            self._info[file_path] = VaultInfo(key, 0, (), error)
+            return
+
+        # Names are sorted when first needed, edits make them stale anyway
+        self._info[file_path] = VaultInfo(key, len(accounts), None, "")
+        self._resident[file_path] = (accounts, _estimate_accounts_bytes(accounts))
+        self._evict()
+
+    def info(self, file_path):
+        """Returns the VaultInfo of a scanned file, or None."""
+        return self._info.get(file_path)
+
+    def names(self, file_path):
+        """Returns the sorted account names of a scanned file."""
+        info = self._info.get(file_path)
+        if info is None:
+            return []
+        if info.names is None:
+            entry = self._resident.get(file_path)
+            if entry is None:
+                return []
+            info = self._info[file_path] = info._replace(names=sorted(entry[0]))
+        return info.names
+
+    def accounts(self, file_path):
+        """Returns the resident accounts of a file, or None if they were evicted."""
+        entry = self._resident.get(file_path)
+        if entry is None:
+            return None
+        self._resident.move_to_end(file_path)
+        return entry[0]
+
+    def pin(self, file_path):
+        """Keeps a file's accounts resident until it is unpinned."""
+        self._pinned.add(file_path)
+
+    def unpin(self, file_path):
+        """Makes a file's accounts evictable again."""
+        self._pinned.discard(file_path)
+        self._evict()
+
+    def _evict(self):
+        """Drops the coldest unpinned accounts until the budget is met."""
+        total = sum(size for _, size in self._resident.values())
+        # The most recently used vault stays even if it alone exceeds the budget
+        for file_path in list(self._resident)[:-1]:
+            if total <= self.max_bytes:
+                break
+            if file_path in self._pinned:
+                continue
+
+            # Keep the names, they are all the list needs until the vault is opened
+            self.names(file_path)
+            _, size = self._resident.pop(file_path)
+            total -= size
+            self.evictions += 1
+
+    def resident_bytes(self):
+        """Returns the estimated bytes of each resident vault, coldest first."""
+        return {file_path: size for file_path, (_, size) in self._resident.items()}
+
+    def prune(self, file_paths):
+        """Drops files that are no longer present."""
+        keep = set(file_paths)
+        for file_path in list(self._info):
+            if file_path not in keep:
+                self.invalidate(file_path)
+
+    def invalidate(self, file_path):
+        """Forgets a single file."""
+        self._info.pop(file_path, None)
+        self._resident.pop(file_path, None)
+
+    def stats(self):
+        """Returns cache counters and the memory held by resident vaults."""
+        resident = self.resident_bytes()
+        return {"hits": self.hits, "misses": self.misses,
+                "entries": len(self._info), "resident": len(resident),
+                "resident_bytes": sum(resident.values()), "evictions": self.evictions}
+
+
+def commit_vault(file_path, accounts, changes):
+    """Writes one save, changes as a journal record or None for a snapshot, and measures it.
+
+    Returns a dict of the outcome; legacy vaults have no journal and come
+    back with needs_full_rewrite set instead of being written.
+    """
+    result = {"path": file_path, "accounts": accounts, "kind": "journal",
+              "bytes": 0, "seconds": 0.0, "success": True, "error": "",
+              "needs_full_rewrite": False, "compacted": False}
+    start = time.perf_counter()
+    try:
+        if changes is None:
+            result["kind"] = "snapshot"
+            result["bytes"] = _write_snapshot(file_path, accounts)
+        else:
+            result["bytes"] = _append_journal(file_path, changes)
+            if VaultFileManager.needs_compaction(file_path):
+                result["compacted"], _ = VaultFileManager.compact_vault_file(
+                    file_path)
+    except LegacyVaultError:
+        result["needs_full_rewrite"] = True
+    except Exception as e:
+        result["success"] = False
+        result["error"] = str(e)
+    result["seconds"] = time.perf_counter() - start
+    return result
@@ -1,14 +1,15 @@
 from PyQt6.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QHBoxLayout, QLabel,
-    QPushButton, QLineEdit, QListWidget, QMessageBox, QTextEdit,
-    QComboBox, QListWidgetItem, QInputDialog, QGraphicsDropShadowEffect,
+    QPushButton, QLineEdit, QListView, QMessageBox, QTextEdit,
+    QComboBox, QInputDialog, QGraphicsDropShadowEffect,
     QFrame, QSplitter, QScrollArea, QFileDialog, QToolButton, QSizePolicy,
-    QGridLayout, QStackedWidget
+    QGridLayout, QStackedWidget, QProgressDialog
+)
+from PyQt6.QtGui import (
+    QPainter, QBrush, QColor, QFont, QIcon, QLinearGradient, QPen, QPixmap, QShortcut, QKeySequence
 )
-from PyQt6.QtGui import QPainter, QBrush, QColor, QFont, QIcon, QLinearGradient, QPen
 from PyQt6.QtCore import Qt, QTimer, QPoint, QSize, QPropertyAnimation, QEasingCurve, QRect, pyqtProperty, QUrl
 import sys
-import random
 import json
 import base64
 import os
@@ -16,15 +17,35 @@ import time
 import webbrowser
 from password_utils import generate_password
 from enhanced_buttons import EnhancedButton, IconButton
-from file_utils import VaultFileManager
+from account_model import AccountListModel
+from account_record import AccountRecord
+from account_details import AccountDetailsView, OpenedRecordCache, PREFETCH_ROWS
+from search_index import AccountSearchIndex
+from snowfall import SnowField
+from themes import ThemeEngine, DEFAULT_THEME
+from perf_hud import PerfMonitor, PerfOverlay, PERF_HUD, PERF_EXPORT, PERF_HUD_SHORTCUT, PERF_EXPORT_SHORTCUT
+from file_utils import VaultFileManager, VaultResidencyManager
+from vault_store import VaultStore
+from vault_crypto import VaultLockedError
+from vault_qt import (
+    VaultDirectoryWatcher, VaultImporter, VaultLoader, VaultSaveScheduler, VaultUnlocker,
+    open_vault_file_dialog
+)
 
 # Directory scanning instead of fixed file
 DATABASE_DIR = os.path.dirname(os.path.abspath(__file__)) or os.getcwd()
 
-# Modern color palette with transparency effects
-COLOR_BG = "#121218"
-COLOR_BG_GRADIENT_TOP = "#1A1A24"
-COLOR_BG_GRADIENT_BOTTOM = "#0D0D12"
+# "watch" reacts to file system events, "poll" rescans on a timer
+WATCH_MODE = os.environ.get("VAULTIX_WATCH_MODE", "watch")
+
+# Time spent ranking search results on a keystroke, then per pass of the event loop
+SEARCH_KEYSTROKE_MS = 4
+SEARCH_STREAM_MS = 12
+
+# Quiet time after the last resize event before the window background is rendered again
+RESIZE_SETTLE_MS = 150
+
+# Modern color palette with transparency effects, colors that change with the theme are in themes.py
 COLOR_PRIMARY = "#8A2BE2"  # Blueviolet
 COLOR_PRIMARY_HOVER = "#9A3BF2"
 COLOR_PRIMARY_PRESSED = "#7A1BD2"
@@ -35,68 +56,16 @@ COLOR_ACCENT = "#FF79C6"  # Accent color for highlights
 COLOR_DANGER = "#FF5555"
 COLOR_DANGER_HOVER = "#FF6E6E"
 COLOR_DANGER_PRESSED = "#E64C4C"
-COLOR_TEXT = "#F8F8F2"
 COLOR_TEXT_SECONDARY = "#BFBFBF"
-COLOR_PANEL = "rgba(30, 30, 40, 180)"
-COLOR_PANEL_LIGHTER = "rgba(40, 40, 50, 200)"
-COLOR_PANEL_SELECTED = "rgba(60, 50, 90, 200)"
 COLOR_STATUS_INFO = "#8BE9FD"
 COLOR_STATUS_SUCCESS = "#50FA7B"
 COLOR_STATUS_ERROR = "#FF5555"
 
-THEMES = {
-    "dark": {
-        "BG": "#121218",
-        "BG_GRADIENT_TOP": "#1A1A24",
-        "BG_GRADIENT_BOTTOM": "#0D0D12",
-        "TEXT": "#F8F8F2",
-        "TEXT_SECONDARY": "#BFBFBF",
-        "PANEL": "rgba(30, 30, 40, 180)",
-        "PANEL_LIGHTER": "rgba(40, 40, 50, 200)",
-        "PANEL_SELECTED": "rgba(60, 50, 90, 200)"
-    },
-    "light": {
-        "BG": "#f0f0f0",
-        "BG_GRADIENT_TOP": "#ffffff",
-        "BG_GRADIENT_BOTTOM": "#e0e0e0",
-        "TEXT": "#2a2a2a",
-        "TEXT_SECONDARY": "#555555",
-        "PANEL": "rgba(255, 255, 255, 220)",
-        "PANEL_LIGHTER": "rgba(250, 250, 250, 240)",
-        "PANEL_SELECTED": "rgba(230, 230, 255, 220)"
-    }
-}
-
-
-class Snowflake:
-    def __init__(self, x, y, size, speed, window_width, window_height):
-        self.x = x
-        self.y = y
-        self.size = size
-        self.speed = speed
-        self.window_width = window_width
-        self.window_height = window_height
-        # Varying opacity for depth effect
-        self.opacity = random.randint(30, 180)
-
-    def fall(self):
-        self.y += self.speed
-        self.x += random.uniform(-0.5, 0.5)  # Slight horizontal drift
-        if self.y > self.window_height:
-            self.y = 0
-            self.x = random.randint(0, self.window_width)
-
 
 class ModernPanel(QFrame):
     def __init__(self, parent=None):
         super().__init__(parent)
-        self.setStyleSheet(f"""
-            ModernPanel {{
-                background-color: {COLOR_PANEL};
-                border-radius: 12px;
-                border: 1px solid rgba(80, 80, 100, 100);
-            }}
-        """)
+        # Background and border come from the window theme, see themes.py
 
         # Shadow effect
         shadow = QGraphicsDropShadowEffect(self)
@@ -192,30 +161,101 @@ class AccountManager(QWidget):
         self.setGeometry(100, 100, 1100, 700)  # Larger window for better UI
         self.setMinimumSize(800, 500)  # Set a reasonable minimum size
 
-        # Current theme tracking
-        self.current_theme = "dark"
+        # Current theme tracking, every theme is compiled into one stylesheet
+        self.themes = ThemeEngine()
+        for file_path, error in self.themes.errors:
+            print(f"Skipped theme {file_path}: {error}")
+        self.current_theme = DEFAULT_THEME if self.themes.get(DEFAULT_THEME) else "dark"
 
         # Store current website URL
         self.current_website_url = None
 
         # Set window style
-        self.setStyleSheet(self.generate_stylesheet())
+        self.setStyleSheet(self.themes.stylesheet)
+        self.theme = self.themes.apply(self, self.current_theme)
 
-        # Dictionary to store all accounts by file
-        self.all_db_accounts = {}  # Format: {filename: {account_name: password}}
+        # Accounts of the current database, {account_name: record}, None while loading
+        self.current_accounts = None
         self.current_db_file = None
         self.current_db_path = None  # Full path to current database file
-
-        # Initialize timer for periodic checking of database files
+        self.pinned_db_path = None  # Database kept resident while it is shown
+
+        # Decrypted records of the selection and its neighbours, see prefetch_neighbours
+        self.opened_records = OpenedRecordCache()
+        self.prefetch_timer = QTimer(self)
+        self.prefetch_timer.setSingleShot(True)
+        self.prefetch_timer.timeout.connect(self.prefetch_neighbours)
+
+        # External vaults opened from other locations: {filename: full_path}
+        self.external_db_paths = {}
+        self.pending_external_paths = set()
+
+        # Database to select as soon as it has been loaded
+        self.pending_selection = None
+        self.scan_in_progress = False
+
+        # Metadata of every vault keyed by stat so unchanged files are not re-read,
+        # decoded accounts only for recently used ones
+        self.vault_cache = VaultResidencyManager()
+
+        # Edits are coalesced and written durably on a background writer
+        self.save_scheduler = VaultSaveScheduler(self)
+        self.save_scheduler.saved.connect(self.on_vault_saved)
+
+        # Vault files are decoded off the GUI thread
+        self.vault_loader = VaultLoader(self.vault_cache, self, is_dirty=self.vault_busy)
+        self.vault_loader.loaded.connect(self.on_vault_loaded)
+        self.vault_loader.idle.connect(self.finish_scan)
+        # Files that changed on disk while they had a save queued, loaded again once it lands
+        self.reload_after_save = set()
+        # VaultKeys of loaded encrypted vaults, None for plain ones; kept with the cached
+        # accounts so edits need not read the file header
+        self.vault_keys = {}
+
+        # Keys of encrypted vaults are derived off the GUI thread, once per session
+        self.vault_unlocker = VaultUnlocker(self)
+        self.vault_unlocker.unlocked.connect(self.on_vault_unlocked)
+        self.pending_created_paths = set()  # Encrypted vaults being created
+        self.declined_unlock_paths = set()  # Not asked again when an account is shown
+
+        # CSV imports are read and written off the GUI thread
+        self.vault_importer = VaultImporter(self)
+        self.vault_importer.progress.connect(self.on_import_progress)
+        self.vault_importer.finished.connect(self.on_import_finished)
+        self.import_dialog = None
+
+        # Watch the database directory for changes
+        self.vault_watcher = VaultDirectoryWatcher(self)
+        self.vault_watcher.changed.connect(self.on_vault_files_changed)
+
+        # Search over the current database, results are ranked in short steps
+        self.search_index = AccountSearchIndex()
+        self.search_results = None
+        self.search_timer = QTimer(self)
+        self.search_timer.timeout.connect(self.stream_search_results)
+
+        # Periodic checking of database files, used when events are unavailable
         self.file_check_timer = QTimer(self)
-        self.file_check_timer.timeout.connect(self.scan_for_database_files)
-        self.file_check_timer.start(5000)  # Check every 5 seconds
+        self.file_check_timer.timeout.connect(
+            lambda: self.scan_for_database_files(quiet=True))
+        if WATCH_MODE == "poll" or not self.vault_watcher.start(DATABASE_DIR):
+            self.file_check_timer.start(5000)  # Check every 5 seconds
 
         # Animation effect for status messages
         self.status_animation = None
 
-        # Initialize snowflakes animation
-        self.snowflakes = []
+        # Window background, rendered once per size and theme, see background_pixmap
+        self.background_cache = None
+        self.background_cache_key = None
+        self.background_timer = QTimer(self)
+        self.background_timer.setSingleShot(True)
+        self.background_timer.timeout.connect(self.update)
+
+        # Frame and handler timings, recorded while the overlay is shown or an export is set
+        self.perf = PerfMonitor(enabled=bool(PERF_EXPORT))
+
+        # Initialize snowflakes animation, the flake count is set by VAULTIX_SNOWFLAKES
+        self.snowfall = SnowField()
         self.init_snowflakes()
         self.snowflake_timer = QTimer(self)
         self.snowflake_timer.timeout.connect(self.update_snowflakes)
@@ -224,6 +264,13 @@ class AccountManager(QWidget):
         # Create UI
         self.setup_ui()
 
+        # Performance overlay, see perf_hud.py
+        self.perf_overlay = PerfOverlay(self.perf, self)
+        QShortcut(QKeySequence(PERF_HUD_SHORTCUT), self, self.perf_overlay.toggle)
+        QShortcut(QKeySequence(PERF_EXPORT_SHORTCUT), self, self.export_perf_stats)
+        if PERF_HUD:
+            self.perf_overlay.toggle()
+
         # Initial search for database files
         self.scan_for_database_files()
 
@@ -309,11 +356,23 @@ class AccountManager(QWidget):
 
         # Account list panel
         account_panel = SectionPanel("Accounts")
+        self.account_panel = account_panel
+
+        # Search box
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText("Search names, emails and websites")
+        self.search_input.setClearButtonEnabled(True)
+        self.search_input.textChanged.connect(self.search_accounts)
+        account_panel.add_widget(self.search_input)
 
         # Account list
-        self.account_list = QListWidget()
+        self.account_model = AccountListModel(self)
+        self.account_list = QListView()
+        self.account_list.setModel(self.account_model)
         self.account_list.setMinimumHeight(200)
-        self.account_list.itemSelectionChanged.connect(
+        # All rows share one height, so Qt does not lay out every item on scroll
+        self.account_list.setUniformItemSizes(True)
+        self.account_list.selectionModel().selectionChanged.connect(
             self.display_account_details)
         account_panel.add_widget(self.account_list)
 
@@ -375,6 +434,12 @@ class AccountManager(QWidget):
         self.del_button.clicked.connect(self.del_account)
         account_buttons_layout.addWidget(self.del_button)
 
+        self.import_button = EnhancedButton("Import CSV", style="info")
+        self.import_button.setToolTip(
+            "Import the passwords exported by a browser or password manager")
+        self.import_button.clicked.connect(self.import_accounts)
+        account_buttons_layout.addWidget(self.import_button)
+
         account_edit_panel.add_layout(account_buttons_layout)
         left_layout.addWidget(account_edit_panel)
 
@@ -388,11 +453,8 @@ class AccountManager(QWidget):
         details_panel = SectionPanel("Account Details")
         self.details_panel = details_panel
 
-        # Details view
-        self.details_view = QTextEdit()
-        self.details_view.setReadOnly(True)
-        self.details_view.setStyleSheet(
-            "border: none; background: transparent;")
+        # Details view, labels that only change their text
+        self.details_view = AccountDetailsView()
         details_panel.add_widget(self.details_view)
 
         # Action buttons
@@ -448,51 +510,38 @@ class AccountManager(QWidget):
         main_layout.addWidget(content_splitter)
 
     def toggle_theme(self):
-        self.current_theme = "light" if self.current_theme == "dark" else "dark"
+        """Switches to the next theme, user themes follow the built-in ones"""
+        self.current_theme = self.themes.next_name(self.current_theme)
         self.theme_toggle.setText(
             "☀️" if self.current_theme == "dark" else "🌙")
         self.apply_theme()
 
     def open_external_database(self):
         """Opens a vault file from any location on the system."""
-        file_path = VaultFileManager.open_vault_file_dialog(
-            self, "Open Vault File")
+        file_path = open_vault_file_dialog(self, "Open Vault File")
         if not file_path:
             return
 
-        try:
-            # Attempt to load the vault file
-            accounts, error = VaultFileManager.try_load_vault_file(file_path)
-
-            if accounts is None:
-                QMessageBox.warning(self, "Open Error",
-                                    f"Could not open file: {error}")
-                return
-
-            # Get just the filename for display
-            filename = os.path.basename(file_path)
-
-            # Add to our account dictionary
-            self.all_db_accounts[filename] = accounts
-
-            # Set as current database
-            self.current_db_file = filename
-            self.current_db_path = file_path
+        # The file is decoded in the background, see on_vault_loaded
+        self.pending_external_paths.add(file_path)
+        self.set_status(
+            f"Opening {os.path.basename(file_path)}...", "info")
+        self.vault_loader.submit(file_path)
 
-            # Update UI
-            self.scan_for_database_files()
-
-            # Select the newly opened database
-            for i in range(self.db_file_selector.count()):
-                if self.db_file_selector.itemText(i).startswith(f"{filename} ("):
-                    self.db_file_selector.setCurrentIndex(i)
-                    break
-
-            self.set_status(f"Opened external database: {filename}", "success")
+    def export_perf_stats(self):
+        """Saves the frame and handler timings to a JSON file for comparing runs"""
+        file_path, _ = QFileDialog.getSaveFileName(
+            self, "Export Performance Statistics", "vaultix-perf.json", "JSON Files (*.json)")
+        if not file_path:
+            return
 
-        except Exception as e:
-            QMessageBox.critical(self, "Open Error",
-                                 f"Error opening file: {e}")
+        error = self.perf.export(file_path)
+        if error:
+            QMessageBox.warning(self, "Export Error", f"Could not export statistics: {error}")
+        elif not self.perf.enabled:
+            self.set_status("Nothing recorded, show the performance overlay first", "info")
+        else:
+            self.set_status(f"Performance statistics saved to {os.path.basename(file_path)}", "success")
 
     def show_database_location(self):
         """Shows the current database location."""
@@ -525,175 +574,258 @@ class AccountManager(QWidget):
         self.set_status("Input fields cleared", "info")
 
     def apply_theme(self):
-        if self.current_theme not in THEMES:
+        """Switches the window to the current theme without parsing any stylesheet"""
+        start = time.perf_counter()
+        if self.themes.get(self.current_theme) is None:
             self.set_status("Unknown theme: reverting to dark", "error")
             self.current_theme = "dark"
 
-        theme = THEMES[self.current_theme]
-
-        # Update global colors used in stylesheet
-        global COLOR_BG, COLOR_BG_GRADIENT_TOP, COLOR_BG_GRADIENT_BOTTOM
-        global COLOR_TEXT, COLOR_TEXT_SECONDARY, COLOR_PANEL, COLOR_PANEL_LIGHTER, COLOR_PANEL_SELECTED
-        COLOR_BG = theme["BG"]
-        COLOR_BG_GRADIENT_TOP = theme["BG_GRADIENT_TOP"]
-        COLOR_BG_GRADIENT_BOTTOM = theme["BG_GRADIENT_BOTTOM"]
-        COLOR_TEXT = theme["TEXT"]
-        COLOR_TEXT_SECONDARY = theme["TEXT_SECONDARY"]
-        COLOR_PANEL = theme["PANEL"]
-        COLOR_PANEL_LIGHTER = theme["PANEL_LIGHTER"]
-        COLOR_PANEL_SELECTED = theme["PANEL_SELECTED"]
-
-        # Update Stylesheet
-        try:
-            self.setStyleSheet(self.generate_stylesheet())
-
-            # Make sure current account details are displayed with new colors
-            self.display_account_details()
+        # The details labels are styled by the theme and need no new text
+        self.theme = self.themes.apply(self, self.current_theme)
 
-        except Exception as e:
-            print("Error applying Stylesheet:", e)
-            self.set_status(f"Style Error: {e}", "error")
+        # The background is rendered again on the next paint
+        self.background_cache = None
+        self.perf.record("theme", start)
 
-        # Repaint the window to apply new colors
-        self.repaint()
+    def on_vault_files_changed(self, paths):
+        """Refreshes the database list once per batch of file system events"""
+        self.scan_for_database_files(quiet=True)
 
-    def scan_for_database_files(self):
+    def scan_for_database_files(self, quiet=False):
         """Searches the directory for compatible database files"""
-        # Save previous selection
-        previous_selection = self.db_file_selector.currentText()
-        previous_file = previous_selection.split(
-            " (")[0] if " (" in previous_selection else previous_selection
-
-        selected_account = None
-        if self.account_list.currentItem():
-            selected_account = self.account_list.currentItem().text()
-
-        # Update status
-        self.set_status("Searching for database files...", "info")
-        QApplication.processEvents()  # Update UI
-
-        # Block signals during update
-        self.db_file_selector.blockSignals(True)
-        self.db_file_selector.clear()
-
-        # Get current directory
-        current_dir = DATABASE_DIR
-
-        found_files = []
-
-        # Keep track of external files that might have been opened
-        external_files = {}
-        for filename, accounts in self.all_db_accounts.items():
-            if filename == self.current_db_file and self.current_db_path:
-                external_files[filename] = (self.current_db_path, accounts)
-
-        # Search for compatible files in current directory
-        for file in os.listdir(current_dir):
-            file_path = os.path.join(current_dir, file)
-            if os.path.isfile(file_path) and not file.startswith('.'):
-                try:
-                    accounts, error = VaultFileManager.try_load_vault_file(
-                        file_path)
-                    if accounts is not None:  # If it's a valid database format
-                        found_files.append((file, len(accounts)))
-                        # Store accounts in the all_db_accounts dictionary
-                        self.all_db_accounts[file] = accounts
-                except Exception as e:
-                    pass  # Ignore non-compatible files
-
-        # Also include any external files that were opened
-        for filename, (file_path, accounts) in external_files.items():
-            # Check if the file still exists
+        start = time.perf_counter()
+
+        # Update status, background refreshes keep the current message
+        if not quiet:
+            self.set_status("Searching for database files...", "info")
+            self.scan_in_progress = True
+
+        # Counters cover the most recent scan only
+        self.vault_cache.reset_stats()
+
+        # Candidate files in the database directory plus opened external files
+        candidates = []
+        try:
+            for file in os.listdir(DATABASE_DIR):
+                file_path = os.path.join(DATABASE_DIR, file)
+                if not file.startswith('.') and file not in self.external_db_paths \
+                        and os.path.isfile(file_path):
+                    candidates.append((file, file_path))
+        except OSError as e:
+            self.set_status(f"Could not read database directory: {e}", "error")
+
+        for filename, file_path in list(self.external_db_paths.items()):
             if os.path.exists(file_path):
-                # Refresh the accounts from file
-                try:
-                    accounts, error = VaultFileManager.try_load_vault_file(
-                        file_path)
-                    if accounts is not None:
-                        found_files.append((filename, len(accounts)))
-                        self.all_db_accounts[filename] = accounts
-                except Exception:
-                    # Keep using the accounts we have if we can't refresh
-                    found_files.append((filename, len(accounts)))
-                    self.all_db_accounts[filename] = accounts
-
-        # Add found files to dropdown
-        if found_files:
-            for file, count in sorted(found_files):
-                self.db_file_selector.addItem(f"{file} ({count} accounts)")
-
-            # Try to restore previous selection
-            index = -1
-            for i in range(self.db_file_selector.count()):
-                item_text = self.db_file_selector.itemText(i)
-                file_name = item_text.split(
-                    " (")[0] if " (" in item_text else item_text
-                if file_name == previous_file:
-                    index = i
-                    break
-
-            if index >= 0:
-                self.db_file_selector.setCurrentIndex(index)
+                candidates.append((filename, file_path))
             else:
-                self.db_file_selector.setCurrentIndex(0)  # Select first file
+                del self.external_db_paths[filename]
 
-            # Update status
-            self.set_status(
-                f"{len(found_files)} database files found", "success")
-        else:
-            self.all_db_accounts = {}
-            self.account_list.clear()
+        # Unchanged files are listed from their metadata, the rest are decoded in the background
+        present = set()
+        for filename, file_path in candidates:
+            present.add(filename)
+            try:
+                key, info = self.vault_cache.lookup_info(file_path)
+            except OSError:
+                continue
+
+            if info is None:
+                self.vault_loader.submit(file_path, key)
+            elif info.error:
+                self.remove_database_entry(filename)
+            elif not self.save_scheduler.is_dirty(file_path):
+                self.set_database_entry(filename, info.record_count)
+
+        # Forget files that have disappeared since the last scan
+        self.vault_cache.prune(path for _, path in candidates)
+        for filename in self.database_filenames():
+            if filename not in present:
+                self.remove_database_entry(filename)
+
+        if not self.vault_loader.is_busy():
+            self.finish_scan()
+
+        self.perf.record("scan", start)
+
+    def finish_scan(self):
+        """Reports the scan result once every pending file has been loaded"""
+        # In a steady state every file is a hit: the scan only stat()ed it
+        stats = self.vault_cache.stats()
+        self.perf.set_counters("cache", hit=stats["hits"], miss=stats["misses"])
+
+        if self.db_file_selector.count() == 0:
+            self.current_accounts = None
+            self.account_model.clear()
             self.details_view.clear()
             self.current_db_indicator.setText("")
             self.website_button.setVisible(False)
+            self.current_db_file = None
             self.current_db_path = None
-            self.set_status("No database files found", "error")
+            if self.scan_in_progress:
+                self.set_status("No database files found", "error")
+        elif self.scan_in_progress:
+            self.set_status(
+                f"{self.db_file_selector.count()} database files found "
+                f"({stats['hits']} unchanged, {stats['misses']} read)", "success")
+
+        self.scan_in_progress = False
+
+    def on_vault_loaded(self, file_path, accounts, error, vault_key=None):
+        """Receives a decoded vault file, either from the cache or the background loader"""
+        filename = os.path.basename(file_path)
+        if accounts is not None and not self.vault_busy(file_path):
+            # The loader cached these accounts, their key goes with them
+            self.vault_keys[file_path] = vault_key
+        history = self.vault_loader.history
+        if history and history[-1]["path"] == file_path:
+            self.perf.add("load", history[-1]["seconds"] * 1000)
+
+        if file_path in self.pending_external_paths:
+            self.pending_external_paths.discard(file_path)
+            if accounts is None:
+                QMessageBox.warning(self, "Open Error",
+                                    f"Could not open file: {error}")
+                return
 
-        # Release signals
-        self.db_file_selector.blockSignals(False)
+            # Add to the known external files and select it
+            self.external_db_paths[filename] = file_path
+            self.vault_watcher.watch_file(file_path)
+            self.pending_selection = filename
+            self.set_status(f"Opened external database: {filename}", "success")
+        elif file_path != self.database_path(filename):
+            return  # Result for a file that is no longer listed
+        elif self.vault_busy(file_path):
+            # Memory is ahead of the file until the pending save lands
+            self.reload_after_save.add(file_path)
+            return
 
-        # Load accounts for current file
-        self.change_database_file()
+        if accounts is None:
+            self.remove_database_entry(filename)
+            return
+
+        # Only re-render the list if the current database actually changed
+        changed = filename == self.current_db_file and self.current_accounts is not accounts
+        self.set_database_entry(filename, len(accounts))
+
+        if changed and filename == self.current_db_file:
+            selected_account = self.selected_account_name()
+            self.current_accounts = accounts
+            self.load_account_list()
+            if selected_account:
+                self.select_account(selected_account)
+
+    def database_path(self, filename):
+        """Returns the full path of a known database file"""
+        return self.external_db_paths.get(filename) or os.path.join(DATABASE_DIR, filename)
+
+    def database_filenames(self):
+        """Returns the filenames listed in the database selector"""
+        return [self.db_file_selector.itemData(i) for i in range(self.db_file_selector.count())]
+
+    def find_database_index(self, filename):
+        """Returns the selector index of a database file, or -1"""
+        for i in range(self.db_file_selector.count()):
+            if self.db_file_selector.itemData(i) == filename:
+                return i
+        return -1
+
+    def set_database_entry(self, filename, count):
+        """Adds or updates a database in the selector, keeping entries sorted"""
+        text = f"{filename} ({count} accounts)"
+        index = self.find_database_index(filename)
+        if index >= 0:
+            self.db_file_selector.setItemText(index, text)
+        else:
+            index = 0
+            while index < self.db_file_selector.count() and \
+                    self.db_file_selector.itemData(index) < filename:
+                index += 1
+            self.db_file_selector.blockSignals(True)
+            self.db_file_selector.insertItem(index, text, filename)
+            self.db_file_selector.blockSignals(False)
+
+        # Select the first database that arrives, or the one we are waiting for
+        if filename == self.pending_selection or self.current_db_file is None:
+            self.pending_selection = None
+            if self.db_file_selector.currentIndex() != index:
+                self.db_file_selector.setCurrentIndex(index)
+            else:
+                self.change_database_file()
+
+    def remove_database_entry(self, filename):
+        """Removes a database from memory and from the selector"""
+        self.vault_cache.unpin(self.database_path(filename))
+        index = self.find_database_index(filename)
+        if index >= 0:
+            # Switches to a neighbouring database if this one was selected
+            self.db_file_selector.removeItem(index)
+
+    def selected_account_name(self):
+        """Returns the name of the selected account, or None"""
+        rows = self.account_list.selectionModel().selectedRows()
+        if not rows:
+            return None
+        return self.account_model.name_at(rows[0].row())
+
+    def insert_account_row(self, account_name):
+        """Inserts a single account into the list, keeping scroll position"""
+        scroll_bar = self.account_list.verticalScrollBar()
+        scroll_value = scroll_bar.value()
+        self.account_model.insert_name(account_name)
+        scroll_bar.setValue(scroll_value)
+
+    def remove_account_row(self, account_name):
+        """Removes a single account from the list, keeping scroll position"""
+        scroll_bar = self.account_list.verticalScrollBar()
+        scroll_value = scroll_bar.value()
+
+        # Keep Qt from selecting a neighbour of the removed row
+        selection_model = self.account_list.selectionModel()
+        selection_model.blockSignals(True)
+        removed = self.account_model.remove_name(account_name)
+        selection_model.clear()
+        selection_model.blockSignals(False)
+
+        scroll_bar.setValue(scroll_value)
+        if removed:
+            self.display_account_details()
 
-        # Attempts to select the previously selected account again
-        if selected_account:
-            for i in range(self.account_list.count()):
-                if self.account_list.item(i).text() == selected_account:
-                    self.account_list.setCurrentRow(i)
-                    break
+    def select_account(self, account_name):
+        """Selects an account in the list by name"""
+        row = self.account_model.row_of(account_name)
+        if row < 0:
+            return False
+        self.account_list.setCurrentIndex(self.account_model.index(row))
+        return True
 
     def change_database_file(self):
         """Changes the current database file"""
         if self.db_file_selector.count() == 0:
             self.current_db_file = None
             self.current_db_path = None
-            self.account_list.clear()
+            self.current_accounts = None
+            self.pin_database(None)
+            self.account_model.clear()
             self.current_db_indicator.setText("")
             self.details_view.clear()
             return
 
-        # Extract filename from ComboBox text (Format: "filename (X accounts)")
-        full_text = self.db_file_selector.currentText()
-        new_db_file = full_text.split(
-            " (")[0] if " (" in full_text else full_text
-
-        # Check if this is a different file than the current one
-        if new_db_file != self.current_db_file:
-            self.current_db_file = new_db_file
-
-            # Reset current_db_path unless we're switching to a known external file
-            known_external = False
-            if self.current_db_file in self.all_db_accounts:
-                self.current_db_path = None  # Reset to None by default
-
-                # Check if this is an external file we've opened
-                for i in range(self.db_file_selector.count()):
-                    item_text = self.db_file_selector.itemText(i)
-                    if item_text.startswith(f"{self.current_db_file} ("):
-                        # It's in our list, but we need to check if it's an external file
-                        # This would require checking each file against a record of external files
-                        # For simplicity, we assume it's a local file for now
-                        break
+        # Each selector entry carries its filename as item data
+        self.current_db_file = self.db_file_selector.currentData()
+
+        # Decrypted records of the previous database are not needed any more
+        self.opened_records.clear()
+
+        # External files keep their full path, local files live in DATABASE_DIR
+        self.current_db_path = self.external_db_paths.get(self.current_db_file)
+
+        # Records of databases not used recently are decoded again on demand
+        file_path = self.database_path(self.current_db_file)
+        self.pin_database(file_path)
+        self.current_accounts = self.vault_cache.accounts(file_path)
+        if self.current_accounts is None:
+            self.vault_loader.submit(file_path)
+            self.set_status(f"Loading {self.current_db_file}...", "info")
 
         # Update the current database indicator in header
         self.current_db_indicator.setText(f"Current: {self.current_db_file}")
@@ -704,225 +836,340 @@ class AccountManager(QWidget):
         # Show location button should be visible if we have a current db file
         self.show_location_btn.setVisible(bool(self.current_db_file))
 
-    def save_accounts(self, filename):
-        """Saves the accounts to the database file"""
+    def pin_database(self, file_path):
+        """Keeps the shown database resident and releases the previous one"""
+        previous_path = self.pinned_db_path
+        self.pinned_db_path = file_path
+        if file_path:
+            self.vault_cache.pin(file_path)
+
+        # Unsaved edits stay resident until on_vault_saved releases them
+        if previous_path and previous_path != file_path \
+                and not self.save_scheduler.is_dirty(previous_path):
+            self.vault_cache.unpin(previous_path)
+
+    def save_accounts(self, filename, changes=None):
+        """Queues the accounts of a database file for saving
+
+        When changes ({account_name: record or None}) is given only those
+        records are appended to the vault journal instead of rewriting it.
+        Saves within a short window are coalesced into one durable write;
+        failures are reported by on_vault_saved.
+        """
         if not filename:
             return False
 
-        try:
-            # Get the accounts for the current file
-            accounts = self.all_db_accounts.get(filename, {})
+        # External files keep their own path, local files live in DATABASE_DIR
+        file_path = self.database_path(filename)
+        accounts = self.vault_accounts(file_path)
+        if accounts is None:
+            return False
 
-            # Determine the file path
-            if filename == self.current_db_file and self.current_db_path:
-                # This is an external file
-                file_path = self.current_db_path
-            else:
-                # This is a local file
-                file_path = os.path.join(DATABASE_DIR, filename)
+        self.save_scheduler.mark_dirty(file_path, accounts, changes)
+        return True
 
-            # Save the file
-            success, error = VaultFileManager.save_vault_file(
-                file_path, accounts)
+    def on_vault_saved(self, file_path, success, error, stats):
+        """Handles the result of a background save"""
+        self.perf.add("save", stats["seconds"] * 1000)
+        if not success:
+            # The scheduler keeps the vault dirty, and so resident, until a save succeeds
+            QMessageBox.critical(self, "Save Error",
+                                 f"Could not save database: {error}\n"
+                                 "The changes are kept and saved again with the next edit.")
+            return
 
-            if not success:
-                QMessageBox.critical(self, "Save Error",
-                                     f"Could not save database: {error}")
-                return False
+        if self.save_scheduler.is_dirty(file_path):
+            return
 
-            return True
-        except Exception as e:
-            QMessageBox.critical(self, "Save Error",
-                                 f"Could not save database: {e}")
-            return False
+        if file_path in self.reload_after_save:
+            # The file was also changed elsewhere, read back both changes
+            self.reload_after_save.discard(file_path)
+            self.vault_loader.submit(file_path)
+        else:
+            # Our own write does not need to be decoded again by the next scan
+            accounts = self.vault_accounts(file_path)
+            if accounts is not None:
+                self.vault_cache.remember(file_path, accounts)
+        if file_path != self.pinned_db_path:
+            self.vault_cache.unpin(file_path)
+
+    def vault_busy(self, file_path):
+        """Returns True while a vault file is being written: a save is queued or an import runs"""
+        return self.save_scheduler.is_dirty(file_path) or self.vault_importer.is_importing(file_path)
+
+    def vault_accounts(self, file_path):
+        """Returns the accounts of a vault file as edited, or None if they are not in memory
+
+        The shown database is edited in current_accounts, which stays the
+        source of truth while a load of its file is ignored.
+        """
+        if self.current_db_file and file_path == self.database_path(self.current_db_file):
+            return self.current_accounts
+        return self.vault_cache.accounts(file_path)
 
     def load_account_list(self):
         """Loads the account list for the current database"""
-        self.account_list.clear()
+        start = time.perf_counter()
+        self.account_model.clear()
 
         if not self.current_db_file:
+            self.search_index.reset(None)
+        else:
+            # The index is built on the first search in this database
+            self.search_index.reset(self.current_accounts)
+
+            # Rows are produced on demand by the model
+            self.search_accounts()
+
+        self.perf.record("list", start)
+
+    def search_accounts(self):
+        """Shows the accounts matching the search box, best match first"""
+        self.search_timer.stop()
+        self.search_results = None
+
+        accounts = self.current_accounts
+        query = self.search_input.text().strip()
+        if accounts is None or not query:
+            self.account_panel.title_label.setText("Accounts")
+        if accounts is None:
+            # While the records load, list the names kept for every scanned database
+            if self.current_db_file and not query:
+                self.account_model.set_names(
+                    self.vault_cache.names(self.database_path(self.current_db_file)))
+            else:
+                self.account_model.clear()
             return
 
-        if self.current_db_file not in self.all_db_accounts:
+        selected_account = self.selected_account_name()
+        if not query:
+            self.account_model.set_names(accounts)
+        else:
+            # The best matches are shown at once, the rest is streamed in
+            self.search_results = self.search_index.search(query)
+            self.account_model.set_results([])
+            self.stream_search_results(SEARCH_KEYSTROKE_MS)
+            if self.search_results is not None:
+                self.search_timer.start(0)
+
+        if selected_account and not self.select_account(selected_account):
+            self.display_account_details()
+
+    def stream_search_results(self, budget_ms=SEARCH_STREAM_MS):
+        """Ranks search results for a few milliseconds and adds them to the list"""
+        if self.search_results is None:
+            self.search_timer.stop()
             return
 
-        # Add accounts to list
-        for account_name in sorted(self.all_db_accounts[self.current_db_file].keys()):
-            item = QListWidgetItem(account_name)
-            # Add hover animation effect via style
-            item.setToolTip("Click to view details")
-            self.account_list.addItem(item)
-
-    def generate_stylesheet(self):
-        """Generates the stylesheet based on the current theme"""
-        return f"""
-            QWidget {{
-                background-color: {COLOR_BG};
-                color: {COLOR_TEXT};
-                font-family: 'Segoe UI', Arial, sans-serif;
-            }}
-            QLabel {{
-                color: {COLOR_TEXT};
-            }}
-            QLineEdit {{
-                background-color: {COLOR_PANEL_LIGHTER};
-                color: {COLOR_TEXT};
-                border: 1px solid rgba(138, 43, 226, 150);
-                border-radius: 8px;
-                padding: 8px;
-                font-size: 14px;
-            }}
-            QLineEdit:focus {{
-                border: 2px solid {COLOR_PRIMARY};
-            }}
-            QTextEdit {{
-                background-color: {COLOR_PANEL_LIGHTER};
-                color: {COLOR_TEXT};
-                border: 1px solid rgba(138, 43, 226, 150);
-                border-radius: 8px;
-                font-size: 14px;
-                padding: 8px;
-            }}
-            QListWidget {{
-                background-color: {COLOR_PANEL_LIGHTER};
-                color: {COLOR_TEXT};
-                border: 1px solid rgba(138, 43, 226, 150);
-                border-radius: 8px;
-                font-size: 14px;
-                padding: 5px;
-            }}
-            QListWidget::item {{
-                border-radius: 5px;
-                padding: 8px;
-                margin: 2px;
-            }}
-            QListWidget::item:hover {{
-                background-color: rgba(138, 43, 226, 30);
-            }}
-            QListWidget::item:selected {{
-                background-color: {COLOR_PANEL_SELECTED};
-                color: {COLOR_TEXT};
-                border-left: 3px solid {COLOR_ACCENT};
-            }}
-            QComboBox {{
-                background-color: {COLOR_PANEL_LIGHTER};
-                color: {COLOR_TEXT};
-                border: 1px solid rgba(138, 43, 226, 150);
-                border-radius: 8px;
-                padding: 8px;
-                padding-right: 20px;
-                font-size: 14px;
-                min-height: 25px;
-            }}
-            QComboBox:hover {{
-                border: 1px solid {COLOR_PRIMARY};
-            }}
-            QComboBox::drop-down {{
-                border: 0px;
-                width: 20px;
-            }}
-            QComboBox::down-arrow {{
-                image: url(down_arrow.png);
-                width: 12px;
-                height: 12px;
-            }}
-            QComboBox QAbstractItemView {{
-                background-color: {COLOR_PANEL};
-                color: {COLOR_TEXT};
-                selection-background-color: {COLOR_PANEL_SELECTED};
-                selection-color: {COLOR_TEXT};
-                border: 1px solid {COLOR_PRIMARY};
-                border-radius: 8px;
-                padding: 5px;
-            }}
-            QScrollBar:vertical {{
-                border: none;
-                background-color: rgba(40, 40, 50, 100);
-                width: 10px;
-                margin: 0px;
-                border-radius: 5px;
-            }}
-            QScrollBar::handle:vertical {{
-                background-color: rgba(138, 43, 226, 150);
-                min-height: 20px;
-                border-radius: 5px;
-            }}
-            QScrollBar::handle:vertical:hover {{
-                background-color: rgba(154, 59, 242, 180);
-            }}
-            QScrollBar::add-line:vertical, QScrollBar::sub-line:vertical {{
-                height: 0px;
-            }}
-            QScrollBar:horizontal {{
-                border: none;
-                background-color: rgba(40, 40, 50, 100);
-                height: 10px;
-                margin: 0px;
-                border-radius: 5px;
-            }}
-            QScrollBar::handle:horizontal {{
-                background-color: rgba(138, 43, 226, 150);
-                min-width: 20px;
-                border-radius: 5px;
-            }}
-            QScrollBar::handle:horizontal:hover {{
-                background-color: rgba(154, 59, 242, 180);
-            }}
-            QScrollBar::add-line:horizontal, QScrollBar::sub-line:horizontal {{
-                width: 0px;
-            }}
-            QSplitter::handle {{
-                background-color: rgba(138, 43, 226, 50);
-                width: 2px;
-            }}
-            QSplitter::handle:hover {{
-                background-color: {COLOR_PRIMARY};
-            }}
-        """
+        deadline = time.perf_counter() + budget_ms / 1000
+        batch = []
+        finished = False
+        while time.perf_counter() < deadline:
+            try:
+                batch.extend(next(self.search_results))
+            except StopIteration:
+                finished = True
+                break
+
+        if batch:
+            self.account_model.append_results(batch)
+
+        if finished:
+            self.search_timer.stop()
+            self.search_results = None
+            self.account_panel.title_label.setText(
+                f"Accounts ({self.account_model.result_count()} found)")
 
     def init_snowflakes(self):
         """Initialize the snowflake animation elements"""
-        width = self.width()
-        height = self.height()
-        self.snowflakes = [
-            Snowflake(
-                random.randint(0, width),
-                random.randint(0, height),
-                random.randint(1, 4),
-                random.uniform(0.5, 2.5),
-                width, height
-            ) for _ in range(150)
-        ]
+        self.snowfall.reset(self.width(), self.height())
+
+    def closeEvent(self, event):
+        """Makes sure every pending save is on disk before the window closes"""
+        self.vault_unlocker.wait()
+        self.vault_importer.cancel()
+        self.vault_importer.wait()
+        self.save_scheduler.flush()
+        if PERF_EXPORT:
+            self.perf.export(PERF_EXPORT)
+        super().closeEvent(event)
+
+    def current_vault_key(self):
+        """Returns the VaultKey of the current database, or None if it is not encrypted"""
+        if not self.current_db_file:
+            return None
+        return self.vault_keys.get(self.database_path(self.current_db_file))
+
+    def request_unlock(self, ask=True):
+        """Asks for the master password of the current database and unlocks it in the background
+
+        With ask=False nothing is asked if the user already cancelled once.
+        """
+        file_path = self.database_path(self.current_db_file)
+        if self.vault_unlocker.is_pending(file_path):
+            return
+        if not ask and file_path in self.declined_unlock_paths:
+            return
+
+        password, ok = QInputDialog.getText(
+            self, "Unlock Database",
+            f"Enter the master password of '{self.current_db_file}':",
+            QLineEdit.EchoMode.Password, "")
+        if not ok or not password:
+            self.declined_unlock_paths.add(file_path)
+            return
+
+        self.declined_unlock_paths.discard(file_path)
+        self.vault_unlocker.submit(file_path, password)
+        self.set_status(f"Unlocking {self.current_db_file}...", "info")
+
+    def on_vault_unlocked(self, file_path, success, error):
+        """Handles a finished key derivation, for unlocking or creating a database"""
+        filename = os.path.basename(file_path)
+        if file_path in self.pending_created_paths:
+            self.pending_created_paths.discard(file_path)
+            if not success:
+                QMessageBox.critical(self, "Creation Error",
+                                     f"Could not create database: {error}")
+                return
+            # The scan loads the new vault, which brings its key
+            self.pending_selection = filename
+            self.scan_for_database_files()
+            self.set_status(f"Encrypted database '{filename}' created successfully", "success")
+            return
+
+        if not success:
+            QMessageBox.warning(self, "Unlock Error",
+                                f"Could not unlock database: {error}")
+            return
+
+        self.set_status(f"Database '{filename}' unlocked", "success")
+        if self.current_db_file and file_path == self.database_path(self.current_db_file):
+            # Emails and websites become searchable
+            self.search_index.reset(self.current_accounts)
+            if self.search_input.text().strip():
+                self.search_accounts()
+            self.display_account_details()
+
+    def open_account(self, account_name, ask=True):
+        """Returns the decrypted record of an account of the current database
+
+        Records of encrypted databases are decrypted here, one at a time, and
+        kept for a while in opened_records. Returns None while the database
+        is locked, after asking to unlock it.
+        """
+        source = self.current_accounts[account_name]
+        account_data = self.opened_records.get(account_name, source)
+        if account_data is not None:
+            return account_data
+        try:
+            account_data = source.unsealed(account_name)
+        except ValueError as e:
+            self.set_status(f"Could not decrypt '{account_name}': {e}", "error")
+            return None
+        if account_data is None:
+            self.request_unlock(ask)
+            return None
+        self.opened_records.put(account_name, source, account_data)
+        return account_data
+
+    def prefetch_neighbours(self):
+        """Decrypts the records next to the selection before the arrow keys reach them"""
+        rows = self.account_list.selectionModel().selectedRows()
+        accounts = self.current_accounts
+        if not rows or accounts is None:
+            return
+
+        row = rows[0].row()
+        row_count = self.account_model.rowCount()
+        for offset in range(1, PREFETCH_ROWS + 1):
+            for neighbour in (row + offset, row - offset):
+                if not 0 <= neighbour < row_count:
+                    continue
+                account_name = self.account_model.name_at(neighbour)
+                source = accounts.get(account_name)
+                if source is None or isinstance(source, AccountRecord) \
+                        or self.opened_records.get(account_name, source) is not None:
+                    continue
+                try:
+                    account_data = source.unsealed(account_name)
+                except ValueError:
+                    continue  # Reported if the record gets selected
+                if account_data is None:
+                    return  # Locked
+                self.opened_records.put(account_name, source, account_data)
+
+    def current_store(self):
+        """Returns a VaultStore editing the current database, or None while it loads
+
+        The store works on current_accounts itself; its changes are handed
+        to the save scheduler by save_store.
+        """
+        if not self.current_db_file or self.current_accounts is None:
+            return None
+        return VaultStore(self.database_path(self.current_db_file),
+                          self.current_accounts, self.current_vault_key())
+
+    def save_store(self, store):
+        """Queues the changes made through a VaultStore of the current database for saving"""
+        return self.save_accounts(self.current_db_file, store.take_changes())
 
     def resizeEvent(self, event):
         """Handle window resize events"""
         super().resizeEvent(event)
-        self.init_snowflakes()
+        self.snowfall.resize(self.width(), self.height())
+
+        # Dragging an edge sends many resizes, the background is rendered once they stop
+        self.background_timer.start(RESIZE_SETTLE_MS)
+        if self.perf_overlay.isVisible():
+            self.perf_overlay.refresh()
+
+    def background_pixmap(self):
+        """Returns the gradient background, rendered again only for a new size, theme or pixel ratio
+
+        While the window is being resized the last background is returned as is.
+        """
+        ratio = self.devicePixelRatioF()
+        key = (self.width(), self.height(), self.current_theme, ratio)
+        if self.background_cache is not None and self.background_timer.isActive():
+            return self.background_cache
+        if self.background_cache is None or self.background_cache_key != key:
+            pixmap = QPixmap(round(self.width() * ratio), round(self.height() * ratio))
+            pixmap.setDevicePixelRatio(ratio)
+            painter = QPainter(pixmap)
+            gradient = QLinearGradient(0, 0, 0, self.height())
+            gradient.setColorAt(0, QColor(self.theme["BG_GRADIENT_TOP"]))
+            gradient.setColorAt(1, QColor(self.theme["BG_GRADIENT_BOTTOM"]))
+            painter.fillRect(self.rect(), gradient)
+            painter.end()
+            self.background_cache = pixmap
+            self.background_cache_key = key
+        return self.background_cache
 
     def paintEvent(self, event):
         """Paint event for background and special effects"""
+        start = time.perf_counter()
+        self.perf.frame()
         super().paintEvent(event)
         painter = QPainter(self)
-        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
 
-        # Draw dark gradient background
-        gradient = QLinearGradient(0, 0, 0, self.height())
-        gradient.setColorAt(0, QColor(COLOR_BG_GRADIENT_TOP))
-        gradient.setColorAt(1, QColor(COLOR_BG_GRADIENT_BOTTOM))
-        painter.fillRect(self.rect(), gradient)
+        # Qt clips painting to the dirty region, only those pixels are copied;
+        # a background from before a resize is stretched until it is rendered again
+        painter.drawPixmap(self.rect(), self.background_pixmap())
 
         # Draw snowflakes
-        for flake in self.snowflakes:
-            painter.setBrush(QBrush(QColor(255, 255, 255, flake.opacity)))
-            painter.setPen(Qt.PenStyle.NoPen)
-            painter.drawEllipse(
-                QPoint(int(flake.x), int(flake.y)), flake.size, flake.size)
+        self.snowfall.paint(painter)
+        painter.end()
+        self.perf.record("paint", start)
 
     def update_snowflakes(self):
         """Update snowflake positions for animation"""
-        for flake in self.snowflakes:
-            flake.fall()
-        self.update()
+        start = time.perf_counter()
+        self.snowfall.step()
+
+        # Only where flakes were and are now needs repainting
+        self.update(self.snowfall.dirty_region())
+        self.perf.record("tick", start)
 
     def set_status(self, message, status_type="info"):
         """Sets status message with animation effect"""
@@ -965,27 +1212,41 @@ class AccountManager(QWidget):
                     self, "Error", f"A file named '{name}' already exists.")
                 return
 
-            # Create empty database and save it immediately
-            self.all_db_accounts[name] = {}
+            # Encrypted databases get their key derived in the background
+            password, ok = QInputDialog.getText(
+                self, "New Database",
+                "Master password to encrypt the database (leave empty for none):",
+                QLineEdit.EchoMode.Password, "")
+            if not ok:
+                return
+            if password:
+                repeated, ok = QInputDialog.getText(
+                    self, "New Database", "Repeat the master password:",
+                    QLineEdit.EchoMode.Password, "")
+                if not ok:
+                    return
+                if repeated != password:
+                    QMessageBox.warning(self, "Error", "The master passwords do not match.")
+                    return
+                self.pending_created_paths.add(file_path)
+                self.vault_unlocker.submit(file_path, password, create=True)
+                self.set_status(f"Creating encrypted database '{name}'...", "info")
+                return
 
             # Create and save empty database
             try:
-                success, error = VaultFileManager.save_vault_file(
-                    file_path, {})
-                if not success:
+                store, error = VaultStore.create(file_path)
+                if store is None:
                     QMessageBox.critical(
                         self, "Creation Error", f"Could not create database: {error}")
                     return
 
-                # Update the view
+                # Update the view and select the new database
+                self.vault_cache.remember(file_path, store.accounts)
+                self.vault_keys[file_path] = store.key
+                self.pending_selection = name
                 self.scan_for_database_files()
 
-                # Select the new database
-                for i in range(self.db_file_selector.count()):
-                    if self.db_file_selector.itemText(i).startswith(f"{name} ("):
-                        self.db_file_selector.setCurrentIndex(i)
-                        break
-
                 self.set_status(
                     f"Database '{name}' created successfully", "success")
             except Exception as e:
@@ -1008,33 +1269,27 @@ class AccountManager(QWidget):
 
         if confirm == QMessageBox.StandardButton.Yes:
             try:
-                # Delete the file
-                if self.current_db_path:  # External file
-                    file_path = self.current_db_path
-                else:  # Local file
-                    file_path = os.path.join(
-                        DATABASE_DIR, self.current_db_file)
+                deleted_file = self.current_db_file
 
+                # Delete the file, pending saves would recreate it
+                file_path = self.database_path(deleted_file)
+                self.save_scheduler.discard(file_path)
                 if os.path.exists(file_path):
                     os.remove(file_path)
 
-                # Remove from dictionary
-                if self.current_db_file in self.all_db_accounts:
-                    del self.all_db_accounts[self.current_db_file]
-
                 # Clear UI
-                self.account_list.clear()
+                self.account_model.clear()
                 self.details_view.clear()
 
+                # Remove from the selector, which switches to another database
+                self.external_db_paths.pop(deleted_file, None)
+                self.remove_database_entry(deleted_file)
+
                 # Update the database list
                 self.scan_for_database_files()
 
                 self.set_status(
-                    f"Database '{self.current_db_file}' deleted successfully", "success")
-
-                # Reset current file
-                self.current_db_file = None
-                self.current_db_path = None
+                    f"Database '{deleted_file}' deleted successfully", "success")
             except Exception as e:
                 QMessageBox.critical(self, "Deletion Error",
                                      f"Could not delete database: {e}")
@@ -1045,6 +1300,10 @@ class AccountManager(QWidget):
             QMessageBox.warning(self, "Error", "No database selected.")
             return
 
+        if self.current_accounts is None:
+            QMessageBox.warning(self, "Error", "The database is still loading.")
+            return
+
         name = self.name_input.text()
         password = self.pass_input.text()
         email = self.email_input.text()  # Get email value (optional)
@@ -1061,7 +1320,7 @@ class AccountManager(QWidget):
             return
 
         # Check if account already exists
-        if name in self.all_db_accounts[self.current_db_file]:
+        if name in self.current_accounts:
             confirm = QMessageBox.question(
                 self,
                 "Account Exists",
@@ -1071,18 +1330,20 @@ class AccountManager(QWidget):
             if confirm != QMessageBox.StandardButton.Yes:
                 return
 
-        # Create account data dictionary with all fields
-        account_data = {
-            "password": password,
-            "email": email,
-            "website": website,
-            "created": time.strftime('%Y-%m-%d %H:%M:%S')
-        }
+        # Create the account record with all fields, encrypted databases store it sealed
+        store = self.current_store()
+        is_new = name not in store
+        try:
+            account_data = store.put(name, AccountRecord.create(password, email, website))
+        except VaultLockedError:
+            self.request_unlock()
+            self.set_status("Unlock the database to add accounts", "error")
+            return
 
         # Add account to current database
-        self.all_db_accounts[self.current_db_file][name] = account_data
-        self.save_accounts(self.current_db_file)
-        self.load_account_list()
+        accounts = self.current_accounts
+        self.search_index.update(name, account_data)
+        self.save_store(store)
 
         # Clear input fields
         self.name_input.clear()
@@ -1090,26 +1351,27 @@ class AccountManager(QWidget):
         self.website_input.clear()
         self.pass_input.clear()
 
-        # Update the filename in dropdown to show new account count
-        self.scan_for_database_files()
+        # Update only the affected list row and dropdown entry, search results are re-ranked
+        if self.search_input.text().strip():
+            self.search_accounts()
+        elif is_new:
+            self.insert_account_row(name)
+        if is_new:
+            self.set_database_entry(self.current_db_file, len(accounts))
 
         # Select the newly added account
-        for i in range(self.account_list.count()):
-            if self.account_list.item(i).text() == name:
-                self.account_list.setCurrentRow(i)
-                break
+        if not self.select_account(name) or not is_new:
+            self.display_account_details()
 
         self.set_status(f"Account '{name}' added successfully", "success")
 
     def del_account(self):
         """Deletes the selected account"""
-        selected_items = self.account_list.selectedItems()
-        if not selected_items:
+        account_name = self.selected_account_name()
+        if account_name is None:
             QMessageBox.warning(self, "Error", "No account selected.")
             return
 
-        account_name = selected_items[0].text()
-
         # Ask for confirmation
         confirm = QMessageBox.question(
             self,
@@ -1120,80 +1382,144 @@ class AccountManager(QWidget):
 
         if confirm == QMessageBox.StandardButton.Yes:
             # Delete account from database
-            if account_name in self.all_db_accounts[self.current_db_file]:
-                del self.all_db_accounts[self.current_db_file][account_name]
-                self.save_accounts(self.current_db_file)
-                self.load_account_list()
-                self.details_view.clear()
+            store = self.current_store()
+            if store is not None and store.delete(account_name):
+                accounts = self.current_accounts
+                self.search_index.remove(account_name)
+                self.save_store(store)
 
-                # Update the filename in dropdown to show new account count
-                self.scan_for_database_files()
+                # Update only the affected list row and dropdown entry
+                self.remove_account_row(account_name)
+                self.set_database_entry(self.current_db_file, len(accounts))
 
                 self.set_status(
                     f"Account '{account_name}' deleted successfully", "success")
 
+    def import_accounts(self):
+        """Imports a CSV export of a browser or password manager into the current database"""
+        if not self.current_db_file:
+            QMessageBox.warning(self, "Error", "No database selected.")
+            return
+
+        store = self.current_store()
+        if store is None:
+            QMessageBox.warning(self, "Error", "The database is still loading.")
+            return
+        if store.locked:
+            self.request_unlock()
+            self.set_status("Unlock the database to import accounts", "error")
+            return
+
+        file_path, _ = QFileDialog.getOpenFileName(
+            self, "Import Accounts", "", "CSV Files (*.csv);;All Files (*)")
+        if not file_path:
+            return
+
+        # What to do with accounts whose name is already taken, see csv_import.py
+        choices = {"Keep both, renaming the imported one": "rename",
+                   "Keep the existing one": "skip",
+                   "Replace the existing one": "replace"}
+        choice, ok = QInputDialog.getItem(
+            self, "Import Accounts", "When an account name is already taken:",
+            list(choices), 0, False)
+        if not ok:
+            return
+
+        # Queued edits land first, the import is written after them in one go
+        self.save_scheduler.flush()
+
+        # The import reads and writes a copy, current_accounts changes when it is done
+        self.vault_importer.submit(VaultStore(store.file_path, dict(store.accounts), store.key),
+                                   file_path, choices[choice])
+
+        # Shown at once, it keeps the window from being edited while the import runs
+        self.import_dialog = QProgressDialog("Importing accounts...", "Cancel", 0, 1000, self)
+        self.import_dialog.setWindowTitle("Import Accounts")
+        self.import_dialog.setWindowModality(Qt.WindowModality.WindowModal)
+        self.import_dialog.setAutoReset(False)
+        self.import_dialog.setAutoClose(False)
+        self.import_dialog.canceled.connect(self.vault_importer.cancel)
+        self.import_dialog.show()
+
+    def on_import_progress(self, rows, bytes_read, total_bytes):
+        """Shows the progress of the running import"""
+        if self.import_dialog is None:
+            return
+        if bytes_read >= total_bytes:
+            self.import_dialog.setLabelText(f"Saving {rows} rows...")
+            self.import_dialog.setCancelButton(None)  # The write is not cancelled
+        else:
+            self.import_dialog.setLabelText(f"Importing accounts... {rows} rows read")
+        self.import_dialog.setValue(bytes_read * 1000 // max(total_bytes, 1))
+
+    def on_import_finished(self, store, csv_path, stats, error):
+        """Shows the accounts of a finished import, or why it failed"""
+        if self.import_dialog is not None:
+            self.import_dialog.close()
+            self.import_dialog = None
+
+        file_path = store.file_path
+        if error:
+            QMessageBox.warning(self, "Import Error",
+                                f"Could not import {os.path.basename(csv_path)}: {error}")
+        else:
+            # Unless every row was skipped the import wrote the vault, and the
+            # next scan does not need to decode it again
+            if store.history:
+                self.vault_cache.remember(file_path, store.accounts)
+                if self.current_db_file and file_path == self.database_path(self.current_db_file):
+                    self.current_accounts = store.accounts
+                    self.set_database_entry(self.current_db_file, len(store.accounts))
+                    self.load_account_list()
+
+            imported = stats["added"] + stats["renamed"] + stats["replaced"]
+            self.set_status(
+                f"Imported {imported} accounts, {stats['skipped']} skipped, "
+                f"{stats['invalid']} invalid", "success")
+
+        # Changes made elsewhere while the import ran are read back now
+        if file_path in self.reload_after_save:
+            self.reload_after_save.discard(file_path)
+            self.vault_loader.submit(file_path)
+
     def display_account_details(self):
         """Displays the details of the selected account"""
-        selected_items = self.account_list.selectedItems()
-        if not selected_items:
+        account_name = self.selected_account_name()
+        if account_name is None:
             self.details_view.clear()
             self.details_panel.title_label.setText("Account Details")
             self.website_button.setVisible(False)
             self.current_website_url = None
             return
 
-        account_name = selected_items[0].text()
-        if self.current_db_file and account_name in self.all_db_accounts[self.current_db_file]:
-            account_data = self.all_db_accounts[self.current_db_file][account_name]
-
-            # Handle both old and new data format
-            if isinstance(account_data, str):
-                # Old format: password only
-                password = account_data
-                email = ""
-                website = ""
-                created_time = time.strftime('%Y-%m-%d %H:%M:%S')
-            else:
-                # New format: dictionary with all fields
-                password = account_data.get("password", "")
-                email = account_data.get("email", "")
-                website = account_data.get("website", "")
-                created_time = account_data.get(
-                    "created", time.strftime('%Y-%m-%d %H:%M:%S'))
+        if self.current_accounts is not None and account_name in self.current_accounts:
+            account_data = self.open_account(account_name, ask=False)
+            if account_data is None:
+                self.details_view.show_message(
+                    f"This database is encrypted. Unlock it to show '{account_name}'.")
+                self.details_panel.title_label.setText(
+                    f"Account Details: {account_name}")
+                self.website_button.setVisible(False)
+                self.current_website_url = None
+                return
+
+            website = account_data.website
+            created_time = account_data.created_text or time.strftime('%Y-%m-%d %H:%M:%S')
 
             # Store current website URL and update button visibility
             self.current_website_url = website
             self.website_button.setVisible(bool(website))
 
-            # Update details view with formatted HTML
-            self.details_view.setHtml(f"""
-                <style>
-                    body {{ font-family: 'Segoe UI', Arial, sans-serif; color: {COLOR_TEXT}; }}
-                    .label {{ color: {COLOR_TEXT_SECONDARY}; font-size: 14px; margin-bottom: 5px; }}
-                    .value {{ color: {COLOR_TEXT}; font-size: 16px; margin-bottom: 15px; 
-                              background-color: rgba(60, 50, 90, 100); padding: 8px; border-radius: 5px; }}
-                    .password {{ font-family: monospace; letter-spacing: 1px; }}
-                </style>
-                <div class="label">Account Name:</div>
-                <div class="value">{account_name}</div>
-                
-                <div class="label">Password:</div>
-                <div class="value password">{password}</div>
-                
-                <div class="label">Email:</div>
-                <div class="value">{email or "Not provided"}</div>
-                
-                <div class="label">Website:</div>
-                <div class="value">{website or "Not provided"}</div>
-                
-                <div class="label">Creation Time:</div>
-                <div class="value">{created_time}</div>
-            """)
+            # Only the text of the detail labels changes
+            self.details_view.show_account(account_name, account_data, created_time)
 
             # Update header
             self.details_panel.title_label.setText(
                 f"Account Details: {account_name}")
 
+            # Arrow keys usually select a neighbour next
+            self.prefetch_timer.start(0)
+
     def open_website(self):
         """Open the website URL in the default browser"""
         if self.current_website_url:
@@ -1211,25 +1537,17 @@ class AccountManager(QWidget):
 
     def copy_details(self):
         """Copies the selected account details to clipboard"""
-        selected_items = self.account_list.selectedItems()
-        if not selected_items:
+        account_name = self.selected_account_name()
+        if account_name is None:
             return
 
-        account_name = selected_items[0].text()
-        if self.current_db_file and account_name in self.all_db_accounts[self.current_db_file]:
-            account_data = self.all_db_accounts[self.current_db_file][account_name]
-
-            # Handle both old and new data format
-            if isinstance(account_data, str):
-                # Old format: password only
-                password = account_data
-                email = ""
-                website = ""
-            else:
-                # New format: dictionary with all fields
-                password = account_data.get("password", "")
-                email = account_data.get("email", "")
-                website = account_data.get("website", "")
+        if self.current_accounts is not None and account_name in self.current_accounts:
+            account_data = self.open_account(account_name)
+            if account_data is None:
+                return
+            password = account_data.password
+            email = account_data.email
+            website = account_data.website
 
             # Copy account and password to clipboard
             clipboard_text = f"Account: {account_name}\nPassword: {password}"
@@ -1250,26 +1568,15 @@ class AccountManager(QWidget):
 
     def edit_password(self):
         """Edits the password of the selected account"""
-        selected_items = self.account_list.selectedItems()
-        if not selected_items:
+        account_name = self.selected_account_name()
+        if account_name is None:
             QMessageBox.warning(self, "Error", "No account selected.")
             return
 
-        account_name = selected_items[0].text()
-        if self.current_db_file and account_name in self.all_db_accounts[self.current_db_file]:
-            account_data = self.all_db_accounts[self.current_db_file][account_name]
-
-            # Handle both old and new data format
-            if isinstance(account_data, str):
-                # Old format: password only
-                current_password = account_data
-                current_email = ""
-                current_website = ""
-            else:
-                # New format: dictionary with all fields
-                current_password = account_data.get("password", "")
-                current_email = account_data.get("email", "")
-                current_website = account_data.get("website", "")
+        if self.current_accounts is not None and account_name in self.current_accounts:
+            account_data = self.open_account(account_name)
+            if account_data is None:
+                return
 
             # Ask for new password
             new_password, ok = QInputDialog.getText(
@@ -1277,26 +1584,22 @@ class AccountManager(QWidget):
                 "Edit Password",
                 f"Enter new password for '{account_name}':",
                 QLineEdit.EchoMode.Password,
-                current_password
+                account_data.password
             )
 
             if ok and new_password:
-                # Update account data
-                if isinstance(account_data, str):
-                    # Convert old format to new format
-                    self.all_db_accounts[self.current_db_file][account_name] = {
-                        "password": new_password,
-                        "email": current_email,
-                        "website": current_website,
-                        "created": time.strftime('%Y-%m-%d %H:%M:%S')
-                    }
-                else:
-                    # Update password in existing dictionary
-                    account_data["password"] = new_password
-                    self.all_db_accounts[self.current_db_file][account_name] = account_data
+                # Update account data, encrypted databases store it sealed again
+                account_data.password = new_password
+                store = self.current_store()
+                try:
+                    account_data = store.put(account_name, account_data)
+                except VaultLockedError:
+                    self.request_unlock()
+                    return
 
                 # Save and update display
-                self.save_accounts(self.current_db_file)
+                self.search_index.update(account_name, account_data)
+                self.save_store(store)
                 self.display_account_details()
 
                 # Show confirmation
@@ -1311,7 +1614,7 @@ class AccountManager(QWidget):
         highlight_style = f"""
             QLineEdit {{
                 background-color: rgba(80, 250, 123, 150);
-                color: {COLOR_TEXT};
+                color: {self.theme["TEXT"]};
                 border: 2px solid {COLOR_STATUS_SUCCESS};
                 border-radius: 8px;
                 padding: 8px;
@@ -1327,6 +1630,12 @@ class AccountManager(QWidget):
 
 
 def main():
+    # One-shot conversion of legacy headerless vaults, no GUI needed
+    if "--upgrade-vaults" in sys.argv[1:]:
+        for name in VaultFileManager.upgrade_vault_directory(DATABASE_DIR):
+            print(f"Upgraded {name}")
+        return
+
     app = QApplication(sys.argv)
     window = AccountManager()
     window.show()
@@ -0,0 +1,258 @@
+# perf_hud.py
+"""Frame-time and handler-latency statistics, with an optional overlay.
+
+Toggle the overlay with Ctrl+Shift+P, or start with it shown by setting
+VAULTIX_PERF_HUD=1. Ctrl+Shift+E exports the statistics to a JSON file;
+with VAULTIX_PERF_EXPORT=<path> they are also written when the app
+closes. Two exports are compared with:
+
+    python perf_hud.py before.json after.json
+"""
+import os
+import sys
+import json
+import time
+from array import array
+from PyQt6.QtWidgets import QLabel
+from PyQt6.QtGui import QFont
+from PyQt6.QtCore import Qt, QTimer
+
+# Show the overlay at startup; the shortcut toggles it either way
+PERF_HUD = os.environ.get("VAULTIX_PERF_HUD", "") not in ("", "0")
+# Statistics are written to this file on exit when set
+PERF_EXPORT = os.environ.get("VAULTIX_PERF_EXPORT", "")
+PERF_HUD_SHORTCUT = "Ctrl+Shift+P"
+PERF_EXPORT_SHORTCUT = "Ctrl+Shift+E"
+# Samples kept per measurement, older samples are overwritten
+SAMPLE_COUNT = 512
+# Time the FPS is averaged over, and the overlay refresh interval
+FPS_WINDOW_MS = 1000
+REFRESH_MS = 500
+PERCENTILES = (50, 95, 99)
+EXPORT_VERSION = 1
+
+# Overlay rows: measurement, label
+HUD_ROWS = (
+    ("paint", "paint"),
+    ("tick", "tick"),
+    ("scan", "scan"),
+    ("list", "list"),
+    ("load", "load"),
+    ("save", "save"),
+    ("theme", "theme"),
+)
+
+
+class LatencyRing:
+    """The last SAMPLE_COUNT samples of one measurement, in milliseconds.
+
+    Adding a sample writes one slot of a preallocated array; percentiles
+    are only computed when the statistics are read.
+    """
+
+    __slots__ = ("_samples", "_next", "count", "total")
+
+    def __init__(self, size=SAMPLE_COUNT):
+        self._samples = array("d", bytes(8 * size))
+        self._next = 0
+        self.count = 0   # samples ever added
+        self.total = 0.0
+
+    def add(self, ms):
+        self._samples[self._next] = ms
+        self._next = (self._next + 1) % len(self._samples)
+        self.count += 1
+        self.total += ms
+
+    @property
+    def last(self):
+        return self._samples[self._next - 1] if self.count else None
+
+    def values(self):
+        """Returns the kept samples, oldest first."""
+        if self.count < len(self._samples):
+            return self._samples[:self.count].tolist()
+        return (self._samples[self._next:] + self._samples[:self._next]).tolist()
+
+    def recent_rate(self, window_ms=FPS_WINDOW_MS):
+        """Returns samples per second, taking intervals from the newest back to window_ms."""
+        covered = 0.0
+        samples = 0
+        for ms in reversed(self.values()):
+            covered += ms
+            samples += 1
+            if covered >= window_ms:
+                break
+        return samples * 1000 / covered if covered else 0.0
+
+    def summary(self):
+        """Returns count, last, mean, max and the PERCENTILES of the kept samples."""
+        values = sorted(self.values())
+        if not values:
+            return {"count": 0}
+        stats = {"count": self.count, "last": self.last,
+                 "mean": sum(values) / len(values), "max": values[-1]}
+        for point in PERCENTILES:
+            # Nearest rank
+            stats[f"p{point}"] = values[max(0, -(-point * len(values) // 100) - 1)]
+        return stats
+
+
+class PerfMonitor:
+    """Latency rings by measurement name, filled only while enabled."""
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.rings = {}
+        self.counters = {}  # Format: {name: {counter: value}}, the latest values
+        self.started = time.time()
+        self._last_frame = None
+
+    def add(self, name, ms):
+        """Adds a sample in milliseconds."""
+        if self.enabled:
+            ring = self.rings.get(name)
+            if ring is None:
+                ring = self.rings[name] = LatencyRing()
+            ring.add(ms)
+
+    def set_counters(self, name, **values):
+        """Replaces the counters shown under a name, e.g. the cache hits of the last scan."""
+        if self.enabled:
+            self.counters[name] = values
+
+    def record(self, name, start):
+        """Adds the time since start, a time.perf_counter() value."""
+        if self.enabled:
+            self.add(name, (time.perf_counter() - start) * 1000)
+
+    def frame(self):
+        """Notes a painted frame; the intervals between frames give the FPS."""
+        if not self.enabled:
+            self._last_frame = None
+            return
+        now = time.perf_counter()
+        if self._last_frame is not None:
+            self.add("frame", (now - self._last_frame) * 1000)
+        self._last_frame = now
+
+    def fps(self):
+        ring = self.rings.get("frame")
+        return ring.recent_rate() if ring is not None else 0.0
+
+    def clear(self):
+        self.rings.clear()
+        self.counters.clear()
+        self._last_frame = None
+
+    def snapshot(self):
+        """Returns every statistic as a JSON-ready dict."""
+        return {
+            "version": EXPORT_VERSION,
+            "started": self.started,
+            "exported": time.time(),
+            "fps": self.fps(),
+            "measurements": {
+                name: dict(ring.summary(), samples=[round(ms, 4) for ms in ring.values()])
+                for name, ring in sorted(self.rings.items())
+            },
+            "counters": self.counters,
+        }
+
+    def export(self, file_path):
+        """Writes snapshot() to a JSON file; returns an error message or ""."""
+        try:
+            with open(file_path, "w", encoding="utf-8") as f:
+                json.dump(self.snapshot(), f, indent=2)
+        except OSError as e:
+            return str(e)
+        return ""
+
+
+class PerfOverlay(QLabel):
+    """Corner overlay showing the FPS and the latencies of a PerfMonitor."""
+
+    def __init__(self, monitor, parent=None):
+        super().__init__(parent)
+        self.monitor = monitor
+        self.setAttribute(Qt.WidgetAttribute.WA_TransparentForMouseEvents)
+        self.setFont(QFont("Consolas", 8))
+        self.setStyleSheet("""
+            QLabel {
+                background-color: rgba(0, 0, 0, 170);
+                color: #50FA7B;
+                border-radius: 4px;
+                padding: 6px;
+            }
+        """)
+        self._timer = QTimer(self)
+        self._timer.timeout.connect(self.refresh)
+        self.hide()
+
+    def toggle(self):
+        """Shows or hides the overlay, recording only while it is shown or an export is set."""
+        if self.isVisible():
+            self.hide()
+            self._timer.stop()
+            self.monitor.enabled = bool(PERF_EXPORT)
+        else:
+            self.monitor.enabled = True
+            self.refresh()
+            self.show()
+            self.raise_()
+            self._timer.start(REFRESH_MS)
+
+    def refresh(self):
+        lines = [f"{'fps':<6}{self.monitor.fps():7.1f}",
+                 f"{'ms':<6}{'last':>7}{'p50':>7}{'p95':>7}{'p99':>7}"]
+        for name, label in HUD_ROWS:
+            ring = self.monitor.rings.get(name)
+            if ring is None:
+                lines.append(f"{label:<6}{'-':>7}")
+                continue
+            stats = ring.summary()
+            lines.append(f"{label:<6}{stats['last']:7.2f}{stats['p50']:7.2f}"
+                         f"{stats['p95']:7.2f}{stats['p99']:7.2f}")
+        for name, values in sorted(self.monitor.counters.items()):
+            lines.append(f"{name:<6}" + "".join(f"{value:>7} {counter}"
+                                                for counter, value in values.items()))
+        self.setText("\n".join(lines))
+        self.adjustSize()
+
+        # Top right corner of the window
+        parent = self.parentWidget()
+        if parent is not None:
+            self.move(parent.width() - self.width() - 12, 12)
+
+
+def compare(before, after):
+    """Returns report lines comparing the measurements of two exports."""
+    lines = [f"{'measurement':<12}{'stat':>6}{'before':>10}{'after':>10}{'change':>9}"]
+    names = sorted(set(before["measurements"]) | set(after["measurements"]))
+    for name in names:
+        old = before["measurements"].get(name, {})
+        new = after["measurements"].get(name, {})
+        for stat in ("p50", "p95", "p99"):
+            if stat not in old or stat not in new:
+                continue
+            change = (new[stat] - old[stat]) / old[stat] * 100 if old[stat] else 0.0
+            lines.append(f"{name:<12}{stat:>6}{old[stat]:10.3f}{new[stat]:10.3f}{change:+8.1f}%")
+    lines.append(f"{'fps':<12}{'':>6}{before['fps']:10.1f}{after['fps']:10.1f}")
+    return lines
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) != 2:
+        print("Usage: python perf_hud.py before.json after.json", file=sys.stderr)
+        return 2
+    exports = []
+    for file_path in argv:
+        with open(file_path, encoding="utf-8") as f:
+            exports.append(json.load(f))
+    print("\n".join(compare(*exports)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,310 @@
+# search_index.py
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from heapq import merge
+
+# Queries shorter than this match prefixes instead of substrings
+TRIGRAM_SIZE = 3
+# Records examined per step, keeps each step of a search at a millisecond or two
+SEARCH_CHUNK = 8192
+# Share of query trigrams a record needs to count as a fuzzy match
+FUZZY_MIN_OVERLAP = 0.6
+# Fuzzy matching is only tried when fewer exact matches were found
+FUZZY_RESULT_THRESHOLD = 20
+# The index is rebuilt once this many records were removed or added since the build
+REBUILD_MIN_CHANGES = 1000
+
+# Sorts after every character a name can continue with
+_PREFIX_END = "\U0010ffff"
+
+
+def _trigrams(text):
+    """Returns the distinct trigrams of a string."""
+    return {text[i:i + TRIGRAM_SIZE] for i in range(len(text) - TRIGRAM_SIZE + 1)}
+
+
+def _haystack(account_name, account_data):
+    """Returns the lower-cased searchable text of an account.
+
+    The name comes first, email and website follow on their own lines so
+    a field prefix can be matched as "\\n" + query. Records of a locked
+    vault are searched by name only.
+    """
+    account_data = account_data.unsealed(account_name)
+    if account_data is None:
+        return f"{account_name.lower()}\n\n"
+
+    # Match hosts, not the scheme every website shares
+    email = account_data.email
+    website = account_data.website.lower()
+    if website.startswith(("https://", "http://")):
+        website = website.split("//", 1)[1]
+    if website.startswith("www."):
+        website = website[4:]
+    return f"{account_name.lower()}\n{email.lower()}\n{website}"
+
+
+class AccountSearchIndex:
+    """Incremental search over the account names, emails and websites of one vault.
+
+    Every account gets a record number, assigned in lower-cased name order
+    when the index is built, so name prefixes are a bisected range and a
+    pass over records in number order yields names already sorted. A
+    trigram's posting list holds the records whose text contains it and is
+    computed the first time a query needs it. A query's candidates are the
+    shortest known posting list of its trigrams or, while the user keeps
+    typing, the matches of the previous query. Edits append a new record
+    and tombstone the old one; records added since the build are merged
+    into each rank by name.
+
+    search() is a generator: it yields lists of names one rank at a time,
+    best first, and examines at most SEARCH_CHUNK records per step, so a
+    caller can show the first rows at once and stream the rest.
+    """
+
+    def __init__(self):
+        self._accounts = None
+        self._clear()
+
+    def _clear(self):
+        self._built = False
+        self._builder = None
+        self._pending = {}      # edits made while a build is in progress
+        self._ids = {}          # account name -> record number
+        self._names = []        # record number -> account name, None once removed
+        self._lower_names = []  # record number -> lower-cased account name
+        self._haystacks = []    # record number -> lower-cased searchable text
+        self._postings = {}     # trigram -> array of record numbers
+        self._ordered = 0       # records below this are numbered in name order
+        self._dead = 0
+        self._last_query = None
+        self._last_matches = None
+
+    def reset(self, accounts):
+        """Points the index at a vault's accounts; it is rebuilt on the next search."""
+        self._accounts = accounts
+        self._clear()
+
+    def __len__(self):
+        return len(self._ids)
+
+    def _build(self):
+        """Builds the index in steps, yielding between them."""
+        items = list((self._accounts or {}).items())
+        yield
+
+        haystacks = []
+        for start in range(0, len(items), SEARCH_CHUNK):
+            haystacks.extend(_haystack(account_name, account_data)
+                             for account_name, account_data in items[start:start + SEARCH_CHUNK])
+            yield
+        lower_names = [haystack[:haystack.index("\n")] for haystack in haystacks]
+        yield
+
+        order = sorted(range(len(items)), key=lower_names.__getitem__)
+        yield
+
+        names = [items[i][0] for i in order]
+        self._names = names
+        self._haystacks = [haystacks[i] for i in order]
+        self._lower_names = [lower_names[i] for i in order]
+        self._ids = {account_name: record for record, account_name in enumerate(names)}
+        self._ordered = len(names)
+        self._built = True
+        self._builder = None
+
+        # Edits made while building were not in the snapshot
+        pending, self._pending = self._pending, {}
+        for account_name, account_data in pending.items():
+            if account_data is None:
+                self.remove(account_name)
+            else:
+                self.update(account_name, account_data)
+
+    def _ensure_built(self):
+        """Runs the build one step at a time, yielding between steps."""
+        while not self._built:
+            if self._builder is None:
+                self._builder = self._build()
+            next(self._builder, None)
+            yield []
+
+    def update(self, account_name, account_data):
+        """Adds or replaces an account after it was added or edited."""
+        if not self._built:
+            if self._builder is not None:
+                self._pending[account_name] = account_data
+            return  # Otherwise picked up from the accounts when the index is built
+
+        self._remove(account_name)
+        record = len(self._names)
+        haystack = _haystack(account_name, account_data)
+        self._ids[account_name] = record
+        self._names.append(account_name)
+        self._haystacks.append(haystack)
+        self._lower_names.append(haystack[:haystack.index("\n")])
+
+        postings = self._postings
+        for trigram in _trigrams(haystack):
+            posting = postings.get(trigram)
+            if posting is not None:
+                posting.append(record)
+        self._changed()
+
+    def remove(self, account_name):
+        """Removes a deleted account."""
+        if not self._built:
+            if self._builder is not None:
+                self._pending[account_name] = None
+            return
+
+        self._remove(account_name)
+        self._changed()
+
+    def _remove(self, account_name):
+        record = self._ids.pop(account_name, None)
+        if record is not None:
+            self._names[record] = None
+            self._dead += 1
+
+    def _changed(self):
+        self._last_query = self._last_matches = None
+
+        # Renumber once tombstones or unsorted records start to cost
+        limit = max(REBUILD_MIN_CHANGES, len(self._ids) // 2)
+        if self._dead > limit or len(self._names) - self._ordered > limit:
+            self._clear()
+
+    def _posting(self, trigram):
+        """Computes the posting list of a trigram in steps, yielding between them."""
+        posting = self._postings.get(trigram)
+        if posting is not None:
+            return posting
+
+        haystacks = self._haystacks
+        posting = array("I")
+        for start in range(0, len(haystacks), SEARCH_CHUNK):
+            posting.extend(record for record in range(start, min(start + SEARCH_CHUNK, len(haystacks)))
+                           if trigram in haystacks[record])
+            yield []
+        self._postings[trigram] = posting
+        return posting
+
+    def _stream(self, records, matches):
+        """Yields the names of the records passing the matches test, in name order.
+
+        Records must be in ascending order. Those numbered after the build
+        are not in name order and are merged in by name.
+        """
+        names = self._names
+        lower_names = self._lower_names
+        split = bisect_left(records, self._ordered)
+        tail = sorted(filter(matches, records[split:]), key=lower_names.__getitem__)
+
+        for start in range(0, split, SEARCH_CHUNK):
+            chunk = list(filter(matches, records[start:min(start + SEARCH_CHUNK, split)]))
+            if tail and chunk:
+                last_name = lower_names[chunk[-1]]
+                taken = 0
+                while taken < len(tail) and lower_names[tail[taken]] <= last_name:
+                    taken += 1
+                if taken:
+                    chunk = list(merge(chunk, tail[:taken], key=lower_names.__getitem__))
+                    del tail[:taken]
+            yield [names[record] for record in chunk]
+        yield [names[record] for record in tail]
+
+    def search(self, query):
+        """Yields lists of matching account names, best rank first.
+
+        Lists may be empty while the index is being built or a large
+        vault is scanned.
+        """
+        query = query.strip().lower()
+        if not query:
+            return
+        yield from self._ensure_built()
+
+        names = self._names
+        lower_names = self._lower_names
+        haystacks = self._haystacks
+        field_query = "\n" + query
+
+        # Names starting with the query, an exact match sorts first
+        start = bisect_left(lower_names, query, 0, self._ordered)
+        end = bisect_left(lower_names, query + _PREFIX_END, start, self._ordered)
+        yield from self._stream(
+            list(range(start, end)) + list(range(self._ordered, len(names))),
+            lambda record: names[record] is not None and lower_names[record].startswith(query))
+
+        if len(query) < TRIGRAM_SIZE:
+            # Short queries only match the start of an email or website
+            yield from self._stream(
+                range(len(names)),
+                lambda record: field_query in haystacks[record] and names[record] is not None
+                and not lower_names[record].startswith(query))
+            return
+
+        # Records containing the query anywhere
+        last_query = self._last_query
+        if last_query is not None and len(last_query) >= TRIGRAM_SIZE and last_query in query:
+            candidates = self._last_matches  # The user typed on, only narrowing is needed
+        else:
+            known = [self._postings[trigram] for trigram in _trigrams(query)
+                     if trigram in self._postings]
+            if known:
+                candidates = min(known, key=len)
+            else:
+                candidates = yield from self._posting(query[:TRIGRAM_SIZE])
+
+        matches = []
+        for start in range(0, len(candidates), SEARCH_CHUNK):
+            matches.extend(record for record in candidates[start:start + SEARCH_CHUNK]
+                           if query in haystacks[record] and names[record] is not None)
+            yield []
+        self._last_query = query
+        self._last_matches = matches
+
+        # Names containing the query, at the start of a word first
+        def word_start(record):
+            position = lower_names[record].find(query)
+            return position > 0 and not lower_names[record][position - 1].isalnum()
+
+        def word_middle(record):
+            position = lower_names[record].find(query)
+            return position > 0 and lower_names[record][position - 1].isalnum()
+
+        yield from self._stream(matches, word_start)
+        yield from self._stream(matches, word_middle)
+
+        # Emails and websites starting with, then containing the query
+        yield from self._stream(
+            matches,
+            lambda record: query not in lower_names[record] and field_query in haystacks[record])
+        yield from self._stream(
+            matches,
+            lambda record: query not in lower_names[record] and field_query not in haystacks[record])
+
+        if len(matches) < FUZZY_RESULT_THRESHOLD:
+            yield from self._fuzzy(query, set(matches))
+
+    def _fuzzy(self, query, found):
+        """Yields records sharing most of the query's trigrams, e.g. with a typo."""
+        trigrams = _trigrams(query)
+        needed = max(1, round(len(trigrams) * FUZZY_MIN_OVERLAP))
+
+        overlap = Counter()
+        for trigram in trigrams:
+            overlap.update((yield from self._posting(trigram)))
+
+        names = self._names
+        lower_names = self._lower_names
+        scored = sorted((len(trigrams) - shared, lower_names[record], names[record])
+                        for record, shared in overlap.items()
+                        if shared >= needed and record not in found and names[record] is not None)
+        yield [account_name for _, _, account_name in scored]
+
+    def search_all(self, query):
+        """Returns all matching account names, best match first."""
+        return [account_name for batch in self.search(query) for account_name in batch]
@@ -0,0 +1,193 @@
+# snowfall.py
+import os
+import random
+from array import array
+from itertools import compress, repeat
+from operator import add, mul
+from PyQt6.QtCore import Qt, QPointF, QRect, QRectF
+from PyQt6.QtGui import QColor, QPainter, QPixmap, QRegion
+
+try:
+    import numpy
+except ImportError:  # The stdlib arrays below are used instead
+    numpy = None
+
+# Flakes in the background animation, override with VAULTIX_SNOWFLAKES
+SNOWFLAKE_COUNT = int(os.environ.get("VAULTIX_SNOWFLAKES", 150))
+# Flake radii in pixels and the opacities flakes are drawn with
+SNOWFLAKE_RADII = (1, 2, 3, 4)
+SNOWFLAKE_OPACITIES = (30, 60, 90, 120, 150, 180)
+# Fall speed range in pixels per tick, and the largest horizontal drift per tick
+FALL_SPEED = (0.5, 2.5)
+DRIFT = 0.5
+# Random drifts computed once; every tick reads the table from a random offset
+DRIFT_TABLE_SIZE = 4096
+# Dirty rectangles are aligned to this many pixels, a power of two
+DIRTY_GRID = 8
+
+
+class SnowField:
+    """Falling snowflakes, stored as arrays and drawn from cached sprites.
+
+    Positions and speeds live in contiguous arrays (NumPy when available,
+    the stdlib array module otherwise) and step() moves every flake at
+    once: speeds are added to the y array, and a slice of a precomputed
+    drift table to the x array, so a tick makes no per-flake random calls.
+
+    Radius and opacity never change for a flake. Every combination in use
+    is pre-rendered once into a sprite atlas, and each flake keeps a
+    QPainter.PixmapFragment pointing at its sprite; paint() only moves the
+    fragments and draws all flakes with one drawPixmapFragments() call,
+    instead of setting a brush and drawing an ellipse per flake.
+
+    dirty_region() covers where the flakes were before the last step and
+    where they are now, so a window only repaints those pixels per tick.
+    """
+
+    def __init__(self, count=SNOWFLAKE_COUNT):
+        self.count = count
+        self.width = 0
+        self.height = 0
+        self.xs = self.ys = self.speeds = None
+        self._drift = None
+        self._limit = 0.0
+        self._sprites = []     # (radius, opacity) of every atlas cell
+        self._sprite_of = []   # atlas cell of every flake
+        self._extents = []     # pixels a flake may cover around its position
+        self._previous = (self.xs, self.ys)
+        self._atlas = None
+        self._fragments = []
+        self._ratio = None     # device pixel ratio the atlas was rendered for
+
+    def reset(self, width, height):
+        """Scatters every flake over a width x height area."""
+        count = self.count
+        self.width = width
+        self.height = height
+        self._limit = float(height)
+
+        kinds = [(random.choice(SNOWFLAKE_RADII), random.choice(SNOWFLAKE_OPACITIES))
+                 for _ in range(count)]
+        self._sprites = sorted(set(kinds))
+        cells = {kind: cell for cell, kind in enumerate(self._sprites)}
+        self._sprite_of = [cells[kind] for kind in kinds]
+        # Sprites reach radius + 1 from the center
+        self._extents = [radius + 1 for radius, _ in kinds]
+        self._ratio = None
+
+        xs = [random.uniform(0, width) for _ in range(count)]
+        ys = [random.uniform(0, height) for _ in range(count)]
+        speeds = [random.uniform(*FALL_SPEED) for _ in range(count)]
+        drift = [random.uniform(-DRIFT, DRIFT) for _ in range(DRIFT_TABLE_SIZE + count)]
+        if numpy is not None:
+            self.xs, self.ys, self.speeds, self._drift = (
+                numpy.array(values, dtype=numpy.float64) for values in (xs, ys, speeds, drift))
+        else:
+            self.xs, self.ys, self.speeds, self._drift = (
+                array("d", values) for values in (xs, ys, speeds, drift))
+        self._previous = (self.xs, self.ys)
+
+    def resize(self, width, height):
+        """Moves every flake to the same relative spot of a width x height area.
+
+        Positions are scaled in place, flakes keep their sprites and speeds.
+        """
+        if not self.width or not self.height or self.xs is None:
+            self.reset(width, height)
+            return
+        scale_x = width / self.width
+        scale_y = height / self.height
+        self.width = width
+        self.height = height
+        self._limit = float(height)
+        if numpy is not None:
+            self.xs *= scale_x
+            self.ys *= scale_y
+        else:
+            self.xs[:] = array("d", map(mul, self.xs, repeat(scale_x)))
+            self.ys[:] = array("d", map(mul, self.ys, repeat(scale_y)))
+        # The window repaints whole after a resize
+        self._previous = (self.xs, self.ys)
+
+    def step(self):
+        """Moves every flake by one tick; flakes leaving the bottom restart at the top."""
+        offset = random.randrange(DRIFT_TABLE_SIZE)
+        drift = self._drift[offset:offset + self.count]
+        if numpy is not None:
+            self._previous = (self.xs.copy(), self.ys.copy())
+            self.ys += self.speeds
+            self.xs += drift
+            fallen = numpy.flatnonzero(self.ys > self._limit)
+            if fallen.size:
+                self.ys[fallen] = 0.0
+                self.xs[fallen] = numpy.random.uniform(0, self.width, fallen.size)
+            return
+
+        self._previous = (self.xs, self.ys)
+        self.ys = ys = array("d", map(add, self.ys, self.speeds))
+        self.xs = xs = array("d", map(add, self.xs, drift))
+        for i in compress(range(self.count), map(self._limit.__lt__, ys)):
+            ys[i] = 0.0
+            xs[i] = random.uniform(0, self.width)
+
+    def dirty_region(self):
+        """Returns the area covering every flake before and after the last step().
+
+        Rectangles are aligned to DIRTY_GRID pixels, so they stay whole
+        device pixels under fractional scale factors and merge into fewer
+        rectangles.
+        """
+        region = QRegion()
+        old_xs, old_ys = self._previous
+        for x0, y0, x1, y1, extent in zip(old_xs.tolist(), old_ys.tolist(),
+                                          self.xs.tolist(), self.ys.tolist(), self._extents):
+            if y1 < y0:
+                # Restarted at the top, the two positions are far apart
+                region += _grid_rect(x0 - extent, y0 - extent, x0 + extent, y0 + extent)
+                region += _grid_rect(x1 - extent, y1 - extent, x1 + extent, y1 + extent)
+            else:
+                region += _grid_rect(min(x0, x1) - extent, y0 - extent,
+                                     max(x0, x1) + extent, y1 + extent)
+        return region
+
+    def _prepare(self, ratio):
+        """Renders the sprite atlas for a device pixel ratio and points a fragment at it per flake."""
+        cell = (2 * max(SNOWFLAKE_RADII) + 2) * ratio
+        self._atlas = QPixmap(round(cell * max(1, len(self._sprites))), round(cell))
+        self._atlas.fill(Qt.GlobalColor.transparent)
+        painter = QPainter(self._atlas)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.setPen(Qt.PenStyle.NoPen)
+        painter.scale(ratio, ratio)
+        sources = []
+        for index, (radius, opacity) in enumerate(self._sprites):
+            center = QPointF((index + 0.5) * cell / ratio, 0.5 * cell / ratio)
+            painter.setBrush(QColor(255, 255, 255, opacity))
+            painter.drawEllipse(center, radius, radius)
+            side = 2 * radius + 2
+            sources.append(QRectF((center.x() - side / 2) * ratio, (center.y() - side / 2) * ratio,
+                                  side * ratio, side * ratio))
+        painter.end()
+
+        # Fragment positions are centers, sources are in atlas pixels
+        self._fragments = [QPainter.PixmapFragment.create(QPointF(), sources[sprite], 1 / ratio, 1 / ratio)
+                           for sprite in self._sprite_of]
+        self._ratio = ratio
+
+    def paint(self, painter):
+        """Draws every flake."""
+        ratio = painter.device().devicePixelRatioF()
+        if ratio != self._ratio:
+            self._prepare(ratio)
+        for fragment, x, y in zip(self._fragments, self.xs.tolist(), self.ys.tolist()):
+            fragment.x = x
+            fragment.y = y
+        painter.drawPixmapFragments(self._fragments, self._atlas)
+
+
+def _grid_rect(left, top, right, bottom):
+    """Returns the smallest DIRTY_GRID aligned QRect around the given edges."""
+    left = int(left) - 1 & -DIRTY_GRID
+    top = int(top) - 1 & -DIRTY_GRID
+    return QRect(left, top, (int(right) + DIRTY_GRID & -DIRTY_GRID) - left,
+                 (int(bottom) + DIRTY_GRID & -DIRTY_GRID) - top)
@@ -0,0 +1,334 @@
+# themes.py
+"""Window themes, compiled once into a single stylesheet.
+
+Every theme's rules are scoped to widgets below a `theme` dynamic
+property, so switching themes sets that property and a QPalette and
+re-polishes the widgets; the stylesheet itself is parsed only once.
+
+User themes are JSON files in THEME_DIR named after the theme, holding
+colors by key and optionally the theme they start from:
+
+    {"base": "dark", "BG": "#101820", "PANEL": "rgba(20, 30, 40, 200)"}
+"""
+import os
+import re
+import json
+from PyQt6.QtWidgets import QWidget
+from PyQt6.QtGui import QColor, QPalette
+
+# Theme shown at startup, override with VAULTIX_THEME
+DEFAULT_THEME = os.environ.get("VAULTIX_THEME", "dark")
+# Directory of user theme files, override with VAULTIX_THEME_DIR
+THEME_DIR = os.environ.get(
+    "VAULTIX_THEME_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "themes"))
+
+THEMES = {
+    "dark": {
+        "BG": "#121218",
+        "BG_GRADIENT_TOP": "#1A1A24",
+        "BG_GRADIENT_BOTTOM": "#0D0D12",
+        "TEXT": "#F8F8F2",
+        "TEXT_SECONDARY": "#BFBFBF",
+        "PANEL": "rgba(30, 30, 40, 180)",
+        "PANEL_LIGHTER": "rgba(40, 40, 50, 200)",
+        "PANEL_SELECTED": "rgba(60, 50, 90, 200)",
+        "PRIMARY": "#8A2BE2",
+        "ACCENT": "#FF79C6"
+    },
+    "light": {
+        "BG": "#f0f0f0",
+        "BG_GRADIENT_TOP": "#ffffff",
+        "BG_GRADIENT_BOTTOM": "#e0e0e0",
+        "TEXT": "#2a2a2a",
+        "TEXT_SECONDARY": "#555555",
+        "PANEL": "rgba(255, 255, 255, 220)",
+        "PANEL_LIGHTER": "rgba(250, 250, 250, 240)",
+        "PANEL_SELECTED": "rgba(230, 230, 255, 220)",
+        "PRIMARY": "#8A2BE2",
+        "ACCENT": "#FF79C6"
+    }
+}
+
+# Filled with the colors of each theme, then scoped to it
+STYLESHEET = """
+    QWidget {{
+        background-color: {BG};
+        color: {TEXT};
+        font-family: 'Segoe UI', Arial, sans-serif;
+    }}
+    QLabel {{
+        color: {TEXT};
+    }}
+    QLabel#detailsCaption {{
+        color: {TEXT_SECONDARY};
+        background: transparent;
+        font-size: 14px;
+    }}
+    QLabel#detailsValue, QLabel#detailsPassword {{
+        color: {TEXT};
+        background-color: rgba(60, 50, 90, 100);
+        font-size: 16px;
+        padding: 8px;
+        border-radius: 5px;
+    }}
+    QLabel#detailsPassword {{
+        font-family: monospace;
+    }}
+    QLabel#detailsMessage {{
+        color: {TEXT_SECONDARY};
+        background: transparent;
+        font-size: 16px;
+    }}
+    ModernPanel {{
+        background-color: {PANEL};
+        border-radius: 12px;
+        border: 1px solid rgba(80, 80, 100, 100);
+    }}
+    QLineEdit {{
+        background-color: {PANEL_LIGHTER};
+        color: {TEXT};
+        border: 1px solid rgba(138, 43, 226, 150);
+        border-radius: 8px;
+        padding: 8px;
+        font-size: 14px;
+    }}
+    QLineEdit:focus {{
+        border: 2px solid {PRIMARY};
+    }}
+    QTextEdit {{
+        background-color: {PANEL_LIGHTER};
+        color: {TEXT};
+        border: 1px solid rgba(138, 43, 226, 150);
+        border-radius: 8px;
+        font-size: 14px;
+        padding: 8px;
+    }}
+    QListView {{
+        background-color: {PANEL_LIGHTER};
+        color: {TEXT};
+        border: 1px solid rgba(138, 43, 226, 150);
+        border-radius: 8px;
+        font-size: 14px;
+        padding: 5px;
+    }}
+    QListView::item {{
+        border-radius: 5px;
+        padding: 8px;
+        margin: 2px;
+    }}
+    QListView::item:hover {{
+        background-color: rgba(138, 43, 226, 30);
+    }}
+    QListView::item:selected {{
+        background-color: {PANEL_SELECTED};
+        color: {TEXT};
+        border-left: 3px solid {ACCENT};
+    }}
+    QComboBox {{
+        background-color: {PANEL_LIGHTER};
+        color: {TEXT};
+        border: 1px solid rgba(138, 43, 226, 150);
+        border-radius: 8px;
+        padding: 8px;
+        padding-right: 20px;
+        font-size: 14px;
+        min-height: 25px;
+    }}
+    QComboBox:hover {{
+        border: 1px solid {PRIMARY};
+    }}
+    QComboBox::drop-down {{
+        border: 0px;
+        width: 20px;
+    }}
+    QComboBox::down-arrow {{
+        image: url(down_arrow.png);
+        width: 12px;
+        height: 12px;
+    }}
+    QComboBox QAbstractItemView {{
+        background-color: {PANEL};
+        color: {TEXT};
+        selection-background-color: {PANEL_SELECTED};
+        selection-color: {TEXT};
+        border: 1px solid {PRIMARY};
+        border-radius: 8px;
+        padding: 5px;
+    }}
+    QScrollBar:vertical {{
+        border: none;
+        background-color: rgba(40, 40, 50, 100);
+        width: 10px;
+        margin: 0px;
+        border-radius: 5px;
+    }}
+    QScrollBar::handle:vertical {{
+        background-color: rgba(138, 43, 226, 150);
+        min-height: 20px;
+        border-radius: 5px;
+    }}
+    QScrollBar::handle:vertical:hover {{
+        background-color: rgba(154, 59, 242, 180);
+    }}
+    QScrollBar::add-line:vertical, QScrollBar::sub-line:vertical {{
+        height: 0px;
+    }}
+    QScrollBar:horizontal {{
+        border: none;
+        background-color: rgba(40, 40, 50, 100);
+        height: 10px;
+        margin: 0px;
+        border-radius: 5px;
+    }}
+    QScrollBar::handle:horizontal {{
+        background-color: rgba(138, 43, 226, 150);
+        min-width: 20px;
+        border-radius: 5px;
+    }}
+    QScrollBar::handle:horizontal:hover {{
+        background-color: rgba(154, 59, 242, 180);
+    }}
+    QScrollBar::add-line:horizontal, QScrollBar::sub-line:horizontal {{
+        width: 0px;
+    }}
+    QSplitter::handle {{
+        background-color: rgba(138, 43, 226, 50);
+        width: 2px;
+    }}
+    QSplitter::handle:hover {{
+        background-color: {PRIMARY};
+    }}
+"""
+
+# Palette roles and the colors they take, for everything the stylesheet leaves to the palette
+PALETTE_ROLES = (
+    (QPalette.ColorRole.Window, "BG"),
+    (QPalette.ColorRole.WindowText, "TEXT"),
+    (QPalette.ColorRole.Base, "PANEL_LIGHTER"),
+    (QPalette.ColorRole.AlternateBase, "PANEL"),
+    (QPalette.ColorRole.Text, "TEXT"),
+    (QPalette.ColorRole.PlaceholderText, "TEXT_SECONDARY"),
+    (QPalette.ColorRole.Button, "PANEL_LIGHTER"),
+    (QPalette.ColorRole.ButtonText, "TEXT"),
+    (QPalette.ColorRole.Highlight, "PANEL_SELECTED"),
+    (QPalette.ColorRole.HighlightedText, "TEXT"),
+    (QPalette.ColorRole.ToolTipBase, "BG"),
+    (QPalette.ColorRole.ToolTipText, "TEXT"),
+)
+
+_RULE = re.compile(r"([^{}]+)\{([^{}]*)\}")
+_RGBA = re.compile(r"rgba?\(\s*(\d+)\s*,\s*(\d+)\s*,\s*(\d+)\s*(?:,\s*(\d+)\s*)?\)$")
+_THEME_NAME = re.compile(r"[A-Za-z0-9_-]+$")
+
+
+def parse_color(value):
+    """Returns a QColor for "#rrggbb", a color name or "rgba(r, g, b, a)"; invalid if none."""
+    match = _RGBA.match(value.strip())
+    if match:
+        red, green, blue, alpha = match.groups()
+        return QColor(int(red), int(green), int(blue), 255 if alpha is None else int(alpha))
+    return QColor(value)
+
+
+def _scoped(stylesheet, scope):
+    """Returns the rules of a flat stylesheet with every selector prefixed by scope."""
+    rules = []
+    for selectors, body in _RULE.findall(stylesheet):
+        scoped = ", ".join(f"{scope} {selector.strip()}" for selector in selectors.split(","))
+        rules.append(f"{scoped} {{{body}}}")
+    return "\n".join(rules)
+
+
+class Theme:
+    """Colors of a theme by key, and the palette built from them."""
+
+    __slots__ = ("name", "colors", "palette")
+
+    def __init__(self, name, colors):
+        self.name = name
+        self.colors = dict(colors)
+        self.palette = QPalette()
+        for role, key in PALETTE_ROLES:
+            self.palette.setColor(role, parse_color(self.colors[key]))
+
+    def __getitem__(self, key):
+        return self.colors[key]
+
+
+class ThemeEngine:
+    """Built-in and user themes, with one stylesheet covering all of them."""
+
+    def __init__(self, theme_dir=THEME_DIR):
+        self.themes = {name: Theme(name, colors) for name, colors in THEMES.items()}
+        self.errors = []  # Format: [(file_path, message)] of user themes that were skipped
+        if theme_dir and os.path.isdir(theme_dir):
+            self._load_user_themes(theme_dir)
+
+        self.stylesheet = "\n".join(
+            _scoped(STYLESHEET.format(**theme.colors), f'[theme="{name}"]')
+            for name, theme in self.themes.items())
+
+    def _load_user_themes(self, theme_dir):
+        for file in sorted(os.listdir(theme_dir)):
+            name, extension = os.path.splitext(file)
+            if extension.lower() != ".json":
+                continue
+            file_path = os.path.join(theme_dir, file)
+            theme, error = self._read_theme(name, file_path)
+            if error:
+                self.errors.append((file_path, error))
+            else:
+                self.themes[name] = theme
+
+    def _read_theme(self, name, file_path):
+        """Returns (Theme, "") for a user theme file, or (None, error)."""
+        if not _THEME_NAME.match(name):
+            return None, "Theme names may only use letters, digits, '-' and '_'"
+        try:
+            with open(file_path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            return None, str(e)
+        if not isinstance(data, dict):
+            return None, "A theme file holds one JSON object"
+
+        base = data.pop("base", "dark")
+        if base not in self.themes:
+            return None, f"Unknown base theme '{base}'"
+        colors = dict(self.themes[base].colors)
+        for key, value in data.items():
+            if key not in colors:
+                return None, f"Unknown color '{key}'"
+            if not isinstance(value, str) or not parse_color(value).isValid():
+                return None, f"Invalid color for '{key}': {value!r}"
+            colors[key] = value
+        return Theme(name, colors), ""
+
+    def names(self):
+        return list(self.themes)
+
+    def get(self, name):
+        return self.themes.get(name)
+
+    def next_name(self, name):
+        """Returns the theme after name, in the order they were loaded."""
+        names = self.names()
+        return names[(names.index(name) + 1) % len(names)] if name in names else names[0]
+
+    def apply(self, widget, name):
+        """Switches a widget whose stylesheet is self.stylesheet to a theme; returns the Theme.
+
+        Only widgets below it take the theme rules; the widget itself
+        gets the palette.
+        """
+        theme = self.themes[name]
+        widget.setProperty("theme", name)
+        widget.setPalette(theme.palette)
+
+        # Property selectors are matched when a widget is polished
+        for child in widget.findChildren(QWidget):
+            style = child.style()
+            style.unpolish(child)
+            style.polish(child)
+        widget.update()
+        return theme
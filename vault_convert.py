@@ -0,0 +1,97 @@
+# vault_convert.py
+"""Converts vault files between formats and payload codecs.
+
+Format 1 is one JSON document stored with a payload codec (base64-json,
+json, zlib, lzma, bz2 or binary), format 2 holds indexed records. Either
+can have its records encrypted under a master password.
+
+Usage:
+    python vault_convert.py --format 2 vaults/work.vault [more.vault ...]
+    python vault_convert.py --format 1 --codec zlib vaults/work.vault
+    python vault_convert.py --encrypt vaults/work.vault
+    python vault_convert.py --decrypt vaults/work.vault
+
+Legacy headerless vaults are accepted as input too. Close the app before
+converting its vaults.
+"""
+import argparse
+import getpass
+import sys
+from file_utils import VAULT_CODECS, VAULT_FORMATS, VaultFileManager, vault_codec
+from vault_crypto import VaultKey
+
+
+def _unlock(file_path):
+    """Asks for the master password of an encrypted vault; returns an error or ""."""
+    header, error = VaultFileManager.read_vault_header(file_path)
+    if error or header is None or header.vault_key is None or header.vault_key.unlocked:
+        return error
+    _, error = VaultFileManager.unlock_vault(
+        file_path, getpass.getpass(f"Master password of {file_path}: "))
+    return error
+
+
+def _new_key():
+    """Asks for a new master password twice; returns the key, or None if they differ."""
+    password = getpass.getpass("New master password: ")
+    if not password or password != getpass.getpass("Repeat the master password: "):
+        return None
+    return VaultKey.create(password)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert vault files to another format.")
+    parser.add_argument("--format", type=int, choices=VAULT_FORMATS,
+                        help="target format: 1 = one JSON document, 2 = indexed records")
+    parser.add_argument("--codec", choices=[codec.name for codec in VAULT_CODECS.values()],
+                        help="payload codec of format 1 vaults")
+    encryption = parser.add_mutually_exclusive_group()
+    encryption.add_argument("--encrypt", action="store_true",
+                            help="encrypt the records under a new master password, "
+                                 "also to change the password of encrypted vaults")
+    encryption.add_argument("--decrypt", action="store_true",
+                            help="store the records unencrypted")
+    parser.add_argument("files", nargs="+", help="vault files to convert in place")
+    args = parser.parse_args(argv)
+    if args.format is None and args.codec is None and not args.encrypt and not args.decrypt:
+        parser.error("give --format, --codec, --encrypt or --decrypt")
+
+    codec = None if args.codec is None else vault_codec(args.codec).codec_id
+    target = ", ".join(part for part in (
+        args.format and f"format {args.format}", args.codec and f"codec {args.codec}",
+        args.encrypt and "encrypted", args.decrypt and "unencrypted") if part)
+
+    # One key derivation covers every file
+    key = None
+    if args.encrypt:
+        key = _new_key()
+        if key is None:
+            print("Master passwords are empty or differ", file=sys.stderr)
+            return 1
+
+    failed = False
+    for file_path in args.files:
+        converted = False
+        error = ""
+        if args.format is not None or codec is not None:
+            converted, error = VaultFileManager.convert_vault_file(file_path, args.format, codec)
+        if not error and (args.encrypt or args.decrypt):
+            error = _unlock(file_path)
+            if not error:
+                if args.encrypt:
+                    encrypted, error = VaultFileManager.encrypt_vault_file(file_path, key)
+                else:
+                    encrypted, error = VaultFileManager.decrypt_vault_file(file_path)
+                converted = converted or encrypted
+        if error:
+            failed = True
+            print(f"{file_path}: {error}", file=sys.stderr)
+        elif converted:
+            print(f"{file_path}: converted to {target}")
+        else:
+            print(f"{file_path}: already stored as {target}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
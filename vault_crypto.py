@@ -0,0 +1,166 @@
+# vault_crypto.py
+import os
+import json
+import base64
+import struct
+import hashlib
+import threading
+
+try:
+    from cryptography.exceptions import InvalidTag
+    from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+except ImportError:  # Encrypted vaults still list, but cannot be unlocked
+    AESGCM = None
+    InvalidTag = None
+
+from account_record import AccountRecord, SealedRecord
+
+# Follows the header of an encrypted vault: KDF id, scrypt log2(n), r, p, salt,
+# then the nonce and tag that check a derived key
+KDF_BLOCK = struct.Struct("<BBBB16s12s16s")
+KDF_SCRYPT = 1
+# scrypt cost of newly encrypted vaults, override with VAULTIX_SCRYPT_LOG_N; files keep theirs
+SCRYPT_LOG_N = int(os.environ.get("VAULTIX_SCRYPT_LOG_N", 17))
+SCRYPT_R = 8
+SCRYPT_P = 1
+NONCE_SIZE = 12
+KEY_SIZE = 32
+# Associated data of the key check, records use their account name instead
+_KEY_CHECK = b"vaultix key check"
+
+# Keys by KDF block, so reloading a vault keeps it unlocked for the session
+_KEYS = {}
+_KEYS_GUARD = threading.Lock()
+
+
+class VaultLockedError(ValueError):
+    """Raised when records of a vault are read or written before it is unlocked."""
+
+
+def _require_aead():
+    if AESGCM is None:
+        raise VaultLockedError("Encrypted vaults need the 'cryptography' package")
+
+
+class VaultKey:
+    """Key derivation parameters of an encrypted vault and, once unlocked, its key.
+
+    Every record is sealed on its own with AES-256-GCM under a random nonce,
+    with its account name as associated data so records cannot be swapped.
+    The key is derived from the master password with scrypt; unlock() is
+    the only slow step and runs once per vault and session, records are
+    opened one at a time when they are shown.
+    """
+
+    __slots__ = ("kdf_block", "_log_n", "_r", "_p", "_salt", "_check_nonce", "_check_tag", "_aead")
+
+    def __init__(self, kdf_block):
+        kdf, self._log_n, self._r, self._p, self._salt, self._check_nonce, self._check_tag = \
+            KDF_BLOCK.unpack(kdf_block)
+        if kdf != KDF_SCRYPT or not 1 <= self._log_n <= 24 or not self._r or not self._p:
+            raise ValueError("Unsupported vault key derivation")
+        self.kdf_block = bytes(kdf_block)
+        self._aead = None
+
+    @classmethod
+    def create(cls, password, log_n=None):
+        """Returns an unlocked key for a new encrypted vault."""
+        _require_aead()
+        log_n = log_n or SCRYPT_LOG_N
+        salt = os.urandom(16)
+        aead = AESGCM(_derive(password, salt, log_n, SCRYPT_R, SCRYPT_P))
+        nonce = os.urandom(NONCE_SIZE)
+        tag = aead.encrypt(nonce, b"", _KEY_CHECK)
+        key = vault_key(KDF_BLOCK.pack(KDF_SCRYPT, log_n, SCRYPT_R, SCRYPT_P, salt, nonce, tag))
+        key._aead = aead
+        return key
+
+    @property
+    def unlocked(self):
+        return self._aead is not None
+
+    def unlock(self, password):
+        """Derives the key from a master password; returns False if it is wrong.
+
+        Takes as long as the scrypt cost says, call it off the GUI thread.
+        """
+        _require_aead()
+        if self._aead is not None:
+            return True
+        aead = AESGCM(_derive(password, self._salt, self._log_n, self._r, self._p))
+        try:
+            aead.decrypt(self._check_nonce, self._check_tag, _KEY_CHECK)
+        except InvalidTag:
+            return False
+        self._aead = aead
+        return True
+
+    def lock(self):
+        """Forgets the derived key."""
+        self._aead = None
+
+    def seal(self, account_name, record):
+        """Returns the record encrypted under this key."""
+        if self._aead is None:
+            raise VaultLockedError("Vault is locked")
+        nonce = os.urandom(NONCE_SIZE)
+        data = json.dumps(record.to_json(), ensure_ascii=False).encode("utf-8", "surrogatepass")
+        sealed = self._aead.encrypt(
+            nonce, data, account_name.encode("utf-8", "surrogatepass"))
+        return SealedRecord(base64.b64encode(nonce + sealed).decode("ascii"), self)
+
+    def open(self, account_name, data):
+        """Decrypts the sealed text of a record into an AccountRecord."""
+        if self._aead is None:
+            raise VaultLockedError("Vault is locked")
+        raw = base64.b64decode(data)
+        try:
+            plain = self._aead.decrypt(
+                raw[:NONCE_SIZE], raw[NONCE_SIZE:], account_name.encode("utf-8", "surrogatepass"))
+        except InvalidTag:
+            raise ValueError(f"Record '{account_name}' is corrupt or was moved") from None
+        return AccountRecord.from_json(json.loads(str(plain, "utf-8", "surrogatepass")))
+
+
+def _derive(password, salt, log_n, r, p):
+    """Runs scrypt; hashlib releases the GIL meanwhile."""
+    return hashlib.scrypt(
+        password.encode("utf-8"), salt=salt, n=1 << log_n, r=r, p=p,
+        maxmem=256 * r * (1 << log_n) + (1 << 20), dklen=KEY_SIZE)
+
+
+def vault_key(kdf_block):
+    """Returns the session's key for a KDF block, the same object for every load of a vault."""
+    kdf_block = bytes(kdf_block)
+    with _KEYS_GUARD:
+        key = _KEYS.get(kdf_block)
+        if key is None:
+            key = _KEYS[kdf_block] = VaultKey(kdf_block)
+        return key
+
+
+def seal_accounts(accounts, key):
+    """Returns {name: record} with every record sealed under key.
+
+    Records already sealed under key and raw sealed text, as found in a
+    decoded payload, pass through; records of another vault are re-sealed.
+    None marks a deleted record in a change set and is kept.
+    """
+    sealed = {}
+    for account_name, record in accounts.items():
+        if isinstance(record, SealedRecord):
+            if record.key is not key:
+                record = key.seal(account_name, record.key.open(account_name, record.data))
+        elif isinstance(record, AccountRecord):
+            record = key.seal(account_name, record)
+        elif record is not None and not isinstance(record, str):
+            record = key.seal(account_name, AccountRecord.from_json(record))
+        sealed[account_name] = record
+    return sealed
+
+
+def unseal_accounts(accounts):
+    """Returns {name: AccountRecord}, opening sealed records; their vaults must be unlocked."""
+    return {account_name: record.key.open(account_name, record.data)
+            if isinstance(record, SealedRecord) else record
+            for account_name, record in accounts.items()}
@@ -0,0 +1,497 @@
+# vault_qt.py
+"""The Qt side of vault access: file dialogs, the directory watcher and the
+workers that load, unlock, save and import into vaults off the GUI thread.
+
+Everything here runs the Qt-free code of file_utils.py and vault_store.py,
+which the command line uses directly.
+"""
+import os
+import time
+import queue
+from collections import deque
+from PyQt6.QtWidgets import QFileDialog
+from PyQt6.QtCore import (
+    QObject, QRunnable, QThreadPool, QFileSystemWatcher, QTimer, pyqtSignal
+)
+from csv_import import DEFAULT_CONFLICT, import_csv
+from file_utils import VaultFileManager, commit_vault
+from vault_store import VaultStore
+
+
+def open_vault_file_dialog(parent, title="Open Vault File"):
+    """Opens a file dialog to select a vault file."""
+    options = QFileDialog.Option.ReadOnly
+    file_filter = "Vault Files (*.vault);;All Files (*)"
+
+    file_path, _ = QFileDialog.getOpenFileName(
+        parent, title, "", file_filter, options=options
+    )
+
+    return file_path if file_path else None
+
+
+def save_vault_file_dialog(parent, title="Save Vault File"):
+    """Opens a file dialog to save a vault file."""
+    options = QFileDialog.Option.ReadOnly
+    file_filter = "Vault Files (*.vault);;All Files (*)"
+
+    file_path, _ = QFileDialog.getSaveFileName(
+        parent, title, "", file_filter, options=options
+    )
+
+    # Add .vault extension if not present
+    if file_path and not file_path.endswith('.vault'):
+        file_path += '.vault'
+
+    return file_path if file_path else None
+
+
+class VaultDirectoryWatcher(QObject):
+    """Watches a vault directory and reports debounced batches of changed paths."""
+
+    changed = pyqtSignal(list)
+
+    def __init__(self, parent=None, debounce_ms=25):
+        super().__init__(parent)
+        self._directory = None
+        self._pending = set()
+
+        # inotify/kqueue/ReadDirectoryChangesW backed watcher
+        self._watcher = QFileSystemWatcher(self)
+        self._watcher.directoryChanged.connect(self._on_directory_changed)
+        self._watcher.fileChanged.connect(self._on_path_changed)
+
+        # Bursts of events are collected and delivered once per window
+        self._debounce_timer = QTimer(self)
+        self._debounce_timer.setSingleShot(True)
+        self._debounce_timer.setInterval(debounce_ms)
+        self._debounce_timer.timeout.connect(self._emit_pending)
+
+    def start(self, directory):
+        """Starts watching a directory, returns False if events are unavailable."""
+        if not self._watcher.addPath(directory):
+            return False
+
+        self._directory = directory
+        self._sync_files()
+        return True
+
+    def watch_file(self, file_path):
+        """Adds a single file, e.g. an external vault, to the watch list."""
+        if file_path not in self._watcher.files():
+            self._watcher.addPath(file_path)
+
+    def _sync_files(self):
+        """Watches every candidate file currently in the directory."""
+        watched = set(self._watcher.files())
+        try:
+            names = os.listdir(self._directory)
+        except OSError:
+            return
+
+        for name in names:
+            file_path = os.path.join(self._directory, name)
+            if file_path not in watched and not name.startswith('.') and os.path.isfile(file_path):
+                self._watcher.addPath(file_path)
+
+    def _on_directory_changed(self, path):
+        """A file was created, renamed or deleted in the directory."""
+        self._sync_files()
+        self._on_path_changed(path)
+
+    def _on_path_changed(self, path):
+        """Queues a changed path; the first event of a burst opens the window."""
+        self._pending.add(path)
+        if not self._debounce_timer.isActive():
+            self._debounce_timer.start()
+
+    def _emit_pending(self):
+        """Delivers all paths collected during the debounce window."""
+        paths = sorted(self._pending)
+        self._pending.clear()
+
+        # Atomic saves replace a file, which drops it from the watch list
+        watched = set(self._watcher.files())
+        for path in paths:
+            if path != self._directory and path not in watched and os.path.isfile(path):
+                self._watcher.addPath(path)
+
+        if paths:
+            self.changed.emit(paths)
+
+
+class _VaultLoadTaskSignals(QObject):
+    """Signals emitted by a load task from its worker thread."""
+
+    finished = pyqtSignal(str, object, object, str, object)
+
+
+class _VaultLoadTask(QRunnable):
+    """Decodes one vault file on a thread pool worker."""
+
+    def __init__(self, file_path, key):
+        super().__init__()
+        self.file_path = file_path
+        self.key = key
+        self.seconds = None
+        self.signals = _VaultLoadTaskSignals()
+
+    def run(self):
+        start = time.perf_counter()
+        try:
+            store, error = VaultStore.open(self.file_path)
+            accounts, vault_key = (None, None) if store is None else (store.accounts, store.key)
+        except Exception as e:
+            accounts, error, vault_key = None, str(e), None
+        self.seconds = time.perf_counter() - start
+        self.signals.finished.emit(self.file_path, self.key, accounts, error, vault_key)
+
+
+class VaultLoader(QObject):
+    """Loads vault files on a worker pool and posts results back to the GUI thread."""
+
+    # file_path, accounts (None if not a vault), error, VaultKey of an encrypted vault or None
+    loaded = pyqtSignal(str, object, str, object)
+    # Emitted once no loads are outstanding
+    idle = pyqtSignal()
+
+    def __init__(self, cache, parent=None, max_workers=4, is_dirty=None):
+        super().__init__(parent)
+        self.cache = cache
+        # is_dirty(file_path) tells which files have edits not yet saved
+        self.is_dirty = is_dirty
+        self._pending = {}  # Format: {file_path: task}
+
+        # Recent load statistics ({"path", "seconds"}), newest last
+        self.history = deque(maxlen=100)
+
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(
+            max(1, min(max_workers, QThreadPool.globalInstance().maxThreadCount())))
+
+    def is_busy(self):
+        """Returns True while any load is outstanding."""
+        return bool(self._pending)
+
+    def is_pending(self, file_path):
+        """Returns True if the file is currently being loaded."""
+        return file_path in self._pending
+
+    def submit(self, file_path, key=None):
+        """Queues a file for decoding unless the same version is already in flight."""
+        if key is None:
+            try:
+                key = self.cache.stat_key(file_path)
+            except OSError as e:
+                self.loaded.emit(file_path, None, str(e), None)
+                return
+
+        task = self._pending.get(file_path)
+        if task is not None and task.key == key:
+            return
+
+        task = _VaultLoadTask(file_path, key)
+        task.signals.finished.connect(self._on_task_finished)
+        self._pending[file_path] = task
+        self._pool.start(task)
+
+    def _on_task_finished(self, file_path, key, accounts, error, vault_key):
+        """Stores a finished load in the cache and reports it (GUI thread)."""
+        task = self._pending.get(file_path)
+        if task is None or task.key != key:
+            return  # Superseded by a newer load of the same file
+
+        del self._pending[file_path]
+        try:
+            current_key = self.cache.stat_key(file_path)
+        except OSError:
+            current_key = None
+        if current_key is not None and current_key != key:
+            # The file changed while it was being read
+            self.submit(file_path, current_key)
+            return
+
+        # The cached accounts of a file with unsaved edits are ahead of it and
+        # stay; the result is still reported, so it can be loaded again later
+        if self.is_dirty is None or not self.is_dirty(file_path):
+            self.cache.store(file_path, key, accounts, error)
+        self.history.append({"path": file_path, "seconds": task.seconds})
+        self.loaded.emit(file_path, accounts, error, vault_key)
+        if not self._pending:
+            self.idle.emit()
+
+
+class _TaskSignals(QObject):
+    """Signals emitted by a background task from its worker thread."""
+
+    finished = pyqtSignal(object)
+
+
+class _CallTask(QRunnable):
+    """Runs a function on a thread pool worker and emits its result."""
+
+    def __init__(self, fn, *args):
+        super().__init__()
+        self.fn = fn
+        self.args = args
+        self.done = False
+        self.signals = _TaskSignals()
+
+    def run(self):
+        result = self.fn(*self.args)
+        self.done = True
+        self.signals.finished.emit(result)
+
+
+class VaultUnlocker(QObject):
+    """Derives the keys of encrypted vaults on a worker thread.
+
+    scrypt takes most of a second by design; running it here keeps the
+    window responsive while a vault is unlocked or created.
+    """
+
+    # file_path, unlocked, error
+    unlocked = pyqtSignal(str, bool, str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._tasks = {}  # Format: {file_path: task}
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(1)
+
+    def is_pending(self, file_path):
+        """Returns True while a vault is being unlocked."""
+        return file_path in self._tasks
+
+    def submit(self, file_path, password, create=False):
+        """Starts unlocking a vault unless that is already in progress.
+
+        With create=True a new key is derived instead and an empty vault
+        sealed under it is written to file_path.
+        """
+        if file_path in self._tasks:
+            return
+        task = _CallTask(self._create if create else self._unlock, file_path, password)
+        task.signals.finished.connect(self._on_finished)
+        self._tasks[file_path] = task
+        self._pool.start(task)
+
+    def wait(self):
+        """Blocks until every running unlock has finished."""
+        self._pool.waitForDone()
+
+    @staticmethod
+    def _unlock(file_path, password):
+        """Worker thread: runs the key derivation."""
+        return (file_path, *VaultFileManager.unlock_vault(file_path, password))
+
+    @staticmethod
+    def _create(file_path, password):
+        """Worker thread: derives a new key and writes an empty vault sealed under it."""
+        store, error = VaultStore.create(file_path, password)
+        return file_path, store is not None, error
+
+    def _on_finished(self, result):
+        """Reports a finished unlock (GUI thread)."""
+        file_path, unlocked, error = result
+        self._tasks.pop(file_path, None)
+        self.unlocked.emit(file_path, unlocked, error)
+
+
+class VaultImporter(QObject):
+    """Imports CSV exports into vaults on a worker thread, one at a time.
+
+    The import works on a VaultStore of its own and writes it; the caller
+    adopts the store's accounts when finished arrives, so nothing the GUI
+    thread uses changes under it meanwhile.
+    """
+
+    # rows, bytes_read, total_bytes
+    progress = pyqtSignal(int, object, object)
+    # store, csv_path, stats, error
+    finished = pyqtSignal(object, str, object, str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._task = None
+        self._file_path = None  # Vault being imported into
+        self._cancelled = False
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(1)
+
+    def is_importing(self, file_path=None):
+        """Returns True while an import, into file_path if given, is running."""
+        return self._task is not None and file_path in (None, self._file_path)
+
+    def submit(self, store, csv_path, conflict=DEFAULT_CONFLICT):
+        """Starts importing a CSV file into store; returns False if an import is running."""
+        if self._task is not None:
+            return False
+        self._cancelled = False
+        self._file_path = store.file_path
+        self._task = _CallTask(self._import, store, csv_path, conflict)
+        self._task.signals.finished.connect(self._on_finished)
+        self._pool.start(self._task)
+        return True
+
+    def cancel(self):
+        """Stops the running import at its next progress report, before it writes."""
+        self._cancelled = True
+
+    def wait(self):
+        """Blocks until the running import has finished."""
+        self._pool.waitForDone()
+
+    def _import(self, store, csv_path, conflict):
+        """Worker thread: runs the import, reporting progress as signals."""
+        def report(rows, bytes_read, total_bytes):
+            self.progress.emit(rows, bytes_read, total_bytes)
+            return not self._cancelled
+
+        stats, error = import_csv(store, csv_path, conflict=conflict, progress=report)
+        return store, csv_path, stats, error
+
+    def _on_finished(self, result):
+        """Reports a finished import (GUI thread)."""
+        self._task = None
+        self._file_path = None
+        self.finished.emit(*result)
+
+
+class VaultSaveScheduler(QObject):
+    """Coalesces vault saves and commits them on a single writer thread.
+
+    All edits to a vault made within the commit window become one journal
+    record (or one atomic rewrite) written with a single fsync.
+    """
+
+    # file_path, success, error, stats ({"kind", "bytes", "seconds", "compacted"})
+    saved = pyqtSignal(str, bool, str, object)
+
+    def __init__(self, parent=None, window_ms=300, max_delay_ms=2000):
+        super().__init__(parent)
+        self.window_ms = window_ms
+        self.max_delay_ms = max_delay_ms
+        # Format: {file_path: [accounts, changes or None for a full rewrite]}
+        self._dirty = {}
+        self._in_flight = {}  # Format: {file_path: number of running commits}
+        self._failed = set()  # Vaults whose last commit failed, dirty until one succeeds
+        self._tasks = set()
+        self._first_dirty = None
+
+        # Finished commits, filled by the writer and drained on the GUI thread
+        self._results = queue.SimpleQueue()
+
+        # Recent save statistics, newest last
+        self.history = deque(maxlen=100)
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self.commit)
+
+        # One writer keeps the commits of a file in order
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(1)
+
+    def mark_dirty(self, file_path, accounts, changes=None):
+        """Queues a vault for saving; changes=None requests a full rewrite."""
+        entry = self._dirty.get(file_path)
+        if entry is None:
+            self._dirty[file_path] = [
+                accounts, None if changes is None else dict(changes)]
+        else:
+            entry[0] = accounts
+            if changes is None or entry[1] is None:
+                entry[1] = None
+            else:
+                entry[1].update(changes)
+
+        # Each edit extends the window, but never beyond max_delay_ms
+        now = time.monotonic()
+        if self._first_dirty is None:
+            self._first_dirty = now
+        remaining = self.max_delay_ms - (now - self._first_dirty) * 1000
+        self._timer.start(int(max(0, min(self.window_ms, remaining))))
+
+    def is_dirty(self, file_path):
+        """Returns True while a vault has unsaved or uncommitted changes."""
+        return file_path in self._dirty or file_path in self._in_flight
+
+    def commit(self):
+        """Hands every dirty vault to the writer thread now."""
+        self._timer.stop()
+        self._first_dirty = None
+        dirty, self._dirty = self._dirty, {}
+
+        for file_path, (accounts, changes) in dirty.items():
+            # Full rewrites encode a copy so later edits cannot race the writer
+            if changes is None:
+                accounts = dict(accounts)
+            task = _CallTask(self._run_commit, file_path, accounts, changes)
+            task.signals.finished.connect(self._drain_results)
+            self._tasks.add(task)
+            self._in_flight[file_path] = self._in_flight.get(file_path, 0) + 1
+            self._pool.start(task)
+
+    def flush(self):
+        """Barrier: writes all pending changes and waits until they are durable.
+
+        A vault whose write keeps failing is tried once here and left dirty.
+        """
+        attempted = set()
+        while self._in_flight or self._dirty.keys() - (attempted & self._failed):
+            attempted.update(self._dirty)
+            self.commit()
+            self._pool.waitForDone()
+            # Results may request a full rewrite, which the next round writes
+            self._drain_results()
+
+    def discard(self, file_path):
+        """Drops unsaved changes of a vault and waits for running commits."""
+        self._pool.waitForDone()
+        # A failed commit would queue its changes again
+        self._drain_results()
+        self._dirty.pop(file_path, None)
+        self._failed.discard(file_path)
+
+    def _run_commit(self, file_path, accounts, changes):
+        """Writer thread: performs one commit and queues its result."""
+        self._results.put(commit_vault(file_path, accounts, changes))
+
+    def _drain_results(self, *args):
+        """Processes every finished commit (GUI thread)."""
+        self._tasks = {task for task in self._tasks if not task.done}
+        while True:
+            try:
+                result = self._results.get_nowait()
+            except queue.Empty:
+                return
+            self._on_committed(result)
+
+    def _on_committed(self, result):
+        """Records the outcome of a commit."""
+        file_path = result["path"]
+        count = self._in_flight.get(file_path, 0) - 1
+        if count > 0:
+            self._in_flight[file_path] = count
+        else:
+            self._in_flight.pop(file_path, None)
+
+        if result["needs_full_rewrite"]:
+            # Legacy vaults are upgraded by rewriting them once
+            self.mark_dirty(file_path, result["accounts"])
+            return
+
+        if result["success"]:
+            self._failed.discard(file_path)
+        else:
+            # The changes are not on disk and the file may end in a partial
+            # record: the vault stays dirty and the next commit, started by
+            # the next edit or a flush, rewrites it whole
+            entry = self._dirty.setdefault(file_path, [result["accounts"], None])
+            entry[1] = None
+            self._failed.add(file_path)
+
+        stats = {key: result[key] for key in ("kind", "bytes", "seconds", "compacted")}
+        self.history.append(dict(stats, path=file_path))
+        self.saved.emit(file_path, result["success"], result["error"], stats)
@@ -0,0 +1,210 @@
+# vault_store.py
+"""One vault file opened for reading and editing, without any GUI.
+
+The command line (vaultix.py) works on a VaultStore directly; the window
+edits its current database through one too and hands the changes to its
+background writer, so both write through file_utils.commit_vault.
+"""
+import os
+from collections import deque
+from contextlib import contextmanager
+
+from account_record import AccountRecord
+from file_utils import JOURNAL_COMPACT_RATIO, VaultFileManager, _write_snapshot, commit_vault
+from vault_crypto import VaultKey, seal_accounts
+
+# A save changing more than this share of the records rewrites the vault,
+# a journal record that large would be compacted right away
+REWRITE_RATIO = JOURNAL_COMPACT_RATIO
+
+# Marks a name that had no record before a batch
+_MISSING = object()
+
+
+class VaultStore:
+    """The accounts of a vault file and the edits not yet saved.
+
+    accounts maps names to records as stored: AccountRecords, or
+    SealedRecords in an encrypted vault, which get() opens and put()
+    seals. Edits change accounts at once and are collected in changes
+    until save() writes them durably, as one journal record or, when most
+    of the vault changed, one rewrite.
+    """
+
+    def __init__(self, file_path, accounts, key=None):
+        self.file_path = file_path
+        self.accounts = accounts
+        self.key = key  # VaultKey of an encrypted vault, else None
+        self.changes = {}  # Format: {account_name: record or None}, unsaved
+        self._undo = None  # Format: {account_name: (record, change)} while a batch runs
+
+        # Recent save statistics ({"kind", "bytes", "seconds", "compacted"}), newest last
+        self.history = deque(maxlen=100)
+
+    @classmethod
+    def open(cls, file_path, password=None):
+        """Loads a vault file, unlocking an encrypted one with password if given.
+
+        Returns (store, error). Without a password an encrypted vault opens
+        locked, unless it was unlocked earlier in the session: its names can
+        be listed and records deleted, but not read or written.
+        """
+        header, error = VaultFileManager.read_vault_header(file_path)
+        if error:
+            return None, error
+        key = None if header is None else header.vault_key
+        if key is not None and password is not None:
+            unlocked, error = VaultFileManager.unlock_vault(file_path, password)
+            if not unlocked:
+                return None, error
+
+        accounts, error = VaultFileManager.try_load_vault_file(file_path)
+        if accounts is None:
+            return None, error
+        return cls(file_path, accounts, key), ""
+
+    @classmethod
+    def create(cls, file_path, password=None):
+        """Writes an empty vault, encrypted under password if given; returns (store, error).
+
+        With a password this runs the key derivation, keep it off the GUI thread.
+        """
+        if os.path.exists(file_path):
+            return None, f"A file named '{os.path.basename(file_path)}' already exists"
+        try:
+            key = VaultKey.create(password) if password else None
+            _write_snapshot(file_path, {}, key=key)
+        except Exception as e:
+            return None, str(e)
+        return cls(file_path, {}, key), ""
+
+    @property
+    def locked(self):
+        """Returns True while the records of an encrypted vault cannot be opened."""
+        return self.key is not None and not self.key.unlocked
+
+    def __len__(self):
+        return len(self.accounts)
+
+    def __contains__(self, account_name):
+        return account_name in self.accounts
+
+    def list(self, prefix=""):
+        """Returns the sorted account names, those starting with prefix if given."""
+        if prefix:
+            return sorted(name for name in self.accounts if name.startswith(prefix))
+        return sorted(self.accounts)
+
+    def get(self, account_name):
+        """Returns the readable AccountRecord of an account.
+
+        Returns None for an unknown account and while the vault is locked.
+        Raises ValueError for a record that fails to decrypt.
+        """
+        record = self.accounts.get(account_name)
+        return None if record is None else record.unsealed(account_name)
+
+    def put(self, account_name, record):
+        """Adds or replaces an account; returns the record as stored.
+
+        An AccountRecord is sealed first in an encrypted vault, which raises
+        vault_crypto.VaultLockedError while it is locked.
+        """
+        if self.key is not None and isinstance(record, AccountRecord):
+            record = self.key.seal(account_name, record)
+        self._change(account_name, record)
+        self.accounts[account_name] = record
+        return record
+
+    def put_many(self, records):
+        """Adds or replaces many accounts, {account_name: record}; returns them as stored.
+
+        Does what put() does for each, in bulk, e.g. for imports.
+        """
+        if self.key is not None:
+            records = seal_accounts(records, self.key)
+        if self._undo is not None:
+            undo = self._undo
+            accounts = self.accounts
+            changes = self.changes
+            for account_name in records.keys() - undo.keys():
+                undo[account_name] = (accounts.get(account_name, _MISSING),
+                                      changes.get(account_name, _MISSING))
+        self.changes.update(records)
+        self.accounts.update(records)
+        return records
+
+    def delete(self, account_name):
+        """Removes an account; returns False if there was none."""
+        if account_name not in self.accounts:
+            return False
+        self._change(account_name, None)
+        del self.accounts[account_name]
+        return True
+
+    def _change(self, account_name, record):
+        """Collects an edit, remembering what it replaced while a batch runs."""
+        if self._undo is not None and account_name not in self._undo:
+            self._undo[account_name] = (self.accounts.get(account_name, _MISSING),
+                                        self.changes.get(account_name, _MISSING))
+        self.changes[account_name] = record
+
+    @contextmanager
+    def batch(self):
+        """Groups edits that land together.
+
+        When the outermost batch ends the edits are saved as one write; if
+        it raises, or the write fails, they are undone in memory.
+        Batches may nest, inner ones only join the outer one.
+        """
+        if self._undo is not None:
+            yield self
+            return
+
+        self._undo = {}
+        try:
+            yield self
+            _, error = self.save()
+            if error:
+                raise OSError(error)
+        except BaseException:
+            for account_name, (record, change) in self._undo.items():
+                if record is _MISSING:
+                    self.accounts.pop(account_name, None)
+                else:
+                    self.accounts[account_name] = record
+                if change is _MISSING:
+                    self.changes.pop(account_name, None)
+                else:
+                    self.changes[account_name] = change
+            raise
+        finally:
+            self._undo = None
+
+    def take_changes(self):
+        """Returns the unsaved edits and forgets them, for callers that write them elsewhere."""
+        changes, self.changes = self.changes, {}
+        return changes
+
+    def save(self):
+        """Writes the unsaved edits durably; returns (saved, error).
+
+        Legacy headerless vaults have no journal and are rewritten whole.
+        On failure the edits stay unsaved, so save() can be retried.
+        """
+        if not self.changes:
+            return False, ""
+
+        changes = self.changes
+        if len(changes) > REWRITE_RATIO * len(self.accounts):
+            changes = None
+        result = commit_vault(self.file_path, self.accounts, changes)
+        if result["needs_full_rewrite"]:
+            result = commit_vault(self.file_path, self.accounts, None)
+        if not result["success"]:
+            return False, result["error"]
+
+        self.changes = {}
+        self.history.append(
+            {key: result[key] for key in ("kind", "bytes", "seconds", "compacted")})
+        return True, ""
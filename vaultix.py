@@ -0,0 +1,186 @@
+# vaultix.py
+"""Command line access to vault files, for scripts and bulk edits.
+
+Usage:
+    python vaultix.py list vaults/work.vault [--prefix mail-]
+    python vaultix.py get vaults/work.vault [name ...]
+    python vaultix.py put vaults/work.vault name [--email E] [--website W]
+    python vaultix.py put vaults/work.vault --jsonl records.jsonl
+    python vaultix.py delete vaults/work.vault name [name ...]
+    python vaultix.py import vaults/work.vault passwords.csv [--conflict skip]
+
+get prints one JSON object per account, every account without names;
+put --jsonl reads the same shape ({"name", "password", "email",
+"website"}), "-" for standard input. import reads the CSV exports of
+browsers and password managers, see csv_import.py. Every command saves
+its edits with one write. The master password of an encrypted vault is asked for when
+records are read or written. Nothing here imports PyQt6; close the app
+before editing its vaults.
+"""
+import argparse
+import getpass
+import json
+import sys
+from account_record import AccountRecord
+from csv_import import CONFLICT_POLICIES, CSV_FIELDS, CSV_LAYOUTS, DEFAULT_CONFLICT, import_csv
+from vault_store import VaultStore
+
+
+def _open(file_path, need_records):
+    """Opens a vault, asking for its master password if records are needed; returns (store, error)."""
+    store, error = VaultStore.open(file_path)
+    if store is None or not need_records or not store.locked:
+        return store, error
+    return VaultStore.open(file_path, getpass.getpass(f"Master password of {file_path}: "))
+
+
+def _read_jsonl(file_path):
+    """Yields (line number, object) for the non-empty lines of a JSON lines file."""
+    f = sys.stdin if file_path == "-" else open(file_path, encoding="utf-8")
+    try:
+        for number, line in enumerate(f, 1):
+            if line.strip():
+                try:
+                    yield number, json.loads(line)
+                except ValueError as e:
+                    raise ValueError(f"line {number}: {e}") from None
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+
+def _list(store, args):
+    names = store.list(args.prefix)
+    if names:
+        sys.stdout.write("\n".join(names) + "\n")
+    return 0
+
+
+def _get(store, args):
+    names = args.names or store.list()
+    missing = False
+    write = sys.stdout.write
+    for account_name in names:
+        record = store.get(account_name)
+        if record is None:
+            print(f"No account named '{account_name}'", file=sys.stderr)
+            missing = True
+            continue
+        write(json.dumps({"name": account_name, **record.to_json()}, ensure_ascii=False) + "\n")
+    return 1 if missing else 0
+
+
+def _put(store, args):
+    if args.jsonl is not None:
+        count = 0
+        with store.batch():
+            for number, value in _read_jsonl(args.jsonl):
+                if not isinstance(value, dict) or not isinstance(value.get("name"), str) \
+                        or not value["name"]:
+                    raise ValueError(f"line {number}: expected an object with a name")
+                account_name = value.pop("name")
+                store.put(account_name, AccountRecord.from_json(value))
+                count += 1
+        print(f"{args.vault}: {count} accounts saved")
+        return 0
+
+    if not args.name:
+        raise ValueError("give an account name or --jsonl")
+    password = getpass.getpass(f"Password of {args.name}: ")
+    if not password:
+        raise ValueError("the password is empty")
+    with store.batch():
+        store.put(args.name, AccountRecord.create(password, args.email, args.website))
+    return 0
+
+
+def _delete(store, args):
+    missing = False
+    with store.batch():
+        for account_name in args.names:
+            if not store.delete(account_name):
+                print(f"No account named '{account_name}'", file=sys.stderr)
+                missing = True
+    return 1 if missing else 0
+
+
+def _import(store, args):
+    columns = {}
+    for mapping in args.column:
+        field, _, column = mapping.partition("=")
+        if field not in CSV_FIELDS or not column:
+            raise ValueError(f"--column takes FIELD=COLUMN with a field of {', '.join(CSV_FIELDS)}")
+        columns[field] = column
+
+    def report(rows, bytes_read, total_bytes):
+        print(f"\r{rows} rows, {bytes_read * 100 // max(total_bytes, 1)}%", end="",
+              file=sys.stderr, flush=True)
+
+    stats, error = import_csv(store, args.csv, args.layout, columns, args.conflict,
+                              report if sys.stderr.isatty() else None)
+    if sys.stderr.isatty():
+        print(file=sys.stderr)
+    if error:
+        raise ValueError(error)
+    for line, message in stats["errors"]:
+        print(f"{args.csv}: line {line}: {message}", file=sys.stderr)
+    print(f"{args.vault}: {stats['rows']} rows of {stats['layout'] or 'custom'} layout, "
+          f"{stats['added']} added, {stats['renamed']} renamed, {stats['replaced']} replaced, "
+          f"{stats['skipped']} skipped, {stats['invalid']} invalid, {stats['seconds']:.2f} s")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="vaultix", description="Read and edit vault files.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    command = commands.add_parser("list", help="print the account names, sorted")
+    command.add_argument("vault")
+    command.add_argument("--prefix", default="", help="only names starting with this")
+    command.set_defaults(run=_list, need_records=False)
+
+    command = commands.add_parser("get", help="print accounts as JSON lines")
+    command.add_argument("vault")
+    command.add_argument("names", nargs="*", help="accounts to print, all if none")
+    command.set_defaults(run=_get, need_records=True)
+
+    command = commands.add_parser("put", help="add or replace accounts")
+    command.add_argument("vault")
+    command.add_argument("name", nargs="?", help="account to add, its password is asked for")
+    command.add_argument("--email", default="")
+    command.add_argument("--website", default="")
+    command.add_argument("--jsonl", metavar="FILE",
+                         help="add the accounts of a JSON lines file instead, - for stdin")
+    command.set_defaults(run=_put, need_records=True)
+
+    command = commands.add_parser("delete", help="remove accounts")
+    command.add_argument("vault")
+    command.add_argument("names", nargs="+")
+    command.set_defaults(run=_delete, need_records=False)
+
+    command = commands.add_parser("import", help="add the accounts of a CSV export")
+    command.add_argument("vault")
+    command.add_argument("csv")
+    command.add_argument("--layout", choices=list(CSV_LAYOUTS),
+                         help="layout of the file, recognised from its header by default")
+    command.add_argument("--column", action="append", default=[], metavar="FIELD=COLUMN",
+                         help="header column of a field, e.g. password=Pass; repeatable")
+    command.add_argument("--conflict", choices=CONFLICT_POLICIES, default=DEFAULT_CONFLICT,
+                         help="for accounts whose name is taken (default: %(default)s)")
+    command.set_defaults(run=_import, need_records=True)
+
+    args = parser.parse_args(argv)
+    store, error = _open(args.vault, args.need_records)
+    if store is None:
+        print(f"{args.vault}: {error}", file=sys.stderr)
+        return 1
+    try:
+        return args.run(store, args)
+    except (OSError, ValueError) as e:
+        # Nothing was saved, batches undo their edits when they fail
+        print(f"{args.vault}: {e}", file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())